@@ -7,6 +7,7 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 import logging
 import os
+import threading
 from datetime import datetime
 
 def create_app():
@@ -119,6 +120,11 @@ def register_blueprints(app):
         app.register_blueprint(profile_bp, url_prefix='/api')
         logger.info("✅ Profile blueprint registered")
         
+        # Yönetim (model yeniden yükleme)
+        from routes.admin import admin_bp
+        app.register_blueprint(admin_bp, url_prefix='/api')
+        logger.info("✅ Admin blueprint registered")
+        
         logger.info("🎯 All blueprints registered for Flutter")
         
     except ImportError as e:
@@ -127,6 +133,73 @@ def register_blueprints(app):
     except Exception as e:
         logger.error(f"❌ Error registering blueprints: {str(e)}")
 
+def initialize_models():
+    """Model servisini başlat ve model durumlarını logla"""
+    
+    logger = logging.getLogger(__name__)
+    
+    from config import Config
+    from services.model_service import get_model_service
+    from services.model_reloader import start_reload_marker_watcher
+    model_service = get_model_service()
+    
+    if Config.MODEL_EXECUTION_MODE == "process":
+        # Modeller alt süreçlerin başlatıcısında yüklenir; web süreci model tutmaz
+        logger.info(f"🤖 AI Models: process mode, {Config.MODEL_PROCESS_POOL_SIZE} model processes starting")
+        model_service.warm_up()
+        start_reload_marker_watcher(model_service)
+        return
+    
+    # Model durumlarını logla (özel modeller ilk kullanımda yüklenir)
+    model_status = model_service.get_model_status()
+    plant_model = model_status["plant_identification"]
+    general_model = model_status["disease_detection"]
+    specific_available = len(model_status["available_specific_models"])
+    
+    logger.info(f"🤖 AI Models for Flutter:")
+    logger.info(f"   Plant Type Model: {'✅' if plant_model else '❌ (Mock mode)'}")
+    logger.info(f"   General Disease Model: {'✅' if general_model else '❌ (Mock mode)'}")
+    logger.info(f"   Specific Disease Models: {specific_available}/{len(Config.SPECIFIC_DISEASE_MODELS)} available (lazy loaded)")
+    
+    # Isıtma arka planda - worker bu sırada /ready ile 503 döner
+    model_service.warm_up()
+    
+    # Yeni model dosyaları worker yeniden başlatılmadan devreye alınır
+    model_service.start_reloader()
+    
+    # Yönetim endpoint'inden gelen yeniden yükleme her worker'a işaret dosyası ile ulaşır
+    start_reload_marker_watcher(model_service)
+
+def initialize_firebase(app):
+    """Süreç genelindeki Firestore erişimini kur ve arka planda ısıt (route'lar get_firebase_service() ile aynı örneği kullanır)"""
+    
+    logger = logging.getLogger(__name__)
+    
+    from services.firebase_service import get_firebase_service
+    firebase_service = get_firebase_service()
+    
+    firebase_connected = getattr(firebase_service, 'db', None) is not None
+    logger.info(f"🔥 Firebase for Flutter: {'✅ Connected' if firebase_connected else '⚠️ Mock Mode'}")
+    
+    # İlk istek kanal kurulumunu beklemesin
+    threading.Thread(target=firebase_service.warm_up, name="firestore-warmup", daemon=True).start()
+
+def initialize_worker(app):
+    """Gunicorn post_fork: preload modunda modelleri ve Firebase bağlantısını her worker'da fork sonrası kur"""
+    
+    logger = logging.getLogger(__name__)
+    
+    with app.app_context():
+        try:
+            initialize_models()
+        except Exception as e:
+            logger.error(f"❌ Error initializing worker {os.getpid()}: {str(e)}")
+        
+        try:
+            initialize_firebase(app)
+        except Exception as e:
+            logger.error(f"❌ Error connecting Firebase in worker {os.getpid()}: {str(e)}")
+
 def initialize_services(app):
     """Servisleri başlat ve durumlarını kontrol et"""
     
@@ -136,29 +209,27 @@ def initialize_services(app):
         try:
             # Model servisini başlat
             try:
-                from services.model_service import ModelService
-                model_service = ModelService()
-                
-                # Model durumlarını logla
-                models_loaded = len(getattr(model_service, 'specific_disease_interpreters', {}))
-                plant_model = getattr(model_service, 'plant_type_interpreter', None) is not None
-                general_model = getattr(model_service, 'general_disease_interpreter', None) is not None
-                
-                logger.info(f"🤖 AI Models for Flutter:")
-                logger.info(f"   Plant Type Model: {'✅' if plant_model else '❌ (Mock mode)'}")
-                logger.info(f"   General Disease Model: {'✅' if general_model else '❌ (Mock mode)'}")
-                logger.info(f"   Specific Disease Models: {models_loaded}/6")
+                from config import Config
+                if Config.PRELOAD_APP:
+                    # Preload modunda master süreç interpreter oluşturmaz (fork güvenliği);
+                    # sadece backend import edilir, kod sayfaları worker'larla paylaşılır
+                    from services.tflite_backend import get_interpreter_class
+                    get_interpreter_class()
+                    logger.info("🤖 AI Models: preload mode, models will load in each worker after fork")
+                else:
+                    initialize_models()
                 
             except ImportError:
                 logger.warning("⚠️ Model service not available, using mock mode")
             
             # Firebase servisini başlat
             try:
-                from services.firebase_service import FirebaseService
-                firebase_service = FirebaseService()
-                
-                firebase_connected = getattr(firebase_service, 'db', None) is not None
-                logger.info(f"🔥 Firebase for Flutter: {'✅ Connected' if firebase_connected else '⚠️ Mock Mode'}")
+                from config import Config
+                if Config.PRELOAD_APP:
+                    # gRPC kanalları fork'tan sağ çıkmaz - bağlantı her worker'da fork sonrası kurulur
+                    logger.info("🔥 Firebase: preload mode, connecting in each worker after fork")
+                else:
+                    initialize_firebase(app)
                 
             except ImportError:
                 logger.warning("⚠️ Firebase service not available, using mock mode")
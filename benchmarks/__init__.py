@@ -0,0 +1,2 @@
+# Benchmarks modülü
+# Repo kök dizininden çalıştırılır: python -m benchmarks.<script>
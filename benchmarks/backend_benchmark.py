@@ -0,0 +1,96 @@
+"""
+TFLite backend başlangıç benchmark'ı
+Her backend'i ayrı bir Python sürecinde import eder; import süresini, RSS artışını
+ve ilk model yükleme süresini ölçer
+
+Kullanım:
+    python -m benchmarks.backend_benchmark
+    python -m benchmarks.backend_benchmark --model models/baris_cicegi.tflite --output backends.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from config import Config
+from services.tflite_backend import BACKENDS
+
+# Alt süreçte çalışan ölçüm kodu - repo modüllerini import etmez ki RSS temiz ölçülsün
+CHILD_SCRIPT = r"""
+import importlib, json, sys, time
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+module_name, attribute_path, model_path = sys.argv[1], sys.argv[2], sys.argv[3]
+import numpy  # Tüm backend'ler numpy kullanır, karşılaştırma dışı tutulur
+
+rss_before = rss_kb()
+start = time.perf_counter()
+target = importlib.import_module(module_name)
+for attribute in attribute_path.split('.'):
+    target = getattr(target, attribute)
+import_ms = (time.perf_counter() - start) * 1000
+rss_after_import = rss_kb()
+
+start = time.perf_counter()
+interpreter = target(model_path=model_path)
+interpreter.allocate_tensors()
+load_ms = (time.perf_counter() - start) * 1000
+
+print(json.dumps({
+    "import_ms": round(import_ms, 1),
+    "import_rss_mb": round((rss_after_import - rss_before) / 1024, 1),
+    "model_load_ms": round(load_ms, 1),
+    "total_rss_mb": round(rss_kb() / 1024, 1)
+}))
+"""
+
+
+def measure_backend(name, model_path, timeout):
+    module_name, attribute_path = BACKENDS[name]
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-c", CHILD_SCRIPT, module_name, attribute_path, model_path],
+            capture_output=True, text=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return {"available": False, "error": f"timed out after {timeout}s"}
+
+    if completed.returncode != 0:
+        error_lines = completed.stderr.strip().splitlines()
+        return {"available": False, "error": error_lines[-1] if error_lines else "unknown error"}
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["available"] = True
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time and RSS per TFLite backend")
+    parser.add_argument('--model', default=Config.PLANT_TYPE_MODEL_PATH, help="Model used for the load measurement")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh processes per backend (best run is reported)")
+    parser.add_argument('--timeout', type=int, default=120)
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for name in BACKENDS:
+        runs = [measure_backend(name, args.model, args.timeout) for _ in range(args.repeat)]
+        available = [run for run in runs if run["available"]]
+        results[name] = min(available, key=lambda run: run["import_ms"]) if available else runs[0]
+
+    output = json.dumps({"model": args.model, "backends": results}, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""
+Model inference benchmark'ı
+models/ altındaki her .tflite dosyası için yükleme süresi, ilk invoke, kararlı
+durum p50/p95/p99 gecikmesi, batch boyutu x thread sayısı verimi, ayrı ölçülen
+ön işleme maliyeti ve tepe RSS'i ölçer. Her model temiz RSS için ayrı süreçte
+çalışır; sonuç JSON olarak yazılır ve önceki bir çalıştırmayla karşılaştırılabilir
+
+Kullanım:
+    python -m benchmarks.model_benchmark --output bench.json
+    python -m benchmarks.model_benchmark --models models/aloe_vera.tflite --batch-sizes 1,8 --threads 1,2
+    python -m benchmarks.model_benchmark --compare bench.json   # p50 %10'dan fazla kötüleşirse çıkış kodu 1
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from config import Config
+from benchmarks.preprocess_benchmark import synthetic_photo, read_peak_rss_kb
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+
+    def pick(q):
+        return round(samples[min(len(samples) - 1, int(len(samples) * q))], 3)
+
+    return {
+        "samples": len(samples),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99)
+    }
+
+
+def model_name(model_path):
+    """Dosya yolunu Config'teki model adına çevir"""
+    names = {
+        Config.PLANT_TYPE_MODEL_PATH: "plant_type",
+        Config.GENERAL_DISEASE_MODEL_PATH: "general_disease"
+    }
+    names.update({path: plant_type for plant_type, path in Config.SPECIFIC_DISEASE_MODELS.items()})
+    return names.get(os.path.relpath(model_path), os.path.basename(model_path))
+
+
+def _new_interpreter(model_path, num_threads):
+    from services.tflite_backend import create_interpreter
+    interpreter = create_interpreter(model_path=model_path, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+def _timed_invokes(interpreter, sample, iterations):
+    input_index = interpreter.get_input_details()[0]['index']
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        interpreter.set_tensor(input_index, sample)
+        interpreter.invoke()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _batched_sample(interpreter, batch_size):
+    """Input tensor'ı batch boyutuna getir ve sentetik giriş üret"""
+    import numpy as np
+    from services.model_warmup import synthetic_input
+
+    details = interpreter.get_input_details()[0]
+    if details['shape'][0] != batch_size:
+        interpreter.resize_tensor_input(details['index'], [batch_size] + list(details['shape'][1:]))
+        interpreter.allocate_tensors()
+        details = interpreter.get_input_details()[0]
+    return np.ascontiguousarray(synthetic_input(details))
+
+
+def benchmark_model(model_path, options):
+    """Tek modelin tüm ölçümleri - ayrı süreçte çalışır"""
+    from services.image_preprocessing import preprocess_image
+
+    rss_baseline = read_peak_rss_kb()
+    default_threads = options["threads"][0]
+    result = {"model": model_name(model_path), "path": model_path, "size_kb": round(os.path.getsize(model_path) / 1024, 1)}
+
+    # Yükleme ve ilk invoke
+    start = time.perf_counter()
+    interpreter = _new_interpreter(model_path, default_threads)
+    result["load_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    details = interpreter.get_input_details()[0]
+    result["input"] = {"shape": [int(d) for d in details['shape']], "dtype": details['dtype'].__name__}
+    sample = _batched_sample(interpreter, 1)
+    result["first_invoke_ms"] = round(_timed_invokes(interpreter, sample, 1)[0], 3)
+
+    # Kararlı durum gecikmesi (batch 1)
+    _timed_invokes(interpreter, sample, options["warmup"])
+    result["latency"] = percentiles(_timed_invokes(interpreter, sample, options["iterations"]))
+    result["latency"]["num_threads"] = default_threads
+
+    # Ön işleme (decode + boyutlandırma + normalizasyon) ayrı ve uçtan uca
+    photo = options["photo"]
+    preprocess_image(photo, details)
+    preprocess_samples, end_to_end_samples = [], []
+    for _ in range(options["preprocess_iterations"]):
+        start = time.perf_counter()
+        image_array = preprocess_image(photo, details)
+        preprocessed = time.perf_counter()
+        interpreter.set_tensor(details['index'], image_array)
+        interpreter.invoke()
+        done = time.perf_counter()
+        preprocess_samples.append((preprocessed - start) * 1000)
+        end_to_end_samples.append((done - start) * 1000)
+    result["preprocessing"] = percentiles(preprocess_samples)
+    result["end_to_end"] = percentiles(end_to_end_samples)
+    del interpreter
+
+    # Verim: thread sayısı x batch boyutu
+    throughput = []
+    for num_threads in options["threads"]:
+        interpreter = _new_interpreter(model_path, num_threads)
+        for batch_size in options["batch_sizes"]:
+            entry = {"num_threads": num_threads, "batch_size": batch_size}
+            try:
+                batch = _batched_sample(interpreter, batch_size)
+                _timed_invokes(interpreter, batch, options["warmup"])
+                samples = _timed_invokes(interpreter, batch, options["iterations"])
+                p50 = statistics.median(samples)
+                entry.update({
+                    "p50_ms": round(p50, 3),
+                    "images_per_second": round(batch_size * 1000 / p50, 1) if p50 else None
+                })
+            except Exception as e:
+                entry["error"] = str(e)
+            throughput.append(entry)
+        del interpreter
+    result["throughput"] = throughput
+
+    peak = read_peak_rss_kb()
+    result["peak_rss_mb"] = round(peak / 1024, 1)
+    result["peak_rss_delta_mb"] = round((peak - rss_baseline) / 1024, 1)
+    return result
+
+
+def _child(model_path, options, conn):
+    try:
+        conn.send(benchmark_model(model_path, options))
+    except Exception as e:
+        conn.send({"model": model_name(model_path), "path": model_path, "error": str(e)})
+    conn.close()
+
+
+def run_isolated(model_path, options):
+    ctx = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = ctx.Pipe()
+    process = ctx.Process(target=_child, args=(model_path, options, child_conn))
+    process.start()
+    result = parent_conn.recv()
+    process.join()
+    return result
+
+
+def environment_info():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        commit = None
+
+    from services.tflite_backend import get_interpreter_class, get_backend_info
+    get_interpreter_class()
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "backend": get_backend_info()
+    }
+
+
+def compare(results, baseline, threshold):
+    """p50 gecikmelerini önceki çalıştırmayla karşılaştır - eşiği aşan kötüleşmeleri döndür"""
+    previous = {entry["model"]: entry for entry in baseline.get("models", [])}
+    regressions = []
+    for entry in results["models"]:
+        old = previous.get(entry["model"])
+        if not old or "error" in entry or "error" in old:
+            continue
+        for metric in ("latency", "preprocessing", "end_to_end"):
+            before, after = old[metric]["p50_ms"], entry[metric]["p50_ms"]
+            change = (after - before) / before if before else 0.0
+            entry.setdefault("change_vs_baseline", {})[metric] = round(change, 3)
+            if change > threshold:
+                regressions.append(f"{entry['model']} {metric} p50 {before} -> {after} ms ({change:+.0%})")
+    return regressions
+
+
+def parse_int_list(value):
+    return [int(item) for item in value.split(',') if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency, throughput and memory benchmark for the shipped TFLite models")
+    parser.add_argument('--models', nargs='*', help="Model files (default: models/*.tflite)")
+    parser.add_argument('--iterations', type=int, default=50, help="Timed invokes per measurement")
+    parser.add_argument('--warmup', type=int, default=5, help="Untimed invokes before each measurement")
+    parser.add_argument('--preprocess-iterations', type=int, default=10)
+    parser.add_argument('--batch-sizes', type=parse_int_list, default=[1, 4, 8])
+    parser.add_argument('--threads', type=parse_int_list, default=[1, 2, 4], help="First value is used for the latency run")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    parser.add_argument('--compare', help="Previous JSON result to compare against")
+    parser.add_argument('--regression-threshold', type=float, default=0.10, help="Allowed p50 slowdown ratio")
+    args = parser.parse_args()
+
+    model_paths = args.models or sorted(glob.glob(os.path.join('models', '*.tflite')))
+    if not model_paths:
+        parser.error("No .tflite models found")
+
+    options = {
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "preprocess_iterations": args.preprocess_iterations,
+        "batch_sizes": args.batch_sizes,
+        "threads": args.threads,
+        "photo": synthetic_photo()
+    }
+
+    results = {
+        "environment": environment_info(),
+        "settings": {key: value for key, value in options.items() if key != "photo"},
+        "models": [run_isolated(model_path, options) for model_path in model_paths]
+    }
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.regression_threshold)
+        results["regressions"] = regressions
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+    if regressions:
+        print("\n".join(["Regressions:"] + regressions), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
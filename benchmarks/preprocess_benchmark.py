@@ -0,0 +1,160 @@
+"""
+Ön işleme mikro benchmark'ı
+Eski preprocess_image_for_tflite ile yeni hattı görüntü başına gecikme ve
+tepe bellek açısından karşılaştırır
+
+Kullanım:
+    python -m benchmarks.preprocess_benchmark
+    python -m benchmarks.preprocess_benchmark --images path/to/photos --repeat 20
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import time
+import tracemalloc
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from services.image_preprocessing import preprocess_image
+
+
+def legacy_preprocess(image_data, target_size=(224, 224)):
+    """Eski ön işleme (karşılaştırma için birebir kopya)"""
+    image = Image.open(BytesIO(image_data))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    image = image.resize(target_size)
+    image_array = np.array(image, dtype=np.float32) / 255.0
+    return np.expand_dims(image_array, axis=0)
+
+
+def optimized_preprocess(image_data):
+    return preprocess_image(image_data)
+
+
+VARIANTS = {
+    "legacy": legacy_preprocess,
+    "optimized": optimized_preprocess
+}
+
+
+def synthetic_photo(width=4032, height=3024, quality=90):
+    """Telefon kamerası boyutunda sentetik JPEG üret"""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 40, size=(height, width), dtype=np.uint8)
+    pixels = np.stack([
+        (x + y) / 2 + noise,
+        np.broadcast_to(x, (height, width)) * 0.8 + noise,
+        np.broadcast_to(y, (height, width)) * 0.6 + noise
+    ], axis=-1).clip(0, 255).astype(np.uint8)
+
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def load_images(image_dir):
+    images = []
+    for name in sorted(os.listdir(image_dir)):
+        if name.lower().endswith(('.jpg', '.jpeg', '.png', '.webp')):
+            with open(os.path.join(image_dir, name), 'rb') as f:
+                images.append(f.read())
+    return images
+
+
+def measure_latency(fn, images, repeat):
+    """Görüntü başına gecikme (ms) ve Python/numpy tepe ayırımı (tracemalloc)"""
+    fn(images[0])  # Isınma
+
+    samples = []
+    for _ in range(repeat):
+        for image_data in images:
+            start = time.perf_counter()
+            fn(image_data)
+            samples.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    for image_data in images:
+        fn(image_data)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "images": len(images),
+        "samples": len(samples),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "traced_peak_kb": round(traced_peak / 1024, 1)
+    }
+
+
+def read_peak_rss_kb():
+    """Sürecin tepe RSS değeri (KB) - Linux'ta VmHWM, diğerlerinde ru_maxrss"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _peak_rss_child(variant, images, conn):
+    """Yeni süreçte tek varyantı çalıştır ve tepe RSS'i bildir (PIL C ayırımları dahil)"""
+    baseline = read_peak_rss_kb()
+    for image_data in images:
+        VARIANTS[variant](image_data)
+    peak = read_peak_rss_kb()
+    conn.send({"peak_rss_kb": peak, "peak_rss_delta_kb": peak - baseline})
+    conn.close()
+
+
+def measure_peak_rss(variant, images):
+    ctx = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = ctx.Pipe()
+    process = ctx.Process(target=_peak_rss_child, args=(variant, images, child_conn))
+    process.start()
+    result = parent_conn.recv()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocessing micro-benchmark (legacy vs optimized)")
+    parser.add_argument('--images', help="Directory with sample photos (default: synthetic 12 MP JPEG)")
+    parser.add_argument('--repeat', type=int, default=10, help="Passes over the image set")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    images = load_images(args.images) if args.images else [synthetic_photo()]
+    if not images:
+        parser.error(f"No images found in {args.images}")
+
+    results = {}
+    for variant, fn in VARIANTS.items():
+        results[variant] = measure_latency(fn, images, args.repeat)
+        results[variant].update(measure_peak_rss(variant, images))
+
+    legacy, optimized = results["legacy"], results["optimized"]
+    results["speedup_p50"] = round(legacy["p50_ms"] / optimized["p50_ms"], 2) if optimized["p50_ms"] else None
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # .env dosyasını yükle
@@ -29,9 +30,176 @@ class Config:
         'Sukulent': 'models/sukulent.tflite'
     }
     
+    # TFLite backend: auto | litert | tflite_runtime | tensorflow
+    # auto: ai_edge_litert > tflite_runtime > tensorflow (tam TF en son çare)
+    TFLITE_BACKEND = os.environ.get('TFLITE_BACKEND', 'auto')
+    
+    # XNNPACK ağırlıkları model yükleyen her süreçte özel belleğe yeniden paketler
+    # (bellek = süreç sayısı x model boyutu); kapalıyken ağırlıklar paylaşılan mmap'te kalır
+    # auto (varsayılan): tek süreçte açık; WEB_CONCURRENCY>1 ya da çok süreçli havuzda kapalı
+    # true/false: zorla aç/kapat (true: daha hızlı invoke, worker başına daha fazla bellek)
+    TFLITE_USE_XNNPACK = {'true': True, 'false': False}.get(
+        os.environ.get('TFLITE_USE_XNNPACK', 'auto').lower(),
+        int(os.environ.get('WEB_CONCURRENCY', 1)) * (
+            int(os.environ.get('MODEL_PROCESS_POOL_SIZE', 2))
+            if os.environ.get('MODEL_EXECUTION_MODE', 'inline') == 'process' else 1
+        ) <= 1
+    )
+    
+    # Gunicorn preload modu (gunicorn.conf.py ayarlar) - modeller fork sonrası worker'da yüklenir
+    PRELOAD_APP = os.environ.get('PRELOAD_APP', 'false').lower() == 'true'
+    
+    # Model kayıt defteri bellek bütçesi (MB) - aşılırsa az kullanılan özel modeller çıkarılır
+    MODEL_MEMORY_BUDGET_MB = int(os.environ.get('MODEL_MEMORY_BUDGET_MB', 64))
+    
+    # Interpreter havuzu - model başına eşzamanlı inference sayısı
+    # gthread gibi thread'li worker'larda aynı interpreter paylaşılamaz
+    INTERPRETER_POOL_SIZE = int(os.environ.get('INTERPRETER_POOL_SIZE', 2))
+    INTERPRETER_POOL_SIZES = {
+        # Model bazlı özel değerler, ör: 'plant_type': 4, 'Aloe Vera': 1
+    }
+    INTERPRETER_POOL_TIMEOUT_SECONDS = float(os.environ.get('INTERPRETER_POOL_TIMEOUT_SECONDS', 10))
+    
+    # Interpreter thread sayısı: boş = backend varsayılanı, sayı = sabit, 'auto' = başlangıçta kalibrasyon
+    # Kalibrasyon çekirdekleri WEB_CONCURRENCY worker'ı (ve süreç havuzu) arasında paylaştırır
+    INTERPRETER_NUM_THREADS = os.environ.get('INTERPRETER_NUM_THREADS', '')
+    INTERPRETER_NUM_THREADS_PER_MODEL = {
+        # Model bazlı özel değerler, ör: 'plant_type': 1, 'Barış Çiçeği': 'auto'
+    }
+    # latency: tek invoke'un medyan süresi | throughput: havuzdaki tüm interpreter'lar aynı anda
+    # çalışırken saniyedeki invoke sayısı (havuz boyutu x thread sayısı birlikte ölçülür)
+    THREAD_CALIBRATION_OBJECTIVE = os.environ.get('THREAD_CALIBRATION_OBJECTIVE', 'latency')
+    THREAD_CALIBRATION_ITERATIONS = int(os.environ.get('THREAD_CALIBRATION_ITERATIONS', 10))
+    # Daha fazla thread ancak bu oranda hızlıysa seçilir (gürültüye karşı)
+    THREAD_CALIBRATION_MIN_GAIN = float(os.environ.get('THREAD_CALIBRATION_MIN_GAIN', 0.1))
+    # Worker'lar kalibrasyonu bu dosya üzerinden paylaşır (boş = her worker kendisi ölçer)
+    THREAD_CALIBRATION_CACHE_PATH = os.environ.get(
+        'THREAD_CALIBRATION_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'plant_thread_calibration.json')
+    )
+    
+    # Mikro-batch inference - aynı modele gelen istekler kısa pencerede toplanır
+    # Thread'li worker'larda (gthread) anlamlıdır, sync worker'da sadece bekleme ekler
+    INFERENCE_BATCHING_ENABLED = os.environ.get('INFERENCE_BATCHING_ENABLED', 'false').lower() == 'true'
+    INFERENCE_MAX_BATCH_SIZE = int(os.environ.get('INFERENCE_MAX_BATCH_SIZE', 8))
+    INFERENCE_MAX_WAIT_MS = float(os.environ.get('INFERENCE_MAX_WAIT_MS', 5))
+    INFERENCE_BATCH_WORKERS = int(os.environ.get('INFERENCE_BATCH_WORKERS', 1))
+    
+    # Inference sonuç önbelleği - aynı fotoğraf tekrar gönderilince model çalışmaz
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+    RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 1024))
+    RESULT_CACHE_TTL_SECONDS = int(os.environ.get('RESULT_CACHE_TTL_SECONDS', 3600))
+    # Algısal hash (dHash) ile neredeyse aynı fotoğrafları da eşleştir
+    RESULT_CACHE_PHASH_ENABLED = os.environ.get('RESULT_CACHE_PHASH_ENABLED', 'false').lower() == 'true'
+    RESULT_CACHE_PHASH_MAX_DISTANCE = int(os.environ.get('RESULT_CACHE_PHASH_MAX_DISTANCE', 4))
+    
+    # Başlangıçta modelleri sentetik girişle ısıt; bitene kadar /ready 503 döner
+    MODEL_WARMUP_ENABLED = os.environ.get('MODEL_WARMUP_ENABLED', 'true').lower() == 'true'
+    MODEL_WARMUP_ITERATIONS = int(os.environ.get('MODEL_WARMUP_ITERATIONS', 2))
+    MODEL_WARMUP_PARALLELISM = int(os.environ.get('MODEL_WARMUP_PARALLELISM', 2))
+    # Çekirdek modellere ek olarak başlangıçta yüklenip ısıtılacak özel modeller (virgülle,
+    # ör. "Aloe Vera"). Diğerleri ilk kullanımda yüklenir - bellek bütçesi/LRU korunur
+    MODEL_WARMUP_SPECIFIC_MODELS = [
+        name.strip() for name in os.environ.get('MODEL_WARMUP_SPECIFIC_MODELS', '').split(',') if name.strip()
+    ]
+    
+    # Model dosyaları değişince sıcak yeniden yükleme (saniye, 0 = kapalı)
+    # Yeni dosya geçici isimle yazılıp rename ile değiştirilmelidir. Varsayılan kapalı:
+    # izleyici her worker ve model sürecinde ayrı çalışır, her biri farklı anda yükler
+    # ve worker'lar bir süre farklı sürümler sunar. Üretimde POST /api/admin/reload-models
+    # tercih edilmeli; açılacaksa tek worker'lı kurulumda kullanılmalı
+    MODEL_RELOAD_POLL_SECONDS = float(os.environ.get('MODEL_RELOAD_POLL_SECONDS', 0))
+    MODEL_RELOAD_SETTLE_SECONDS = float(os.environ.get('MODEL_RELOAD_SETTLE_SECONDS', 5))
+    # POST /api/admin/reload-models bu dosyadaki nesli artırır; aynı makinedeki her worker
+    # dosyayı MODEL_RELOAD_MARKER_POLL_SECONDS'ta bir kontrol edip yeniden yüklemeyi uygular
+    # (0 = kapalı, endpoint sadece isteği alan worker'ı yeniden yükler)
+    MODEL_RELOAD_MARKER_PATH = os.environ.get(
+        'MODEL_RELOAD_MARKER_PATH', os.path.join(tempfile.gettempdir(), 'plant_model_reload.json')
+    )
+    MODEL_RELOAD_MARKER_POLL_SECONDS = float(os.environ.get('MODEL_RELOAD_MARKER_POLL_SECONDS', 2))
+    
+    # Yönetim endpoint'leri için token (X-Admin-Token header'ı) - boşsa endpoint'ler kapalı
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+    
+    # Model çalıştırma modu: inline (istek thread'inde) | process (ayrı süreç havuzu)
+    # process modunda ESP32 route'ları inference yoğunluğunda da yanıt verir;
+    # bunun için worker'ın thread'li olması gerekir (GUNICORN_THREADS > 1)
+    MODEL_EXECUTION_MODE = os.environ.get('MODEL_EXECUTION_MODE', 'inline')
+    MODEL_PROCESS_POOL_SIZE = int(os.environ.get('MODEL_PROCESS_POOL_SIZE', 2))
+    MODEL_PROCESS_MAX_PENDING = int(os.environ.get('MODEL_PROCESS_MAX_PENDING', 8))
+    MODEL_PROCESS_TIMEOUT_SECONDS = float(os.environ.get('MODEL_PROCESS_TIMEOUT_SECONDS', 30))
+    MODEL_PROCESS_STARTUP_TIMEOUT_SECONDS = float(os.environ.get('MODEL_PROCESS_STARTUP_TIMEOUT_SECONDS', 120))
+    MODEL_PROCESS_STATUS_TIMEOUT_SECONDS = float(os.environ.get('MODEL_PROCESS_STATUS_TIMEOUT_SECONDS', 2))
+    
+    # Arka plan görsel yükleme - yanıt Storage yüklemesini beklemez
+    UPLOAD_WORKERS = int(os.environ.get('UPLOAD_WORKERS', 2))
+    UPLOAD_QUEUE_SIZE = int(os.environ.get('UPLOAD_QUEUE_SIZE', 32))
+    UPLOAD_MAX_RETRIES = int(os.environ.get('UPLOAD_MAX_RETRIES', 3))
+    UPLOAD_RETRY_BACKOFF_SECONDS = float(os.environ.get('UPLOAD_RETRY_BACKOFF_SECONDS', 0.5))
+    # Kuyruk doluysa istek beklemez, 503 ve bu kadar saniyelik Retry-After döner
+    UPLOAD_RETRY_AFTER_SECONDS = int(os.environ.get('UPLOAD_RETRY_AFTER_SECONDS', 5))
+    UPLOAD_STATUS_RETENTION = int(os.environ.get('UPLOAD_STATUS_RETENTION', 1000))
+    UPLOAD_SHUTDOWN_TIMEOUT_SECONDS = float(os.environ.get('UPLOAD_SHUTDOWN_TIMEOUT_SECONDS', 10))
+    
+    # Sensör/nem/sulama kayıtları için write-behind tamponu - ESP32 istekleri
+    # Firestore'u beklemez, kayıtlar WriteBatch ile toplu yazılır
+    WRITE_BUFFER_ENABLED = os.environ.get('WRITE_BUFFER_ENABLED', 'true').lower() == 'true'
+    # Her batch'e bir commit işareti eklenir - Firestore'un 500 sınırı için en fazla 499 kayıt
+    WRITE_BUFFER_MAX_BATCH = int(os.environ.get('WRITE_BUFFER_MAX_BATCH', 499))
+    WRITE_BUFFER_FLUSH_INTERVAL_SECONDS = float(os.environ.get('WRITE_BUFFER_FLUSH_INTERVAL_SECONDS', 1.0))
+    # Bu kadar kayıt birikirse çağıran thread'de tek commit denemesi yapılır (backpressure);
+    # flusher o an commit ediyorsa en eski kayıtlar atılır
+    WRITE_BUFFER_MAX_PENDING = int(os.environ.get('WRITE_BUFFER_MAX_PENDING', 5000))
+    # Denemeleri tükenen batch max_pending sınırında kuyruğa geri konur
+    WRITE_BUFFER_MAX_RETRIES = int(os.environ.get('WRITE_BUFFER_MAX_RETRIES', 5))
+    WRITE_BUFFER_RETRY_BACKOFF_SECONDS = float(os.environ.get('WRITE_BUFFER_RETRY_BACKOFF_SECONDS', 0.5))
+    # Yeniden denemeleri tükenen batch en fazla bu kadar kez kuyruğun başına geri konur,
+    # sonra atılır (dead_lettered_writes) - kalıcı hata veren batch kuyruğu tıkamaz
+    WRITE_BUFFER_MAX_REQUEUES = int(os.environ.get('WRITE_BUFFER_MAX_REQUEUES', 3))
+    WRITE_BUFFER_SHUTDOWN_TIMEOUT_SECONDS = float(os.environ.get('WRITE_BUFFER_SHUTDOWN_TIMEOUT_SECONDS', 10))
+    
+    # Bitki profili okuma önbelleği - yazmalarda güncellenir/geçersiz kılınır
+    PROFILE_CACHE_ENABLED = os.environ.get('PROFILE_CACHE_ENABLED', 'true').lower() == 'true'
+    PROFILE_CACHE_TTL_SECONDS = float(os.environ.get('PROFILE_CACHE_TTL_SECONDS', 60))
+    PROFILE_CACHE_MAX_ENTRIES = int(os.environ.get('PROFILE_CACHE_MAX_ENTRIES', 256))
+    # Firestore on_snapshot ile diğer worker'ların yazmalarını da takip et
+    PROFILE_CACHE_LISTENER_ENABLED = os.environ.get('PROFILE_CACHE_LISTENER_ENABLED', 'false').lower() == 'true'
+    # Dinleyici aktifken TTL bu katsayıyla uzatılır
+    PROFILE_CACHE_LISTENER_TTL_MULTIPLIER = int(os.environ.get('PROFILE_CACHE_LISTENER_TTL_MULTIPLIER', 10))
+    
+    # sensor-data okumalarında 5dk/saatlik/günlük özet kovalarını güncelle
+    # (moisture-history?resolution=5m|1h|1d bu kovaları okur)
+    SENSOR_ROLLUPS_ENABLED = os.environ.get('SENSOR_ROLLUPS_ENABLED', 'true').lower() == 'true'
+    
+    # Geçmiş endpoint'lerinde sayfa başına en fazla kayıt (sonraki sayfa için cursor)
+    HISTORY_MAX_PAGE_SIZE = int(os.environ.get('HISTORY_MAX_PAGE_SIZE', 200))
+    
+    # Storage'a yüklenen görseller: liste için thumbnail, opsiyonel küçültülmüş analiz
+    # kopyası ve (istenirse) telefonun orijinal fotoğrafı
+    IMAGE_STORE_ORIGINAL = os.environ.get('IMAGE_STORE_ORIGINAL', 'true').lower() == 'true'
+    IMAGE_THUMBNAIL_SIZE = int(os.environ.get('IMAGE_THUMBNAIL_SIZE', 320))
+    IMAGE_THUMBNAIL_FORMAT = os.environ.get('IMAGE_THUMBNAIL_FORMAT', 'WEBP')  # WEBP | JPEG
+    IMAGE_THUMBNAIL_QUALITY = int(os.environ.get('IMAGE_THUMBNAIL_QUALITY', 75))
+    IMAGE_ANALYSIS_COPY_ENABLED = os.environ.get('IMAGE_ANALYSIS_COPY_ENABLED', 'true').lower() == 'true'
+    IMAGE_ANALYSIS_MAX_SIZE = int(os.environ.get('IMAGE_ANALYSIS_MAX_SIZE', 1024))
+    IMAGE_ANALYSIS_FORMAT = os.environ.get('IMAGE_ANALYSIS_FORMAT', 'JPEG')
+    IMAGE_ANALYSIS_QUALITY = int(os.environ.get('IMAGE_ANALYSIS_QUALITY', 85))
+    
     # Hastalık tespit eşik değeri
     DISEASE_THRESHOLD = 0.85  # %85 üstü hasta kabul edilir
     
+    # Kaskad hastalık tespiti: önce genel model, olasılık eşiğin ± bandı içinde
+    # kalırsa (belirsiz) özel model de çalıştırılır; net sonuçlarda özel model atlanır
+    DISEASE_CASCADE_ENABLED = os.environ.get('DISEASE_CASCADE_ENABLED', 'false').lower() == 'true'
+    DISEASE_CASCADE_BAND = float(os.environ.get('DISEASE_CASCADE_BAND', 0.15))
+    
+    # Döşemeli hastalık tespiti (check-disease isteğinde tiled=true)
+    # Fotoğraf örtüşen karelere bölünür, kareler batch halinde modele verilir
+    TILED_INFERENCE_MAX_TILES = int(os.environ.get('TILED_INFERENCE_MAX_TILES', 9))
+    TILED_INFERENCE_OVERLAP = float(os.environ.get('TILED_INFERENCE_OVERLAP', 0.25))
+    TILED_INFERENCE_BATCH_SIZE = int(os.environ.get('TILED_INFERENCE_BATCH_SIZE', 9))
+    # max: tek hastalıklı kare yeterli | mean: kareler ortalaması
+    TILED_INFERENCE_AGGREGATION = os.environ.get('TILED_INFERENCE_AGGREGATION', 'max')
+    
     # Genişletilmiş Türkçe bitki listesi
     AVAILABLE_PLANTS = [
         # Orijinal liste
@@ -184,4 +352,22 @@ class Config:
     
     # Diğer ayarlar
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    
+    # Görsel yükleme doğrulaması - baytlar belleğe okunmadan önce kontrol edilir
+    IMAGE_ALLOWED_FORMATS = os.environ.get('IMAGE_ALLOWED_FORMATS', 'JPEG,PNG,WEBP').upper().split(',')
+    IMAGE_MAX_UPLOAD_BYTES = int(os.environ.get('IMAGE_MAX_UPLOAD_BYTES', MAX_CONTENT_LENGTH))
+    # Başlıktaki genişlik*yükseklik bu sınırı aşarsa decode edilmeden reddedilir (sıkıştırma bombası)
+    IMAGE_MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS', 50_000_000))
+    # Werkzeug 500 KB'ı aşan gövdeleri geçici dosyada tutar; bu boyutu aşan görseller
+    # belleğe okunmaz, dosya salt okunur eşlenir (mmap) - sayfalar dosya destekli kalır
+    UPLOAD_MMAP_MIN_BYTES = int(os.environ.get('UPLOAD_MMAP_MIN_BYTES', 512 * 1024))
+    # Görsel route'larında istek boyunca süreç RSS değişimi ve tepe RSS X-*-RSS-MB header'larında döner
+    REQUEST_MEMORY_TRACKING_ENABLED = os.environ.get('REQUEST_MEMORY_TRACKING_ENABLED', 'true').lower() == 'true'
+    # İstek başında tepe RSS sayacı (VmHWM) sıfırlanır, böylece tepe değer o isteğe aittir.
+    # Sadece tek thread'li (sync) worker'da doğrudur - thread'li worker'da eşzamanlı istekler
+    # birbirinin tepesini siler, bu yüzden GUNICORN_THREADS > 1 iken kapalıdır ve tepe header'ı dönmez
+    # (Flask geliştirme sunucusu da thread'lidir; ölçüm için gunicorn sync worker kullanılmalı)
+    REQUEST_PEAK_RSS_RESET = os.environ.get(
+        'REQUEST_PEAK_RSS_RESET', str(int(os.environ.get('GUNICORN_THREADS', 1)) <= 1)
+    ).lower() == 'true'
     UPLOAD_FOLDER = 'uploads'
@@ -0,0 +1,36 @@
+"""
+Gunicorn ayarları
+Preload modunda uygulama master süreçte bir kez import edilir; worker'lar
+fork ile kod sayfalarını paylaşır. Modeller fork sonrası her worker'da
+model_path ile yüklenir, TFLite model dosyasını mmap'lediği için ağırlık
+sayfaları işletim sistemi sayfa önbelleğinde tüm worker'lar arasında paylaşılır.
+XNNPACK açıkken ağırlıklar her worker'da özel belleğe yeniden paketlenir ve bu
+paylaşım kaybolur; bu yüzden TFLITE_USE_XNNPACK=auto WEB_CONCURRENCY>1 iken
+XNNPACK'i kapatır (bkz. README)
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+
+preload_app = os.environ.get('PRELOAD_APP', 'true').lower() == 'true'
+
+# Config sınıfı bu değeri okur - ayar dosyası uygulamadan önce çalışır
+os.environ['PRELOAD_APP'] = 'true' if preload_app else 'false'
+
+
+def post_fork(server, worker):
+    """Preload modunda modelleri worker içinde yükle (interpreter'lar fork'tan sağ çıkmaz)"""
+    if preload_app:
+        from app import app, initialize_worker
+        initialize_worker(app)
+
+
+def worker_exit(server, worker):
+    """Worker kapanırken tampondaki Firestore yazmalarını gönder (atexit'e kalmadan)"""
+    from services.write_buffer import flush_write_buffer
+    flush_write_buffer()
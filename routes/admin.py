@@ -0,0 +1,81 @@
+"""
+Yönetim route'ları
+X-Admin-Token header'ı Config.ADMIN_TOKEN ile eşleşmelidir; token ayarlı değilse kapalıdır
+"""
+
+from flask import Blueprint, request, jsonify
+from datetime import datetime
+import hmac
+import logging
+
+# Blueprint oluştur
+admin_bp = Blueprint('admin', __name__)
+logger = logging.getLogger(__name__)
+
+def check_admin_token():
+    """Yetkisizse (yanıt, status) döndür, yetkiliyse None"""
+    from config import Config
+    
+    if not Config.ADMIN_TOKEN:
+        return jsonify({
+            "status": "error",
+            "message": "Admin endpoints are disabled (ADMIN_TOKEN not set)"
+        }), 403
+    
+    token = request.headers.get('X-Admin-Token', '')
+    if not hmac.compare_digest(token.encode(), Config.ADMIN_TOKEN.encode()):
+        return jsonify({
+            "status": "error",
+            "message": "Invalid admin token"
+        }), 401
+    
+    return None
+
+@admin_bp.route('/admin/reload-models', methods=['POST'])
+def reload_models():
+    """
+    Modelleri sıcak olarak yeniden yükle
+    Body (opsiyonel): {"models": ["plant_type", "Aloe Vera"], "force": false}
+    İstek paylaşılan işaretin neslini artırır: bu worker hemen, diğer worker'lar
+    MODEL_RELOAD_MARKER_POLL_SECONDS içinde yükler. Sonuçlar bu worker'a aittir;
+    worker başına sürümler /api/system-status içindeki model_reload alanındadır
+    """
+    unauthorized = check_admin_token()
+    if unauthorized:
+        return unauthorized
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        models = data.get('models')
+        force = bool(data.get('force', False))
+        
+        from services.model_service import get_model_service
+        from services.model_reloader import request_reload, get_reload_marker_watcher, get_reload_status
+        
+        watcher = get_reload_marker_watcher()
+        if watcher is None:
+            # İşaret kapalı - sadece bu worker yeniden yüklenir
+            result = get_model_service().reload_models(models, force)
+        else:
+            marker = request_reload(models, force)
+            # İzleyici bu nesli az önce uyguladıysa sonucu onun kaydından alınır
+            result = watcher.check() or {"status": "success", "results": watcher.last_results}
+            result["generation"] = marker["generation"]
+            result["model_reload"] = get_reload_status()
+        
+        if "error" in result:
+            return jsonify({
+                "status": "error",
+                "message": result["error"]
+            }), 500
+        
+        logger.info(f"🔄 Admin model reload: {[(r['model'], r['status']) for r in result['results']]}")
+        result["timestamp"] = datetime.now().isoformat()
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Error reloading models: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
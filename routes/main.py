@@ -23,6 +23,8 @@ def home():
             "plant_management": {
                 "get_plants": "GET /api/plants",
                 "identify_plant": "POST /api/identify-plant",
+                "identify_and_diagnose": "POST /api/identify-and-diagnose",
+                "upload_status": "GET /api/uploads/<upload_id>",
                 "plant_selection": "POST /api/plant-selection",
                 "plant_profile": "GET/POST /api/plant-profile",
                 "plant_settings": "GET/PUT /api/plant-settings"
@@ -43,6 +45,8 @@ def home():
             },
             "system": {
                 "health_check": "GET /health",
+                "readiness": "GET /ready",
+                "reload_models": "POST /api/admin/reload-models",
                 "system_status": "GET /api/system-status"
             }
         }
@@ -52,16 +56,14 @@ def home():
 def health_check():
     """Flutter için sistem sağlık kontrolü"""
     try:
-        from services.model_service import ModelService
-        from services.firebase_service import FirebaseService
+        from services.model_service import get_model_service
+        from services.firebase_service import get_firebase_service
         
-        model_service = ModelService()
-        firebase_service = FirebaseService()
+        model_service = get_model_service()
+        firebase_service = get_firebase_service()
         
         # Model durumları
-        models_loaded = len(model_service.specific_disease_interpreters)
-        plant_model_ready = model_service.plant_type_interpreter is not None
-        disease_model_ready = model_service.general_disease_interpreter is not None
+        model_status = model_service.get_model_status()
         
         # Firebase durumu
         firebase_connected = firebase_service.db is not None
@@ -71,9 +73,11 @@ def health_check():
             "timestamp": datetime.now().isoformat(),
             "services": {
                 "ai_models": {
-                    "plant_identification": plant_model_ready,
-                    "disease_detection": disease_model_ready,
-                    "specific_models_count": models_loaded,
+                    "plant_identification": model_status["plant_identification"],
+                    "disease_detection": model_status["disease_detection"],
+                    "specific_models_count": len(model_status["available_specific_models"]),
+                    "loaded_specific_models_count": len(model_status["loaded_specific_models"]),
+                    "model_versions": model_status.get("model_versions", {}),
                     "total_plants_supported": len(model_service.get_available_plants().get("plants", []))
                 },
                 "database": {
@@ -97,18 +101,35 @@ def health_check():
             "flutter_compatible": True
         }), 500
 
+@main_bp.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe - modeller ısınana kadar 503 döner"""
+    from services.model_warmup import readiness
+    
+    state = readiness.to_dict()
+    state["timestamp"] = datetime.now().isoformat()
+    return jsonify(state), 200 if state["ready"] else 503
+
 @main_bp.route('/api/system-status', methods=['GET'])
 def system_status():
     """Flutter için detaylı sistem durumu"""
     try:
-        from services.model_service import ModelService
-        from services.firebase_service import FirebaseService
+        from services.model_service import get_model_service
+        from services.firebase_service import get_firebase_service
         from services.moisture_service import MoistureService
+        from services.memory_report import get_memory_report
+        from services.model_warmup import readiness
+        from services.model_reloader import get_reload_status
+        from services.background_uploader import get_background_uploader
+        from services.upload_validation import get_upload_stats
+        from services.write_buffer import get_write_buffer
         
-        model_service = ModelService()
-        firebase_service = FirebaseService()
+        model_service = get_model_service()
+        firebase_service = get_firebase_service()
         moisture_service = MoistureService()
         
+        model_status = model_service.get_model_status()
+        
         return jsonify({
             "status": "success",
             "timestamp": datetime.now().isoformat(),
@@ -118,11 +139,21 @@ def system_status():
                 "mode": "single_user_single_plant"
             },
             "ai_capabilities": {
-                "plant_identification_available": model_service.plant_type_interpreter is not None,
-                "disease_detection_available": model_service.general_disease_interpreter is not None,
+                "plant_identification_available": model_status["plant_identification"],
+                "disease_detection_available": model_status["disease_detection"],
                 "supported_plants": len(model_service.get_available_plants().get("plants", [])),
-                "specific_disease_models": list(model_service.specific_disease_interpreters.keys())
+                "specific_disease_models": model_status["available_specific_models"],
+                "loaded_specific_models": model_status["loaded_specific_models"],
+                "model_versions": model_status.get("model_versions", {}),
+                "model_registry": model_status["registry"],
+                "model_reload": get_reload_status(),
+                "warmup": readiness.to_dict()
             },
+            "worker_memory": get_memory_report(),
+            "image_uploads": get_background_uploader().get_metrics(),
+            "upload_validation": get_upload_stats(),
+            "firestore": firebase_service.get_metrics(),
+            "write_buffer": get_write_buffer().get_metrics(),
             "connectivity": {
                 "firebase_status": "connected" if firebase_service.db else "mock_mode",
                 "esp32_status": "ready_for_connection"
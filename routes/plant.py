@@ -4,7 +4,7 @@ Bitki türü tespiti ve hastalık kontrolü
 Tek kullanıcı sistemi için optimize edildi
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from datetime import datetime
 import logging
 
@@ -12,12 +12,47 @@ import logging
 plant_bp = Blueprint('plant', __name__)
 logger = logging.getLogger(__name__)
 
+@plant_bp.before_request
+def track_request_memory():
+    """Görsel istekleri için süreç RSS ölçümünü başlat"""
+    from config import Config
+    if Config.REQUEST_MEMORY_TRACKING_ENABLED:
+        from services.memory_report import start_request_memory
+        g.request_memory = start_request_memory(reset_peak=Config.REQUEST_PEAK_RSS_RESET)
+
+@plant_bp.after_request
+def add_memory_headers(response):
+    """
+    İstek süresince süreç RSS değişimi ve istek boyunca tepe RSS - yük altında takip için
+    Tepe değer sadece sync worker'da (sayaç istek başında sıfırlandığında) döner
+    """
+    from services.memory_report import finish_request_memory
+    memory = finish_request_memory(g.pop('request_memory', None))
+    if memory is not None:
+        response.headers['X-Process-RSS-Delta-MB'] = str(memory["process_rss_delta_mb"])
+        if memory["request_peak_rss_mb"] is not None:
+            response.headers['X-Request-Peak-RSS-MB'] = str(memory["request_peak_rss_mb"])
+    return response
+
+def submit_image_upload(firebase_service, image_bytes, path, filename, content_type, record_collections):
+    """
+    Görseli arka plan yükleme kuyruğuna al
+    Kuyruk doluysa model sonucu atılmaz: yükleme "skipped" döner, kayıt görselsiz kaydedilir
+    """
+    from services.background_uploader import get_background_uploader, skipped_upload, UploadQueueFullError
+    try:
+        return get_background_uploader().submit(
+            firebase_service, image_bytes, path, filename, content_type, record_collections=record_collections
+        )
+    except UploadQueueFullError:
+        return skipped_upload("Image upload queue was full, image was not stored")
+
 @plant_bp.route('/plants', methods=['GET'])
 def get_plants():
     """Seçilebilir bitki listesini döndür"""
     try:
-        from services.model_service import ModelService
-        model_service = ModelService()
+        from services.model_service import get_model_service
+        model_service = get_model_service()
         
         result = model_service.get_available_plants()
         return jsonify(result)
@@ -55,10 +90,19 @@ def identify_plant():
         logger.info(f"🔍 Plant identification requested for plant: {plant_id}")
         
         # Model ile tahmin yap
-        from services.model_service import ModelService
-        model_service = ModelService()
-        
-        result = model_service.predict_plant_type(image_file)
+        from services.model_service import get_model_service
+        model_service = get_model_service()
+        
+        # Görsel doğrulandıktan sonra bir kez okunur; model ve Storage aynı baytları kullanır
+        from services.upload_validation import validate_image_upload, UploadValidationError
+        try:
+            image_bytes, image_info = validate_image_upload(image_file)
+        except UploadValidationError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), e.status_code
+        result = model_service.predict_plant_type(image_bytes)
         
         if "error" in result:
             return jsonify({
@@ -67,21 +111,31 @@ def identify_plant():
             }), 500
         
         # Sonucu Firebase'e kaydet
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
-        # Görseli Firebase Storage'a yükle
-        image_url = firebase_service.upload_image(image_file, f"plant_identification")
+        # Görsel arka planda işlenip yüklenir, yanıt yüklemeyi beklemez
+        image_upload = submit_image_upload(
+            firebase_service, image_bytes, "plant_identification", image_file.filename, image_info["content_type"],
+            ('plant_identifications',)
+        )
         
         identification_record = {
             "plant_id": plant_id,
-            "image_url": image_url,
+            "image_url": image_upload["image_url"],
+            "image_upload_id": image_upload["upload_id"],
+            "thumbnail_url": image_upload["thumbnail_url"],
+            "image_files": image_upload["files"],
             "predictions": result.get("predictions"),
             "model_used": result.get("model_used"),
+            "model_version": result.get("model_version"),
             "timestamp": datetime.now().isoformat()
         }
-        firebase_service.save_plant_identification(identification_record)
+        firebase_service.save_plant_identification(identification_record, document_id=image_upload["upload_id"])
         
+        result["image_url"] = image_upload["image_url"]
+        result["thumbnail_url"] = image_upload["thumbnail_url"]
+        result["image_upload"] = image_upload
         return jsonify(result)
         
     except Exception as e:
@@ -108,14 +162,25 @@ def check_disease():
         image_file = request.files['image']
         plant_type = request.form.get('plant_type')
         plant_id = request.form.get('plant_id', 'main_plant')  # Tek bitki
+        # Yüksek çözünürlüklü fotoğraflarda küçük lezyonlar için karelere bölerek incele
+        tiled = request.form.get('tiled', 'false').lower() == 'true'
         
-        logger.info(f"🏥 Disease check requested for plant type: {plant_type}")
+        logger.info(f"🏥 Disease check requested for plant type: {plant_type}" + (" (tiled)" if tiled else ""))
         
         # Model ile hastalık tahmini
-        from services.model_service import ModelService
-        model_service = ModelService()
-        
-        result = model_service.predict_disease(image_file, plant_type)
+        from services.model_service import get_model_service
+        model_service = get_model_service()
+        
+        # Görsel doğrulandıktan sonra bir kez okunur; model ve Storage aynı baytları kullanır
+        from services.upload_validation import validate_image_upload, UploadValidationError
+        try:
+            image_bytes, image_info = validate_image_upload(image_file)
+        except UploadValidationError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), e.status_code
+        result = model_service.predict_disease(image_bytes, plant_type, tiled)
         
         if "error" in result:
             return jsonify({
@@ -124,24 +189,35 @@ def check_disease():
             }), 500
         
         # Sonucu Firebase'e kaydet
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
-        # Görseli Firebase Storage'a yükle
-        image_url = firebase_service.upload_image(image_file, f"disease_checks")
+        # Görsel arka planda işlenip yüklenir, yanıt yüklemeyi beklemez
+        image_upload = submit_image_upload(
+            firebase_service, image_bytes, "disease_checks", image_file.filename, image_info["content_type"],
+            ('disease_checks',)
+        )
         
         disease_record = {
             "plant_id": plant_id,
             "plant_type": plant_type,
-            "image_url": image_url,
+            "image_url": image_upload["image_url"],
+            "image_upload_id": image_upload["upload_id"],
+            "thumbnail_url": image_upload["thumbnail_url"],
+            "image_files": image_upload["files"],
             "is_healthy": result.get("is_healthy"),
             "disease_status": result.get("disease_status"),
             "confidence": result.get("confidence"),
             "model_used": result.get("model_used"),
+            "model_version": result.get("model_version"),
+            "tiling": result.get("tiling"),
             "timestamp": datetime.now().isoformat()
         }
-        firebase_service.save_disease_check(disease_record)
+        firebase_service.save_disease_check(disease_record, document_id=image_upload["upload_id"])
         
+        result["image_url"] = image_upload["image_url"]
+        result["thumbnail_url"] = image_upload["thumbnail_url"]
+        result["image_upload"] = image_upload
         return jsonify(result)
         
     except Exception as e:
@@ -151,6 +227,124 @@ def check_disease():
             "message": f"Disease check failed: {str(e)}"
         }), 500
 
+@plant_bp.route('/identify-and-diagnose', methods=['POST'])
+def identify_and_diagnose():
+    """
+    Tür tespiti + hastalık kontrolü tek istekte
+    Görsel bir kez yüklenir ve bir kez decode edilir
+    """
+    try:
+        # Dosya kontrolü
+        if 'image' not in request.files:
+            return jsonify({
+                "status": "error",
+                "message": "No image file provided"
+            }), 400
+        
+        image_file = request.files['image']
+        plant_id = request.form.get('plant_id', 'main_plant')  # Tek bitki
+        
+        if image_file.filename == '':
+            return jsonify({
+                "status": "error", 
+                "message": "No image selected"
+            }), 400
+        
+        logger.info(f"🔍🏥 Combined identification and disease check requested for plant: {plant_id}")
+        
+        from services.model_service import get_model_service
+        model_service = get_model_service()
+        
+        # Görsel doğrulandıktan sonra bir kez okunur; model ve Storage aynı baytları kullanır
+        from services.upload_validation import validate_image_upload, UploadValidationError
+        try:
+            image_bytes, image_info = validate_image_upload(image_file)
+        except UploadValidationError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), e.status_code
+        result = model_service.identify_and_diagnose(image_bytes)
+        
+        if "error" in result:
+            return jsonify({
+                "status": "error",
+                "message": result["error"]
+            }), 500
+        
+        # Sonuçları Firebase'e kaydet - görsel bir kez yüklenir
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
+        
+        image_upload = submit_image_upload(
+            firebase_service, image_bytes, "plant_analysis", image_file.filename, image_info["content_type"],
+            ('plant_identifications', 'disease_checks') if "error" not in result["diagnosis"] else ('plant_identifications',)
+        )
+        image_url = image_upload["image_url"]
+        timestamp = datetime.now().isoformat()
+        
+        identification = result["identification"]
+        firebase_service.save_plant_identification({
+            "plant_id": plant_id,
+            "image_url": image_url,
+            "image_upload_id": image_upload["upload_id"],
+            "thumbnail_url": image_upload["thumbnail_url"],
+            "image_files": image_upload["files"],
+            "predictions": identification.get("predictions"),
+            "model_used": identification.get("model_used"),
+            "model_version": identification.get("model_version"),
+            "timestamp": timestamp
+        }, document_id=image_upload["upload_id"])
+        
+        diagnosis = result["diagnosis"]
+        if "error" not in diagnosis:
+            firebase_service.save_disease_check({
+                "plant_id": plant_id,
+                "plant_type": result.get("plant_type"),
+                "image_url": image_url,
+                "image_upload_id": image_upload["upload_id"],
+                "thumbnail_url": image_upload["thumbnail_url"],
+                "image_files": image_upload["files"],
+                "is_healthy": diagnosis.get("is_healthy"),
+                "disease_status": diagnosis.get("disease_status"),
+                "confidence": diagnosis.get("confidence"),
+                "model_used": diagnosis.get("model_used"),
+                "model_version": diagnosis.get("model_version"),
+                "timestamp": timestamp
+            }, document_id=image_upload["upload_id"])
+        
+        result["image_url"] = image_url
+        result["thumbnail_url"] = image_upload["thumbnail_url"]
+        result["image_upload"] = image_upload
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Error in combined identification and diagnosis: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"Identify and diagnose failed: {str(e)}"
+        }), 500
+
+@plant_bp.route('/uploads/<upload_id>', methods=['GET'])
+def upload_status(upload_id):
+    """
+    Arka plan görsel yüklemesinin durumu (pending, uploading, uploaded, failed)
+    Tamamlanan yüklemeler Firestore'dan okunur - her worker aynı sonucu döner
+    """
+    from services.background_uploader import get_background_uploader
+    
+    status = get_background_uploader().get_status(upload_id)
+    if status is None:
+        return jsonify({
+            "status": "error",
+            "message": "Unknown upload id"
+        }), 404
+    
+    return jsonify({
+        "status": "success",
+        "upload": status
+    })
+
 @plant_bp.route('/plant-selection', methods=['POST'])
 def plant_selection():
     """Seçilen bitki türünü kaydet (tek kullanıcı)"""
@@ -185,8 +379,8 @@ def plant_selection():
         logger.info(f"🌱 Plant selected: {selected_plant}")
         
         # Firebase'e seçimi kaydet
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
         selection_record = {
             "plant_id": plant_id,
@@ -17,8 +17,8 @@ def get_plant_profile():
     try:
         plant_id = request.args.get('plant_id', 'main_plant')
         
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
         profile = firebase_service.get_plant_profile(plant_id)
         
@@ -64,8 +64,8 @@ def create_or_update_plant_profile():
         logger.info(f"🌱 Updating plant profile: {plant_name} ({plant_type})")
         
         # Firebase'e profil kaydet/güncelle
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
         profile_data = {
             "plant_id": plant_id,
@@ -116,8 +116,8 @@ def get_plant_settings():
     try:
         plant_id = request.args.get('plant_id', 'main_plant')
         
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
         profile = firebase_service.get_plant_profile(plant_id)
         
@@ -168,8 +168,8 @@ def update_plant_settings():
         logger.info(f"🔧 Updating plant settings for: {plant_id}")
         
         # Firebase'de ayarları güncelle
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
         # Sadece ayar alanlarını güncelle
         settings_data = {
@@ -32,8 +32,8 @@ def receive_pump_status():
         logger.info(f"📡 ESP32 pump status: {'ACTIVE' if pump_active else 'INACTIVE'} for plant {plant_id}")
         
         # Firebase'e kaydet
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
         if pump_active:
             # Pompa aktifse sulama geçmişine kaydet
@@ -123,8 +123,8 @@ def receive_sensor_data():
         logger.info(f"📊 Sensor data from {plant_id}: Moisture={moisture}%, Temp={temperature}°C, Humidity={humidity}%")
         
         # Firebase'e sensör verisini kaydet
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
         sensor_data = {
             "plant_id": plant_id,
@@ -136,6 +136,11 @@ def receive_sensor_data():
         }
         firebase_service.save_sensor_data(sensor_data)
         
+        # Grafikler için 5dk/saatlik/günlük özetler okuma anında güncellenir
+        from config import Config
+        if Config.SENSOR_ROLLUPS_ENABLED:
+            firebase_service.save_sensor_rollups(sensor_data)
+        
         return jsonify({
             "status": "success",
             "message": "Sensor data processed successfully",
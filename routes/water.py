@@ -41,8 +41,8 @@ def trigger_watering():
         }
         
         # Firebase'e manuel sulama geçmişine kaydet
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
         watering_data = {
             "plant_id": plant_id,
@@ -74,18 +74,28 @@ def trigger_watering():
 def get_watering_history():
     """Sulama geçmişini getir (tek kullanıcı sistemi)"""
     try:
-        limit = request.args.get('limit', 50, type=int)
+        from config import Config
+        limit = min(max(1, request.args.get('limit', 50, type=int)), Config.HISTORY_MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')  # Önceki yanıttaki next_cursor
         plant_id = request.args.get('plant_id', 'main_plant')
         
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
-        history = firebase_service.get_watering_history(plant_id, limit)
+        try:
+            history, next_cursor = firebase_service.get_watering_history(plant_id, limit, cursor)
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
         
         return jsonify({
             "status": "success",
             "watering_history": history,
             "total_records": len(history),
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
             "plant_id": plant_id,
             "limit": limit
         })
@@ -101,21 +111,36 @@ def get_watering_history():
 def get_moisture_history():
     """Nem geçmişini getir (tek kullanıcı sistemi)"""
     try:
-        limit = request.args.get('limit', 100, type=int)
+        from config import Config
+        limit = min(max(1, request.args.get('limit', 100, type=int)), Config.HISTORY_MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')  # Önceki yanıttaki next_cursor
         days = request.args.get('days', 7, type=int)  # Son X gün
+        # raw (varsayılan) ya da özet çözünürlüğü: 5m, 1h, 1d
+        resolution = request.args.get('resolution', 'raw')
         plant_id = request.args.get('plant_id', 'main_plant')
         
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
-        history = firebase_service.get_moisture_history(plant_id, limit, days)
+        try:
+            history, next_cursor = firebase_service.get_moisture_history(
+                plant_id, limit, days, cursor, None if resolution == 'raw' else resolution
+            )
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
         
         return jsonify({
             "status": "success",
             "moisture_history": history,
             "total_records": len(history),
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
             "plant_id": plant_id,
             "days_covered": days,
+            "resolution": resolution,
             "limit": limit
         })
     
@@ -130,18 +155,28 @@ def get_moisture_history():
 def get_disease_history():
     """Hastalık kontrol geçmişini getir (tek kullanıcı sistemi)"""
     try:
-        limit = request.args.get('limit', 50, type=int)
+        from config import Config
+        limit = min(max(1, request.args.get('limit', 50, type=int)), Config.HISTORY_MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')  # Önceki yanıttaki next_cursor
         plant_id = request.args.get('plant_id', 'main_plant')
         
-        from services.firebase_service import FirebaseService
-        firebase_service = FirebaseService()
+        from services.firebase_service import get_firebase_service
+        firebase_service = get_firebase_service()
         
-        history = firebase_service.get_disease_history(plant_id, limit)
+        try:
+            history, next_cursor = firebase_service.get_disease_history(plant_id, limit, cursor)
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
         
         return jsonify({
             "status": "success",
             "disease_history": history,
             "total_records": len(history),
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
             "plant_id": plant_id,
             "limit": limit
         })
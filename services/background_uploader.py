@@ -0,0 +1,290 @@
+"""
+Arka plan görsel yükleyici
+Görsel baytları bir kez okunur ve olduğu gibi kuyruğa alınır; varyantların
+(thumbnail, analiz kopyası) üretimi ve Storage yüklemesi sınırlı sayıda worker
+thread'inde yeniden denemelerle yapılır. Kuyruk doluysa istek beklemez,
+UploadQueueFullError fırlatılır; route model sonucunu görselsiz ("skipped")
+kaydedip döndürür. Sonuç image_uploads koleksiyonuna ve
+görseli kullanan analiz kayıtlarına yazılır - durum her worker'dan okunabilir
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from config import Config
+from services.image_storage import build_variants, planned_variants, variant_blob_name, primary_variant
+
+logger = logging.getLogger(__name__)
+
+
+class UploadQueueFullError(Exception):
+    """Yükleme kuyruğu dolu - istemci retry_after saniye sonra tekrar denemeli"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class UploadJob:
+    """Tek bir görselin ham baytları, yüklenecek dosyaları ve yükleme durumu"""
+
+    __slots__ = (
+        "id", "firebase_service", "image_bytes", "content_type", "blob_name", "blob_names", "files",
+        "record_collections", "state", "attempts", "error", "created_at", "finished_at"
+    )
+
+    def __init__(self, firebase_service, image_bytes, content_type, blob_name, record_collections=()):
+        self.id = uuid.uuid4().hex
+        self.firebase_service = firebase_service
+        self.image_bytes = image_bytes
+        self.content_type = content_type
+        self.blob_name = blob_name
+        self.record_collections = tuple(record_collections)
+        self.blob_names = {}
+        self.files = {}
+        # Varyant adları belirlidir - URL'ler decode etmeden, yanıttan önce hesaplanır
+        for name, variant_content_type, extension in planned_variants(content_type):
+            self._add_file(name, variant_content_type, extension)
+        self.state = "pending"
+        self.attempts = 0
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def _add_file(self, name, content_type, extension, **details):
+        self.blob_names[name] = variant_blob_name(self.blob_name, name, extension)
+        self.files[name] = dict(
+            {"content_type": content_type, "size_bytes": None, "width": None, "height": None},
+            url=self.firebase_service.image_public_url(self.blob_names[name]),
+            **details
+        )
+
+    def to_dict(self):
+        primary = primary_variant(self.files) or {}
+        thumbnail = self.files.get("thumbnail", primary)
+        return {
+            "upload_id": self.id,
+            "status": self.state,
+            "image_url": primary.get("url"),
+            "thumbnail_url": thumbnail.get("url"),
+            "files": self.files,
+            "attempts": self.attempts,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+def skipped_upload(reason):
+    """
+    Kuyruk dolu olduğu için hiç kuyruğa alınmayan görselin referansı
+    UploadJob.to_dict ile aynı biçim - analiz kaydı yine upload_id ile kaydedilir
+    """
+    return {
+        "upload_id": uuid.uuid4().hex,
+        "status": "skipped",
+        "image_url": None,
+        "thumbnail_url": None,
+        "files": {},
+        "attempts": 0,
+        "error": reason,
+        "created_at": time.time(),
+        "finished_at": None
+    }
+
+
+class BackgroundUploader:
+    """Sınırlı kuyruk + sınırlı eşzamanlılık ile Storage yükleyici"""
+
+    def __init__(self, workers=None, queue_size=None, max_retries=None):
+        self.workers = workers or Config.UPLOAD_WORKERS
+        self.queue_size = queue_size or Config.UPLOAD_QUEUE_SIZE
+        self.max_retries = max_retries if max_retries is not None else Config.UPLOAD_MAX_RETRIES
+
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # upload_id: UploadJob (bu süreçteki son UPLOAD_STATUS_RETENTION kayıt)
+        self._queue = None
+        self._pid = None
+
+        self._metrics = {
+            "submitted": 0,
+            "uploaded": 0,
+            "failed": 0,
+            "retries": 0,
+            "rejected_queue_full": 0,
+            "status_write_failures": 0,
+            "received_bytes": 0,
+            "stored_bytes": 0,
+            "total_variant_ms": 0.0,
+            "total_upload_ms": 0.0
+        }
+
+    def _ensure_workers(self):
+        """Thread'ler fork'tan sağ çıkmaz - süreç değiştiyse kuyruğu ve worker'ları yeniden kur"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._pid = os.getpid()
+            for i in range(self.workers):
+                threading.Thread(target=self._worker, name=f"uploader-{i}", daemon=True).start()
+
+    def submit(self, firebase_service, image_bytes, path, filename, content_type=None, record_collections=()):
+        """
+        Ham baytları kuyruğa al ve bekleyen görsel referansını hemen döndür
+        URL'ler yükleme tamamlandığında erişilebilir olacak kalıcı adreslerdir.
+        record_collections: görseli kullanan ve upload_id ile kaydedilen analiz
+        kayıtlarının koleksiyonları - yükleme bitince sonuç bu kayıtlara da yazılır
+        Kuyruk doluysa UploadQueueFullError fırlatır
+        """
+        self._ensure_workers()
+
+        job = UploadJob(
+            firebase_service, image_bytes, content_type,
+            firebase_service.build_image_name(path, filename), record_collections
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > Config.UPLOAD_STATUS_RETENTION:
+                self._jobs.popitem(last=False)
+
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+                self._metrics["rejected_queue_full"] += 1
+            logger.warning(f"Upload queue full ({self.queue_size}), rejecting {job.blob_name}")
+            raise UploadQueueFullError("Image upload queue is full, please retry shortly", Config.UPLOAD_RETRY_AFTER_SECONDS)
+
+        with self._lock:
+            self._metrics["submitted"] += 1
+            self._metrics["received_bytes"] += len(image_bytes)
+        return job.to_dict()
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._upload(job)
+            except Exception as e:
+                logger.error(f"Image upload worker error for {job.blob_name}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _upload_variant(self, job, variant):
+        """Tek dosyayı üstel geri çekilmeli yeniden deneme ile yükle"""
+        blob_name = job.blob_names[variant.name]
+        for attempt in range(self.max_retries + 1):
+            job.attempts += 1
+            try:
+                job.files[variant.name]["url"] = job.firebase_service.upload_image_bytes(
+                    variant.data, blob_name, variant.content_type
+                )
+                return True
+            except Exception as e:
+                job.error = f"{variant.name}: {str(e)}"
+                if attempt < self.max_retries:
+                    with self._lock:
+                        self._metrics["retries"] += 1
+                    time.sleep(Config.UPLOAD_RETRY_BACKOFF_SECONDS * (2 ** attempt))
+
+        logger.error(f"Image upload failed after {self.max_retries + 1} attempts: {blob_name}: {job.error}")
+        return False
+
+    def _upload(self, job):
+        """Varyantları üret ve sırayla yükle - thumbnail önce, liste ekranı en erken hazır olsun"""
+        job.state = "uploading"
+        start = time.perf_counter()
+
+        # Decode, yeniden boyutlandırma ve encode burada - istek thread'inde değil
+        variants = build_variants(job.image_bytes, job.content_type)
+        job.image_bytes = None  # Bellek varyantlar hazırlanınca serbest kalsın
+        variant_ms = (time.perf_counter() - start) * 1000
+
+        # Varyant üretimi başarısızsa (sadece orijinal) plan değişir - dosya listesi gerçeğe göre kurulur
+        job.blob_names, job.files = {}, {}
+        for variant in variants:
+            job._add_file(variant.name, variant.content_type, variant.extension, **{
+                key: value for key, value in variant.describe().items() if key != "content_type"
+            })
+
+        order = {"thumbnail": 0, "analysis": 1, "original": 2}
+        uploaded = True
+        for variant in sorted(variants, key=lambda variant: order.get(variant.name, 3)):
+            if not uploaded or not self._upload_variant(job, variant):
+                # Yüklenmeyen dosyanın adresi hiç çözülmez - kayıtta boş bırakılır
+                uploaded = False
+                job.files[variant.name]["url"] = None
+        job.state = "uploaded" if uploaded else "failed"
+        if uploaded:
+            job.error = None
+        job.finished_at = time.time()
+
+        with self._lock:
+            self._metrics["uploaded" if uploaded else "failed"] += 1
+            self._metrics["stored_bytes"] += sum(len(variant.data) for variant in variants)
+            self._metrics["total_variant_ms"] += variant_ms
+            self._metrics["total_upload_ms"] += (time.perf_counter() - start) * 1000
+
+        # Durum diğer worker'lardan ve yeniden başlatma sonrasında da okunabilsin
+        if not job.firebase_service.save_image_upload(job.id, job.to_dict(), job.record_collections):
+            with self._lock:
+                self._metrics["status_write_failures"] += 1
+
+    def get_status(self, upload_id):
+        """
+        Yükleme durumu - önce bu süreçteki işler (devam edenler dahil), sonra
+        Firestore'daki tamamlanmış kayıt. Bilinmiyorsa None
+        """
+        with self._lock:
+            job = self._jobs.get(upload_id)
+        if job is not None:
+            return job.to_dict()
+
+        from services.firebase_service import get_firebase_service
+        return get_firebase_service().get_image_upload(upload_id)
+
+    def drain(self, timeout=None):
+        """Kuyruktaki yüklemelerin bitmesini bekle (kapanışta)"""
+        if self._queue is None or self._pid != os.getpid():
+            return True
+        deadline = time.monotonic() + (timeout if timeout is not None else Config.UPLOAD_SHUTDOWN_TIMEOUT_SECONDS)
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return not self._queue.unfinished_tasks
+
+    def get_metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+        finished = metrics["uploaded"] + metrics["failed"]
+        metrics["avg_variant_ms"] = round(metrics.pop("total_variant_ms") / finished, 1) if finished else 0.0
+        metrics["avg_upload_ms"] = round(metrics.pop("total_upload_ms") / finished, 1) if finished else 0.0
+        metrics["storage_ratio"] = (
+            round(metrics["stored_bytes"] / metrics["received_bytes"], 3) if metrics["received_bytes"] else None
+        )
+        metrics["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        metrics["queue_size"] = self.queue_size
+        metrics["workers"] = self.workers
+        return metrics
+
+
+_uploader = None
+_uploader_lock = threading.Lock()
+
+
+def get_background_uploader():
+    """Süreç genelinde paylaşılan yükleyiciyi döndür"""
+    global _uploader
+    if _uploader is None:
+        with _uploader_lock:
+            if _uploader is None:
+                _uploader = BackgroundUploader()
+                atexit.register(_uploader.drain)
+    return _uploader
@@ -1,20 +1,46 @@
 import firebase_admin
 from firebase_admin import credentials, firestore, storage, messaging
+import functools
 import logging
 from datetime import datetime, timedelta
 import os
+import threading
+import time
+import uuid
 from config import Config
+from services.firestore_pagination import decode_cursor, fetch_page
+from services.profile_cache import PlantProfileCache, MISSING
+from services.sensor_rollups import (
+    ROLLUP_COLLECTION, RESOLUTIONS, build_rollup_writes, bucket_start, summarize_rollup
+)
 
 logger = logging.getLogger(__name__)
 
+def instrumented(method):
+    """Metot çağrı sayısı ve süresini servis metriklerine yaz"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._record_call(method.__name__, (time.perf_counter() - start) * 1000)
+    return wrapper
+
 class FirebaseService:
     def __init__(self):
         self.db = None
         self.bucket = None
+        self.pid = os.getpid()
+        self._metrics_lock = threading.Lock()
+        self._calls = {}  # metot: {calls, total_ms, max_ms}
+        self.warmup = {"status": "pending"}
+        # Profil okumaları için süreç içi önbellek
+        self.profile_cache = PlantProfileCache() if Config.PROFILE_CACHE_ENABLED else None
         self.initialize_firebase()
     
     def initialize_firebase(self):
-        """Firebase'i başlat"""
+        """Firebase'i başlat - uygulama zaten başlatılmışsa mevcut istemcileri kullan"""
         try:
             if not firebase_admin._apps:
                 # Firebase credentials dosyası varsa kullan
@@ -27,16 +53,85 @@ class FirebaseService:
                     # Geliştirme ortamı için mock
                     logger.warning("Firebase credentials not found, running in mock mode")
                     return
-                
-                self.db = firestore.client()
-                self.bucket = storage.bucket()
-                logger.info("Firebase initialized successfully")
+            
+            self.db = firestore.client()
+            self.bucket = storage.bucket()
+            logger.info("Firebase initialized successfully")
             
         except Exception as e:
             logger.error(f"Error initializing Firebase: {str(e)}")
     
+    def reinitialize_after_fork(self):
+        """
+        gRPC kanalları fork'tan sağ çıkmaz - worker'da uygulamayı silip
+        istemcileri yeniden oluştur (metrikler sıfırlanır)
+        """
+        self.db = None
+        self.bucket = None
+        self.pid = os.getpid()
+        with self._metrics_lock:
+            self._calls = {}
+        self.warmup = {"status": "pending"}
+        # Üst sürecin dinleyicisi bu süreçte çalışmaz, önbellek sıfırdan kurulur
+        self.profile_cache = PlantProfileCache() if Config.PROFILE_CACHE_ENABLED else None
+        
+        for app in list(firebase_admin._apps.values()):
+            try:
+                firebase_admin.delete_app(app)
+            except Exception as e:
+                logger.warning(f"Could not discard inherited Firebase app: {str(e)}")
+        self.initialize_firebase()
+    
+    def warm_up(self):
+        """
+        Bağlantıyı ısıt - ilk istek kanal kurulumu ve kimlik doğrulama
+        maliyetini ödemesin. Olmayan bir dokümanı okumak yeterlidir
+        """
+        if not self.db:
+            self.warmup = {"status": "skipped", "reason": "mock_mode"}
+            return self.warmup
+        
+        start = time.perf_counter()
+        try:
+            self.db.collection('plant_profiles').document('_warmup').get()
+            self.warmup = {"status": "ready", "duration_ms": round((time.perf_counter() - start) * 1000, 2)}
+            logger.info(f"🔥 Firestore connection warmed up in {self.warmup['duration_ms']} ms")
+        except Exception as e:
+            self.warmup = {"status": "failed", "error": str(e)}
+            logger.warning(f"Firestore warm-up failed: {str(e)}")
+        
+        if self.profile_cache is not None:
+            self.profile_cache.start_listener(self.db)
+        return self.warmup
+    
+    def _record_call(self, method_name, elapsed_ms):
+        with self._metrics_lock:
+            stats = self._calls.get(method_name)
+            if stats is None:
+                stats = self._calls[method_name] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0}
+            stats["calls"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    
+    def get_metrics(self):
+        """Metot başına çağrı sayısı ve gecikme (ms)"""
+        with self._metrics_lock:
+            calls = {name: dict(stats) for name, stats in self._calls.items()}
+        for stats in calls.values():
+            stats["avg_ms"] = round(stats["total_ms"] / stats["calls"], 2)
+            stats["total_ms"] = round(stats["total_ms"], 2)
+            stats["max_ms"] = round(stats["max_ms"], 2)
+        return {
+            "connected": self.db is not None,
+            "pid": self.pid,
+            "warmup": self.warmup,
+            "profile_cache": self.profile_cache.get_stats() if self.profile_cache else {"enabled": False},
+            "methods": calls
+        }
+    
     # ========== PLANT PROFILE METHODS ==========
     
+    @instrumented
     def get_plant_profile(self, plant_id):
         """Bitki profilini getir"""
         try:
@@ -53,20 +148,31 @@ class FirebaseService:
                     "mock": True
                 }
             
+            generation = None
+            if self.profile_cache is not None:
+                cached = self.profile_cache.get(plant_id)
+                if cached is not MISSING:
+                    return cached
+                # Okuma sürerken gelen güncelleme, okunan eski profilin önbelleğe girmesini engeller
+                generation = self.profile_cache.generation(plant_id)
+            
             doc_ref = self.db.collection('plant_profiles').document(plant_id)
             doc = doc_ref.get()
             
+            profile = None
             if doc.exists:
                 profile = doc.to_dict()
                 profile['id'] = doc.id
-                return profile
-            else:
-                return None
+            
+            if self.profile_cache is not None:
+                self.profile_cache.put(plant_id, profile, generation=generation)
+            return profile
                 
         except Exception as e:
             logger.error(f"Error getting plant profile: {str(e)}")
             return None
     
+    @instrumented
     def save_plant_profile(self, profile_data):
         """Yeni bitki profili kaydet"""
         try:
@@ -78,6 +184,10 @@ class FirebaseService:
             doc_ref = self.db.collection('plant_profiles').document(plant_id)
             doc_ref.set(profile_data)
             
+            # Yazılan doküman tam profildir - önbellek doğrudan güncellenir
+            if self.profile_cache is not None:
+                self.profile_cache.put(plant_id, dict(profile_data, id=plant_id), source="write")
+            
             logger.info(f"Plant profile saved: {plant_id}")
             return True
             
@@ -85,6 +195,7 @@ class FirebaseService:
             logger.error(f"Error saving plant profile: {str(e)}")
             return False
     
+    @instrumented
     def update_plant_profile(self, plant_id, profile_data):
         """Bitki profilini güncelle"""
         try:
@@ -95,6 +206,10 @@ class FirebaseService:
             doc_ref = self.db.collection('plant_profiles').document(plant_id)
             doc_ref.update(profile_data)
             
+            # Kısmi güncelleme - tam doküman bir sonraki okumada alınır
+            if self.profile_cache is not None:
+                self.profile_cache.invalidate(plant_id)
+            
             logger.info(f"Plant profile updated: {plant_id}")
             return True
             
@@ -102,6 +217,7 @@ class FirebaseService:
             logger.error(f"Error updating plant profile: {str(e)}")
             return False
     
+    @instrumented
     def update_plant_settings(self, plant_id, settings_data):
         """Bitki ayarlarını güncelle"""
         try:
@@ -112,6 +228,9 @@ class FirebaseService:
             doc_ref = self.db.collection('plant_profiles').document(plant_id)
             doc_ref.update(settings_data)
             
+            if self.profile_cache is not None:
+                self.profile_cache.invalidate(plant_id)
+            
             logger.info(f"Plant settings updated: {plant_id}")
             return True
             
@@ -121,6 +240,7 @@ class FirebaseService:
     
     # ========== HISTORY METHODS ==========
     
+    @instrumented
     def save_moisture_data(self, data):
         """Nem verisini Firestore'a kaydet"""
         try:
@@ -128,6 +248,12 @@ class FirebaseService:
                 logger.warning("Firebase not initialized, skipping moisture data save")
                 return
             
+            if Config.WRITE_BUFFER_ENABLED:
+                # Yanıt Firestore'u beklemez - arka planda toplu yazılır
+                from services.write_buffer import get_write_buffer
+                get_write_buffer().add('moisture_data', data)
+                return
+            
             collection_ref = self.db.collection('moisture_data')
             collection_ref.add(data)
             logger.info(f"Moisture data saved for plant {data.get('plant_id')}")
@@ -135,6 +261,7 @@ class FirebaseService:
         except Exception as e:
             logger.error(f"Error saving moisture data: {str(e)}")
     
+    @instrumented
     def save_sensor_data(self, data):
         """Sensör verisini kaydet"""
         try:
@@ -142,6 +269,12 @@ class FirebaseService:
                 logger.warning("Firebase not initialized, skipping sensor data save")
                 return
             
+            if Config.WRITE_BUFFER_ENABLED:
+                # Yanıt Firestore'u beklemez - arka planda toplu yazılır
+                from services.write_buffer import get_write_buffer
+                get_write_buffer().add('sensor_data', data)
+                return
+            
             collection_ref = self.db.collection('sensor_data')
             collection_ref.add(data)
             logger.info(f"Sensor data saved for plant {data.get('plant_id')}")
@@ -149,6 +282,34 @@ class FirebaseService:
         except Exception as e:
             logger.error(f"Error saving sensor data: {str(e)}")
     
+    @instrumented
+    def save_sensor_rollups(self, reading):
+        """
+        Okumayı 5 dakikalık, saatlik ve günlük özet kovalarına ekle
+        Alan dönüşümleri sunucu tarafında uygulanır - okuma/yazma yarışı yok
+        """
+        try:
+            if not self.db:
+                logger.warning("Firebase not initialized, skipping sensor rollups")
+                return
+            
+            writes = build_rollup_writes(reading)
+            if Config.WRITE_BUFFER_ENABLED:
+                from services.write_buffer import get_write_buffer
+                write_buffer = get_write_buffer()
+                for document_id, fields in writes:
+                    write_buffer.add(ROLLUP_COLLECTION, fields, document_id=document_id, merge=True)
+                return
+            
+            batch = self.db.batch()
+            for document_id, fields in writes:
+                batch.set(self.db.collection(ROLLUP_COLLECTION).document(document_id), fields, merge=True)
+            batch.commit()
+            
+        except Exception as e:
+            logger.error(f"Error saving sensor rollups: {str(e)}")
+    
+    @instrumented
     def save_watering_history(self, data):
         """Sulama geçmişini Firestore'a kaydet"""
         try:
@@ -156,6 +317,12 @@ class FirebaseService:
                 logger.warning("Firebase not initialized, skipping watering history save")
                 return
             
+            if Config.WRITE_BUFFER_ENABLED:
+                # Yanıt Firestore'u beklemez - arka planda toplu yazılır
+                from services.write_buffer import get_write_buffer
+                get_write_buffer().add('watering_history', data)
+                return
+            
             collection_ref = self.db.collection('watering_history')
             collection_ref.add(data)
             logger.info(f"Watering history saved for plant {data.get('plant_id')}")
@@ -163,7 +330,8 @@ class FirebaseService:
         except Exception as e:
             logger.error(f"Error saving watering history: {str(e)}")
     
-    def save_disease_check(self, data):
+    @instrumented
+    def save_disease_check(self, data, document_id=None):
         """Hastalık kontrolü sonucunu Firestore'a kaydet"""
         try:
             if not self.db:
@@ -171,13 +339,18 @@ class FirebaseService:
                 return
             
             collection_ref = self.db.collection('disease_checks')
-            collection_ref.add(data)
+            if document_id:
+                # Arka plan yüklemesinin sonucu aynı dokümana merge ile yazılır - sıra önemsiz
+                collection_ref.document(document_id).set(data, merge=True)
+            else:
+                collection_ref.add(data)
             logger.info(f"Disease check saved for plant {data.get('plant_id')}")
             
         except Exception as e:
             logger.error(f"Error saving disease check: {str(e)}")
     
-    def save_plant_identification(self, data):
+    @instrumented
+    def save_plant_identification(self, data, document_id=None):
         """Bitki tanıma sonucunu Firestore'a kaydet"""
         try:
             if not self.db:
@@ -185,12 +358,17 @@ class FirebaseService:
                 return
             
             collection_ref = self.db.collection('plant_identifications')
-            collection_ref.add(data)
+            if document_id:
+                # Arka plan yüklemesinin sonucu aynı dokümana merge ile yazılır - sıra önemsiz
+                collection_ref.document(document_id).set(data, merge=True)
+            else:
+                collection_ref.add(data)
             logger.info(f"Plant identification saved for plant {data.get('plant_id')}")
             
         except Exception as e:
             logger.error(f"Error saving plant identification: {str(e)}")
     
+    @instrumented
     def save_plant_selection(self, data):
         """Bitki seçimini kaydet"""
         try:
@@ -207,8 +385,10 @@ class FirebaseService:
     
     # ========== GET HISTORY METHODS ==========
     
-    def get_watering_history(self, plant_id, limit=50):
-        """Sulama geçmişini getir"""
+    @instrumented
+    def get_watering_history(self, plant_id, limit=50, cursor=None):
+        """Sulama geçmişini sayfa sayfa getir - (kayıtlar, next_cursor)"""
+        after = decode_cursor(cursor) if cursor else None
         try:
             if not self.db:
                 # Mock data döndür
@@ -222,27 +402,25 @@ class FirebaseService:
                         "triggered_by": "mobile_app",
                         "mock": True
                     }
-                ]
+                ], None
             
             query = self.db.collection('watering_history')
             query = query.where('plant_id', '==', plant_id)
-            query = query.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(limit)
-            
-            docs = query.stream()
-            history = []
-            for doc in docs:
-                data = doc.to_dict()
-                data['id'] = doc.id
-                history.append(data)
-            
-            return history
+            return fetch_page(query, limit, after)
             
         except Exception as e:
             logger.error(f"Error getting watering history: {str(e)}")
-            return []
+            return [], None
     
-    def get_moisture_history(self, plant_id, limit=100, days=7):
-        """Nem geçmişini getir"""
+    @instrumented
+    def get_moisture_history(self, plant_id, limit=100, days=7, cursor=None, resolution=None):
+        """
+        Nem geçmişini sayfa sayfa getir - (kayıtlar, next_cursor)
+        resolution (5m, 1h, 1d) verilirse ham kayıtlar yerine özet kovaları okunur
+        """
+        after = decode_cursor(cursor) if cursor else None
+        if resolution is not None:
+            return self._get_sensor_rollups(plant_id, resolution, limit, days, after)
         try:
             if not self.db:
                 # Mock data döndür
@@ -256,7 +434,7 @@ class FirebaseService:
                         "timestamp": datetime.now().isoformat(),
                         "mock": True
                     }
-                ]
+                ], None
             
             # Son X gün için tarih filtresi
             start_date = datetime.now() - timedelta(days=days)
@@ -264,23 +442,53 @@ class FirebaseService:
             query = self.db.collection('moisture_data')
             query = query.where('plant_id', '==', plant_id)
             query = query.where('timestamp', '>=', start_date.isoformat())
-            query = query.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(limit)
+            return fetch_page(query, limit, after)
+            
+        except Exception as e:
+            logger.error(f"Error getting moisture history: {str(e)}")
+            return [], None
+    
+    def _get_sensor_rollups(self, plant_id, resolution, limit, days, after):
+        """Özet kovaları - en yeniden eskiye"""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unsupported resolution: {resolution} (expected one of {', '.join(RESOLUTIONS)})")
+        try:
+            if not self.db:
+                # Mock data döndür
+                now = datetime.now()
+                return [
+                    {
+                        "id": "mock_1",
+                        "plant_id": plant_id,
+                        "resolution": resolution,
+                        "timestamp": now.isoformat(),
+                        "bucket_end": (now + RESOLUTIONS[resolution]).isoformat(),
+                        "count": 1,
+                        "last_timestamp": now.isoformat(),
+                        "moisture": {"min": 35, "max": 35, "mean": 35, "count": 1, "last": 35},
+                        "temperature": {"min": 23.5, "max": 23.5, "mean": 23.5, "count": 1, "last": 23.5},
+                        "humidity": {"min": 60, "max": 60, "mean": 60, "count": 1, "last": 60},
+                        "mock": True
+                    }
+                ], None
             
-            docs = query.stream()
-            history = []
-            for doc in docs:
-                data = doc.to_dict()
-                data['id'] = doc.id
-                history.append(data)
+            # Başlangıcı aralığın içine düşen kovalar
+            start_date = bucket_start(datetime.now() - timedelta(days=days), resolution)
             
-            return history
+            query = self.db.collection(ROLLUP_COLLECTION)
+            query = query.where('plant_id', '==', plant_id)
+            query = query.where('resolution', '==', resolution)
+            query = query.where('timestamp', '>=', start_date.isoformat())
+            return fetch_page(query, limit, after, summarize_rollup)
             
         except Exception as e:
-            logger.error(f"Error getting moisture history: {str(e)}")
-            return []
+            logger.error(f"Error getting sensor rollups: {str(e)}")
+            return [], None
     
-    def get_disease_history(self, plant_id, limit=50):
-        """Hastalık kontrol geçmişini getir"""
+    @instrumented
+    def get_disease_history(self, plant_id, limit=50, cursor=None):
+        """Hastalık kontrol geçmişini sayfa sayfa getir - (kayıtlar, next_cursor)"""
+        after = decode_cursor(cursor) if cursor else None
         try:
             if not self.db:
                 # Mock data döndür
@@ -292,30 +500,35 @@ class FirebaseService:
                         "is_healthy": True,
                         "disease_status": "Healthy",
                         "confidence": 0.92,
+                        "image_url": "mock_image_url.jpg",
+                        "thumbnail_url": "mock_image_url_thumbnail.webp",
                         "timestamp": datetime.now().isoformat(),
                         "mock": True
                     }
-                ]
+                ], None
             
             query = self.db.collection('disease_checks')
             query = query.where('plant_id', '==', plant_id)
-            query = query.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(limit)
             
-            docs = query.stream()
-            history = []
-            for doc in docs:
-                data = doc.to_dict()
-                data['id'] = doc.id
-                history.append(data)
+            # Liste ekranı thumbnail kullanır; eski kayıtlarda sadece orijinal var
+            def with_thumbnail(data):
+                upload = data.get('image_upload')
+                if upload:
+                    # Yükleme tamamlandı - başarısızsa adresler boştur
+                    data['image_url'] = upload.get('image_url')
+                    data['thumbnail_url'] = upload.get('thumbnail_url')
+                data.setdefault('thumbnail_url', data.get('image_url'))
+                return data
             
-            return history
+            return fetch_page(query, limit, after, with_thumbnail)
             
         except Exception as e:
             logger.error(f"Error getting disease history: {str(e)}")
-            return []
+            return [], None
     
     # ========== UTILITY METHODS ==========
     
+    @instrumented
     def upload_image(self, image_file, path):
         """Görseli Firebase Storage'a yükle"""
         try:
@@ -339,6 +552,82 @@ class FirebaseService:
             logger.error(f"Error uploading image: {str(e)}")
             return None
     
+    def build_image_name(self, path, filename):
+        """Storage nesne adı - yüklemeden önce belirlenir"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"{path}/{timestamp}_{uuid.uuid4().hex[:8]}_{filename}"
+    
+    def image_public_url(self, blob_name):
+        """Nesnenin yüklendikten sonra alacağı public URL (ağ isteği yapmaz)"""
+        if not self.bucket:
+            return f"mock_image_url_{os.path.basename(blob_name)}"
+        return self.bucket.blob(blob_name).public_url
+    
+    @instrumented
+    def upload_image_bytes(self, image_bytes, blob_name, content_type=None):
+        """
+        Bellekteki görsel baytlarını Storage'a yükle ve public URL döndür
+        Hata durumunda exception fırlatır (çağıran yeniden deneyebilir)
+        """
+        if not self.bucket:
+            logger.warning("Firebase Storage not initialized")
+            return self.image_public_url(blob_name)
+        
+        blob = self.bucket.blob(blob_name)
+        if isinstance(image_bytes, memoryview):
+            # Eşlenmiş yükleme dosyası - bytes kopyası oluşturmadan akış olarak yükle
+            from services.image_preprocessing import BufferReader
+            blob.upload_from_file(BufferReader(image_bytes), size=len(image_bytes), content_type=content_type)
+        else:
+            blob.upload_from_string(image_bytes, content_type=content_type)
+        blob.make_public()
+        return blob.public_url
+    
+    @instrumented
+    def save_image_upload(self, upload_id, upload, record_collections=()):
+        """
+        Arka plan yüklemesinin sonucunu image_uploads'a ve görseli kullanan analiz
+        kayıtlarına (doküman id'si upload_id) tek batch ile yaz - başarılıysa True
+        """
+        try:
+            if not self.db:
+                return True
+            
+            batch = self.db.batch()
+            batch.set(self.db.collection('image_uploads').document(upload_id), upload)
+            record_fields = {
+                "image_upload": {
+                    "status": upload.get("status"),
+                    "image_url": upload.get("image_url"),
+                    "thumbnail_url": upload.get("thumbnail_url"),
+                    "files": upload.get("files"),
+                    "finished_at": upload.get("finished_at")
+                }
+            }
+            for collection in record_collections:
+                batch.set(self.db.collection(collection).document(upload_id), record_fields, merge=True)
+            batch.commit()
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error saving image upload status {upload_id}: {str(e)}")
+            return False
+    
+    @instrumented
+    def get_image_upload(self, upload_id):
+        """Tamamlanmış yüklemenin kaydı - yoksa None"""
+        try:
+            if not self.db:
+                return None
+            
+            doc = self.db.collection('image_uploads').document(upload_id).get()
+            return doc.to_dict() if doc.exists else None
+            
+        except Exception as e:
+            logger.error(f"Error getting image upload {upload_id}: {str(e)}")
+            return None
+    
+    @instrumented
     def send_notification_to_user(self, plant_id, title, message):
         """Kullanıcıya push notification gönder"""
         try:
@@ -358,3 +647,35 @@ class FirebaseService:
             
         except Exception as e:
             logger.error(f"Error sending notification: {str(e)}")
+
+
+_firebase_service = None
+_firebase_service_lock = threading.Lock()
+
+
+def get_firebase_service():
+    """
+    Süreç genelinde paylaşılan FirebaseService örneğini döndür
+    Fork sonrası (gunicorn worker) ilk erişimde istemciler yeniden kurulur
+    """
+    global _firebase_service
+    if _firebase_service is None:
+        with _firebase_service_lock:
+            if _firebase_service is None:
+                _firebase_service = FirebaseService()
+    if _firebase_service.pid != os.getpid():
+        with _firebase_service_lock:
+            if _firebase_service.pid != os.getpid():
+                _firebase_service.reinitialize_after_fork()
+    return _firebase_service
+
+
+def _reset_locks_after_fork():
+    """Fork anında başka thread'in tuttuğu kilit alt süreçte sonsuza kadar kilitli kalmasın"""
+    global _firebase_service_lock
+    _firebase_service_lock = threading.Lock()
+    if _firebase_service is not None:
+        _firebase_service._metrics_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_locks_after_fork)
@@ -0,0 +1,53 @@
+"""
+Firestore imleçli sayfalama
+Geçmiş listeleri timestamp + doküman id sırasıyla okunur; istemciye son kaydı
+gösteren opak bir imleç döner. firebase_admin import edilmez - sorgu nesnesi
+çağırandan gelir
+"""
+
+import base64
+import json
+
+# firestore.Query.DESCENDING değeri
+DESCENDING = 'DESCENDING'
+
+
+def encode_cursor(timestamp, document_id):
+    """Sayfa imleci - son kaydın timestamp'i ve doküman id'si (istemci için opak)"""
+    payload = json.dumps([timestamp, document_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """İmleci (timestamp, doküman id) olarak çöz - geçersizse ValueError"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, document_id = json.loads(payload)
+    except Exception:
+        raise ValueError("Invalid cursor") from None
+    if not isinstance(document_id, str) or not document_id:
+        raise ValueError("Invalid cursor")
+    return timestamp, document_id
+
+
+def fetch_page(query, limit, after, transform=None):
+    """
+    timestamp + doküman id sırasıyla bir sayfa oku - (kayıtlar, next_cursor)
+    Bir fazla kayıt istenir; fazlası varsa sonraki sayfanın imleci üretilir
+    """
+    query = query.order_by('timestamp', direction=DESCENDING)
+    query = query.order_by('__name__', direction=DESCENDING)
+    if after is not None:
+        query = query.start_after({'timestamp': after[0], '__name__': after[1]})
+
+    history = []
+    for doc in query.limit(limit + 1).stream():
+        data = doc.to_dict()
+        data['id'] = doc.id
+        history.append(transform(data) if transform is not None else data)
+
+    next_cursor = None
+    if len(history) > limit:
+        history = history[:limit]
+        next_cursor = encode_cursor(history[-1].get('timestamp'), history[-1]['id'])
+    return history, next_cursor
@@ -0,0 +1,162 @@
+"""
+Görüntü ön işleme
+JPEG draft modunda küçültülmüş decode, yeniden kullanılan input buffer'ı ve
+yerinde normalizasyon ile TFLite girişini hazırlar
+"""
+
+import io
+import threading
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+# Interpreter bilgisi yoksa kullanılan varsayılan giriş şekli
+DEFAULT_INPUT_SHAPE = (1, 224, 224, 3)
+
+_buffers = threading.local()
+
+
+class BufferReader(io.RawIOBase):
+    """
+    memoryview (ör. eşlenmiş yükleme dosyası) üzerinde kopyasız okuyucu
+    BytesIO'nun aksine tüm görseli kopyalamaz; her okuyucunun kendi konumu vardır
+    """
+
+    def __init__(self, buffer):
+        super().__init__()
+        self._view = memoryview(buffer)
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, target):
+        count = max(0, min(len(target), len(self._view) - self._position))
+        target[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+
+def open_image(image_data):
+    """bytes ya da dosya benzeri nesneden PIL Image aç (henüz decode etmez)"""
+    if isinstance(image_data, memoryview):
+        return Image.open(BufferReader(image_data))
+    if isinstance(image_data, (bytes, bytearray)):
+        return Image.open(BytesIO(image_data))
+    return Image.open(image_data)
+
+
+def read_image_bytes(image_data):
+    """
+    Yüklenen dosyanın baytlarını oku ve akışı başa sar (sonraki okuyucular için)
+    memoryview (ör. paylaşılan bellek) kopyalanmadan döndürülür
+    """
+    if isinstance(image_data, (bytes, memoryview)):
+        return image_data
+    if isinstance(image_data, bytearray):
+        return bytes(image_data)
+
+    data = image_data.read()
+    image_data.seek(0)
+    return data
+
+
+def decode_image(image_data, target_size):
+    """
+    Görüntüyü hedef boyuta yetecek en küçük ölçekte decode et ve RGB'ye çevir
+    JPEG'lerde draft modu DCT aşamasında 1/2, 1/4 veya 1/8 ölçekli decode yapar
+    """
+    image = open_image(image_data)
+
+    # draft sadece JPEG'de etkilidir, hedef boyuttan küçük ölçeğe inmez
+    if image.format == 'JPEG':
+        image.draft('RGB', target_size)
+
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image
+
+
+def get_input_buffer(input_shape, dtype=np.float32):
+    """Thread başına, giriş şekli ve tipine göre yeniden kullanılan buffer"""
+    cache = getattr(_buffers, 'cache', None)
+    if cache is None:
+        cache = _buffers.cache = {}
+
+    key = (tuple(input_shape), np.dtype(dtype).str)
+    buffer = cache.get(key)
+    if buffer is None:
+        buffer = cache[key] = np.empty(input_shape, dtype=dtype)
+    return buffer
+
+
+def input_size_from_shape(input_shape):
+    """NHWC giriş şeklinden PIL (genişlik, yükseklik) boyutu"""
+    return int(input_shape[2]), int(input_shape[1])
+
+
+def input_spec(input_details=None):
+    """Interpreter giriş bilgisinden (şekil, dtype, scale, zero_point) çıkar"""
+    if input_details is None:
+        return DEFAULT_INPUT_SHAPE, np.dtype(np.float32), 0.0, 0
+
+    scale, zero_point = input_details.get('quantization', (0.0, 0))
+    return tuple(input_details['shape']), np.dtype(input_details['dtype']), float(scale), int(zero_point)
+
+
+def image_to_input(image, input_details=None):
+    """
+    Decode edilmiş görüntüyü model girişine dönüştür
+    float32 modellere [0,1] aralığında, uint8/int8 modellere float dönüşümü
+    olmadan doğrudan kuantize değer yazılır.
+    Dönen dizi thread'e ait buffer'dır; aynı thread'deki bir sonraki çağrıya kadar geçerlidir
+    """
+    input_shape, dtype, scale, zero_point = input_spec(input_details)
+    input_shape = (1,) + tuple(int(d) for d in input_shape[1:])
+    target_size = input_size_from_shape(input_shape)
+
+    if image.size != target_size:
+        image = image.resize(target_size, Image.Resampling.BILINEAR, reducing_gap=3.0)
+
+    pixels = np.asarray(image)
+    buffer = get_input_buffer(input_shape, dtype)
+
+    unit_scale = abs(scale * 255.0 - 1.0) < 1e-4
+
+    if dtype == np.float32:
+        # uint8 -> float32 dönüşümü ve /255 tek geçişte, doğrudan buffer'a
+        np.multiply(pixels, np.float32(1.0 / 255.0), out=buffer[0], casting='unsafe')
+    elif dtype == np.uint8 and zero_point == 0 and (scale == 0.0 or unit_scale):
+        # scale=1/255, zp=0: kuantize değer pikselin kendisi
+        np.copyto(buffer[0], pixels)
+    elif dtype == np.int8 and (scale == 0.0 or (unit_scale and zero_point == -128)):
+        # q = piksel - 128; uint8 çıkarma mod 256 sarar, int8'e dönüşüm doğru değeri verir
+        np.subtract(pixels, np.uint8(128), out=buffer[0], casting='unsafe')
+    elif scale > 0.0 and np.issubdtype(dtype, np.integer):
+        # Genel durum: gerçek değer piksel/255, q = round(gerçek / scale + zero_point)
+        info = np.iinfo(dtype)
+        quantized = np.rint(pixels * np.float32(1.0 / (255.0 * scale)) + zero_point)
+        np.copyto(buffer[0], quantized.clip(info.min, info.max), casting='unsafe')
+    else:
+        raise ValueError(f"Unsupported model input dtype: {dtype}")
+
+    return buffer
+
+
+def preprocess_image(image_data, input_details=None):
+    """Decode + boyutlandırma + normalizasyon/kuantizasyon"""
+    input_shape, _, _, _ = input_spec(input_details)
+    image = decode_image(image_data, input_size_from_shape(input_shape))
+    return image_to_input(image, input_details)
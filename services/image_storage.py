@@ -0,0 +1,137 @@
+"""
+Storage'a yüklenecek görsel varyantları
+Telefon fotoğrafı yerine (ya da yanında) küçük bir liste önizlemesi (thumbnail)
+ve modele yetecek çözünürlükte bir analiz kopyası üretir. Görsel tek sefer,
+JPEG draft modunda en büyük varyanta yetecek ölçekte decode edilir
+"""
+
+import logging
+import os
+from io import BytesIO
+
+from PIL import Image, ImageOps, features
+
+from config import Config
+from services.image_preprocessing import decode_image, open_image
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    "WEBP": ("image/webp", "webp"),
+    "JPEG": ("image/jpeg", "jpg")
+}
+
+
+class ImageVariant:
+    """Yüklenecek tek bir dosya"""
+
+    __slots__ = ("name", "data", "content_type", "extension", "width", "height")
+
+    def __init__(self, name, data, content_type, extension, width=None, height=None):
+        self.name = name
+        self.data = data
+        self.content_type = content_type
+        self.extension = extension
+        self.width = width
+        self.height = height
+
+    def describe(self):
+        return {
+            "content_type": self.content_type,
+            "size_bytes": len(self.data),
+            "width": self.width,
+            "height": self.height
+        }
+
+
+def output_format(requested):
+    """WebP desteklenmeyen Pillow derlemelerinde JPEG'e düş"""
+    requested = requested.upper()
+    if requested == "WEBP" and not features.check('webp'):
+        return "JPEG"
+    return requested if requested in FORMATS else "JPEG"
+
+
+def encode(image, name, image_format, quality):
+    image_format = output_format(image_format)
+    buffer = BytesIO()
+    options = {"quality": quality}
+    if image_format == "JPEG":
+        options.update(optimize=True, progressive=True)
+    else:
+        options["method"] = 4
+    image.save(buffer, format=image_format, **options)
+
+    content_type, extension = FORMATS[image_format]
+    return ImageVariant(name, buffer.getvalue(), content_type, extension, image.width, image.height)
+
+
+def downscale(image, max_size):
+    """En uzun kenar max_size olacak şekilde küçült (büyütmez)"""
+    if max(image.size) <= max_size:
+        return image
+    scale = max_size / max(image.size)
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+
+def build_variants(image_bytes, content_type=None):
+    """
+    Yapılandırmaya göre yüklenecek dosyalar: original, analysis, thumbnail
+    Görsel işlenemezse sadece orijinal döner
+    """
+    variants = []
+    if Config.IMAGE_STORE_ORIGINAL:
+        variants.append(ImageVariant("original", image_bytes, content_type or "application/octet-stream", None))
+
+    largest = Config.IMAGE_ANALYSIS_MAX_SIZE if Config.IMAGE_ANALYSIS_COPY_ENABLED else Config.IMAGE_THUMBNAIL_SIZE
+    try:
+        if variants:
+            with open_image(image_bytes) as probe:  # Sadece başlık okunur
+                variants[0].width, variants[0].height = probe.size
+
+        image = decode_image(image_bytes, (largest, largest))
+        image = ImageOps.exif_transpose(image)
+
+        if Config.IMAGE_ANALYSIS_COPY_ENABLED:
+            image = downscale(image, Config.IMAGE_ANALYSIS_MAX_SIZE)
+            variants.append(encode(image, "analysis", Config.IMAGE_ANALYSIS_FORMAT, Config.IMAGE_ANALYSIS_QUALITY))
+
+        thumbnail = downscale(image, Config.IMAGE_THUMBNAIL_SIZE)
+        variants.append(encode(thumbnail, "thumbnail", Config.IMAGE_THUMBNAIL_FORMAT, Config.IMAGE_THUMBNAIL_QUALITY))
+    except Exception as e:
+        logger.warning(f"Could not build image variants, storing original only: {str(e)}")
+        if not Config.IMAGE_STORE_ORIGINAL:
+            variants.append(ImageVariant("original", image_bytes, content_type or "application/octet-stream", None))
+
+    return variants
+
+
+def planned_variants(content_type=None):
+    """
+    build_variants'ın üreteceği dosyalar (ad, içerik tipi, uzantı) - görsel decode edilmez
+    URL'ler yükleme kuyruğa alınırken bundan hesaplanır
+    """
+    planned = []
+    if Config.IMAGE_STORE_ORIGINAL:
+        planned.append(("original", content_type or "application/octet-stream", None))
+    if Config.IMAGE_ANALYSIS_COPY_ENABLED:
+        planned.append(("analysis",) + FORMATS[output_format(Config.IMAGE_ANALYSIS_FORMAT)])
+    planned.append(("thumbnail",) + FORMATS[output_format(Config.IMAGE_THUMBNAIL_FORMAT)])
+    return planned
+
+
+def variant_blob_name(blob_name, name, extension):
+    """Orijinal nesne adından varyant adı: path/ts_id_foto_thumbnail.webp"""
+    if name == "original":
+        return blob_name
+    root, _ = os.path.splitext(blob_name)
+    return f"{root}_{name}.{extension}"
+
+
+def primary_variant(files):
+    """image_url olarak gösterilecek dosya: orijinal > analiz kopyası > thumbnail"""
+    for name in ("original", "analysis", "thumbnail"):
+        if name in files:
+            return files[name]
+    return None
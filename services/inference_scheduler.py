@@ -0,0 +1,232 @@
+"""
+Dinamik mikro-batch inference zamanlayıcısı
+Aynı modele kısa bir pencerede gelen istekleri toplayıp tek invoke ile çalıştırır.
+Her istek gönderildiği andaki havuzla (model sürümü) çalışır; yeniden yükleme
+sırasında eski ve yeni sürümün istekleri aynı batch'e girmez. Batch boyutu
+değişimini desteklemeyen sürümler hatırlanır ve tekli çalıştırılır; geçici bir
+tahmin hatası batch'lemeyi kapatmaz
+"""
+
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+
+from config import Config
+from services.interpreter_pool import restore_input_shape
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingRequest:
+    """Batch'e girmeyi bekleyen tek bir istek ve çalışacağı havuz"""
+
+    __slots__ = ("image_array", "pool", "event", "result", "error")
+
+    def __init__(self, image_array, pool):
+        self.image_array = image_array
+        self.pool = pool
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ModelBatcher:
+    """
+    Tek bir model için istek kuyruğu
+    İlk istek geldikten sonra en fazla `max_wait_ms` beklenir ya da
+    `max_batch_size` isteğe ulaşılınca batch çalıştırılır
+    """
+
+    def __init__(self, model_key, pool_getter, predict_fn, max_batch_size, max_wait_ms, workers=1):
+        self.model_key = model_key
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self._pool_getter = pool_getter
+        self._predict_fn = predict_fn
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+
+        # Batch boyutu değişimini desteklemeyen model sürümleri - bunlar tekli çalıştırılır
+        self._batch_unsupported_versions = set()
+
+        self._metrics = {
+            "requests": 0,
+            "batches": 0,
+            "max_batch_seen": 0,
+            "fallbacks": 0,
+            "errors": 0
+        }
+
+        for i in range(max(1, int(workers))):
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"batcher-{model_key}-{i}",
+                daemon=True
+            )
+            thread.start()
+
+    def submit(self, image_array, pool=None, timeout=None):
+        """
+        Görüntüyü kuyruğa ekle ve batch sonucundan bu isteğe düşen çıktıyı bekle
+        pool verilmezse güncel havuz şimdi alınır - batch sonradan değişen havuzda çalışmaz
+        """
+        if timeout is None:
+            timeout = Config.INTERPRETER_POOL_TIMEOUT_SECONDS + self.max_wait
+        if pool is None:
+            pool = self._pool_getter(self.model_key)
+        if pool is None:
+            raise RuntimeError(f"No TFLite model available for {self.model_key}")
+
+        request = _PendingRequest(image_array, pool)
+        self._queue.put(request)
+
+        if not request.event.wait(timeout):
+            raise TimeoutError(f"Batched inference timed out for {self.model_key}")
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _worker(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Yeniden yükleme anında toplanan istekler farklı havuzlara ait olabilir
+            groups = {}
+            for request in batch:
+                groups.setdefault(id(request.pool), []).append(request)
+
+            for group in groups.values():
+                try:
+                    self._execute(group)
+                except Exception as e:
+                    logger.error(f"Error executing batch for {self.model_key}: {str(e)}")
+                    for request in group:
+                        if not request.event.is_set():
+                            request.error = e
+                            request.event.set()
+
+    def _execute(self, batch):
+        """Aynı havuza ait batch'i tek invoke ile çalıştır ve sonuçları sahiplerine dağıt"""
+        with self._lock:
+            self._metrics["requests"] += len(batch)
+            self._metrics["batches"] += 1
+            self._metrics["max_batch_seen"] = max(self._metrics["max_batch_seen"], len(batch))
+
+        pool = batch[0].pool
+        with pool.interpreter() as interpreter:
+            input_index = interpreter.get_input_details()[0]['index']
+            original_shape = list(interpreter.get_input_details()[0]['shape'])
+            try:
+                if len(batch) > 1 and pool.version not in self._batch_unsupported_versions:
+                    if self._execute_batched(interpreter, batch, pool, input_index):
+                        return
+                    restore_input_shape(interpreter, input_index, original_shape)
+
+                for request in batch:
+                    output = self._predict_fn(interpreter, request.image_array)
+                    if output is None:
+                        with self._lock:
+                            self._metrics["errors"] += 1
+                        request.error = RuntimeError(f"TFLite prediction failed for {self.model_key}")
+                    else:
+                        request.result = output
+                    request.event.set()
+            finally:
+                # Havuza batch boyutunda geri verilen interpreter sonraki tekli istekte yeniden ayrılırdı
+                restore_input_shape(interpreter, input_index, original_shape)
+
+    def _execute_batched(self, interpreter, batch, pool, input_index):
+        """
+        Batch'i tek invoke ile çalıştır - sonuçlar dağıtıldıysa True
+        Sadece yeniden boyutlandırma ya da çıktı şekli hatası sürümü tekli moda alır;
+        tahmin hatası (None) bu batch'i tekli denemeye düşürür ama bayrağı değiştirmez
+        """
+        stacked = np.concatenate([request.image_array for request in batch], axis=0)
+        try:
+            interpreter.resize_tensor_input(input_index, list(stacked.shape))
+            interpreter.allocate_tensors()
+        except Exception as e:
+            self._mark_batch_unsupported(pool, f"resize to {list(stacked.shape)} failed: {str(e)}")
+            return False
+
+        output = self._predict_fn(interpreter, stacked)
+        if output is None:
+            with self._lock:
+                self._metrics["fallbacks"] += 1
+            return False
+        if len(output) != len(batch):
+            self._mark_batch_unsupported(pool, f"output batch {len(output)} != {len(batch)}")
+            return False
+
+        for i, request in enumerate(batch):
+            request.result = output[i:i + 1]
+            request.event.set()
+        return True
+
+    def _mark_batch_unsupported(self, pool, reason):
+        with self._lock:
+            self._batch_unsupported_versions.add(pool.version)
+            self._metrics["fallbacks"] += 1
+        logger.warning(
+            f"Batched invoke not supported by {self.model_key} (version {pool.version}): {reason}, "
+            f"falling back to single invokes"
+        )
+
+    def get_metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+        batches = metrics["batches"]
+        metrics["avg_batch_size"] = round(metrics["requests"] / batches, 2) if batches else 0.0
+        metrics["queue_depth"] = self._queue.qsize()
+        with self._lock:
+            metrics["batch_unsupported_versions"] = sorted(str(version) for version in self._batch_unsupported_versions)
+        return metrics
+
+
+class InferenceScheduler:
+    """Model anahtarına göre ModelBatcher'ları tembel olarak oluşturur"""
+
+    def __init__(self, pool_getter, predict_fn):
+        self._pool_getter = pool_getter
+        self._predict_fn = predict_fn
+        self._batchers = {}
+        self._lock = threading.Lock()
+
+    def _get_batcher(self, model_key):
+        batcher = self._batchers.get(model_key)
+        if batcher is None:
+            with self._lock:
+                batcher = self._batchers.get(model_key)
+                if batcher is None:
+                    batcher = ModelBatcher(
+                        model_key,
+                        self._pool_getter,
+                        self._predict_fn,
+                        Config.INFERENCE_MAX_BATCH_SIZE,
+                        Config.INFERENCE_MAX_WAIT_MS,
+                        Config.INFERENCE_BATCH_WORKERS
+                    )
+                    self._batchers[model_key] = batcher
+        return batcher
+
+    def submit(self, model_key, image_array, pool=None, timeout=None):
+        """Görüntüyü ilgili modelin batch kuyruğuna gönder - pool, isteğin çözdüğü havuz"""
+        return self._get_batcher(model_key).submit(image_array, pool, timeout)
+
+    def get_metrics(self):
+        with self._lock:
+            batchers = dict(self._batchers)
+        return {key: batcher.get_metrics() for key, batcher in batchers.items()}
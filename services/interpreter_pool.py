@@ -0,0 +1,161 @@
+"""
+TFLite interpreter havuzu
+Bir interpreter aynı anda tek thread tarafından kullanılabilir; havuz her model için
+sınırlı sayıda interpreter tutar ve checkout/checkin ile paylaştırır
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Havuzda belirlenen süre içinde boş interpreter bulunamadı"""
+
+
+def restore_input_shape(interpreter, input_index, shape):
+    """
+    Giriş tensörü başka bir batch boyutuna ayarlandıysa eski şekline döndür
+    Havuza geri verilen interpreter bir sonraki tekli istekte yeniden boyutlandırılmasın
+    """
+    if list(interpreter.get_input_details()[0]['shape']) != list(shape):
+        interpreter.resize_tensor_input(input_index, list(shape))
+        interpreter.allocate_tensors()
+
+
+class InterpreterPool:
+    """
+    Model başına sınırlı interpreter havuzu
+    İlk interpreter yükleme sırasında verilir, diğerleri eşzamanlı talep
+    olduğunda `size` sınırına kadar tembel olarak oluşturulur
+    """
+
+    def __init__(self, name, factory, size, first_interpreter=None):
+        self.name = name
+        self.size = max(1, int(size))
+        self._factory = factory
+        self._cond = threading.Condition()
+        self._idle = []
+        self._created = 0
+
+        # Modelin giriş/çıkış tensör bilgileri (tüm interpreter'larda aynıdır)
+        self.input_details = None
+        self.output_details = None
+
+        # Havuzun ait olduğu model sürümü (kayıt defteri atar)
+        self.version = None
+
+        if first_interpreter is not None:
+            self.input_details = first_interpreter.get_input_details()[0]
+            self.output_details = first_interpreter.get_output_details()[0]
+            self._idle.append(first_interpreter)
+            self._created = 1
+
+        self._metrics = {
+            "checkouts": 0,
+            "saturated_checkouts": 0,  # Boş interpreter yokken bekleyen istekler
+            "timeouts": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "in_use": 0,
+            "peak_in_use": 0
+        }
+
+    @property
+    def created(self):
+        return self._created
+
+    def checkout(self, timeout=None):
+        """Havuzdan bir interpreter al - gerekirse oluştur ya da boşalmasını bekle"""
+        if timeout is None:
+            timeout = Config.INTERPRETER_POOL_TIMEOUT_SECONDS
+
+        start = time.perf_counter()
+        deadline = start + timeout
+        interpreter = None
+        saturated = False
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    interpreter = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    # Yer ayır, oluşturma işlemi kilit dışında yapılır
+                    self._created += 1
+                    break
+
+                saturated = True
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._metrics["timeouts"] += 1
+                    raise PoolTimeoutError(f"No free interpreter for {self.name} after {timeout}s")
+                self._cond.wait(remaining)
+
+            wait_ms = (time.perf_counter() - start) * 1000
+
+        if interpreter is None:
+            interpreter = self._create()
+
+        with self._cond:
+            self._metrics["checkouts"] += 1
+            self._metrics["total_wait_ms"] += wait_ms
+            self._metrics["max_wait_ms"] = max(self._metrics["max_wait_ms"], wait_ms)
+            if saturated:
+                self._metrics["saturated_checkouts"] += 1
+            self._metrics["in_use"] += 1
+            self._metrics["peak_in_use"] = max(self._metrics["peak_in_use"], self._metrics["in_use"])
+
+        return interpreter
+
+    def _create(self):
+        """Yeni interpreter oluştur, başarısız olursa ayrılan yeri geri ver"""
+        interpreter = None
+        try:
+            interpreter = self._factory()
+        except Exception as e:
+            logger.error(f"Error creating interpreter for {self.name}: {str(e)}")
+
+        if interpreter is None:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise RuntimeError(f"Could not create interpreter for {self.name}")
+
+        logger.info(f"🧵 {self.name} pool grew to {self._created}/{self.size} interpreters")
+        return interpreter
+
+    def checkin(self, interpreter):
+        """Interpreter'ı havuza geri bırak"""
+        with self._cond:
+            self._idle.append(interpreter)
+            self._metrics["in_use"] -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def interpreter(self, timeout=None):
+        """with bloğu süresince bir interpreter kullan"""
+        interpreter = self.checkout(timeout)
+        try:
+            yield interpreter
+        finally:
+            self.checkin(interpreter)
+
+    def get_metrics(self):
+        """Bekleme süresi ve doygunluk metrikleri"""
+        with self._cond:
+            metrics = dict(self._metrics)
+            metrics["size"] = self.size
+            metrics["created"] = self._created
+            metrics["idle"] = len(self._idle)
+            checkouts = metrics["checkouts"]
+            metrics["avg_wait_ms"] = round(metrics["total_wait_ms"] / checkouts, 3) if checkouts else 0.0
+            metrics["saturation_ratio"] = round(metrics["saturated_checkouts"] / checkouts, 3) if checkouts else 0.0
+            metrics["total_wait_ms"] = round(metrics["total_wait_ms"], 3)
+            metrics["max_wait_ms"] = round(metrics["max_wait_ms"], 3)
+            return metrics
@@ -0,0 +1,132 @@
+"""
+Worker bellek raporu
+/proc/self/smaps üzerinden sürecin paylaşılan ve özel belleğini, ayrıca
+.tflite model dosyası eşlemelerinin ne kadarının diğer worker'larla
+paylaşıldığını raporlar (sadece Linux). İstek başına tepe bellek, istek başında
+sıfırlanan VmHWM sayacından ölçülür
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Anonymous", "Swap")
+
+
+def _kb_to_mb(value):
+    return round(value / 1024, 2)
+
+
+def read_smaps_rollup():
+    """Süreç geneli bellek toplamları (KB)"""
+    totals = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            field = parts[0].rstrip(':')
+            if field in ROLLUP_FIELDS:
+                totals[field] = int(parts[1])
+    return totals
+
+
+def read_model_mappings(extension='.tflite'):
+    """Model dosyası eşlemelerinin paylaşılan/özel boyutları (KB)"""
+    mappings = {}
+    current = None
+    with open('/proc/self/smaps') as f:
+        for line in f:
+            parts = line.split()
+            if not parts[0].endswith(':'):
+                # Yeni eşleme başlığı: adres izin offset cihaz inode [yol]
+                path = parts[5] if len(parts) >= 6 else None
+                current = path if path and path.endswith(extension) else None
+                if current and current not in mappings:
+                    mappings[current] = {"Rss": 0, "Shared_Clean": 0, "Private_Clean": 0, "Private_Dirty": 0}
+            elif current and parts[0].rstrip(':') in mappings[current]:
+                mappings[current][parts[0].rstrip(':')] += int(parts[1])
+    return mappings
+
+
+def get_memory_report():
+    """Worker'ın özel ve paylaşılan bellek raporu (MB)"""
+    try:
+        totals = read_smaps_rollup()
+        models = read_model_mappings()
+    except OSError as e:
+        return {"available": False, "reason": str(e)}
+
+    shared = totals.get("Shared_Clean", 0) + totals.get("Shared_Dirty", 0)
+    private = totals.get("Private_Clean", 0) + totals.get("Private_Dirty", 0)
+    return {
+        "available": True,
+        "pid": os.getpid(),
+        "rss_mb": _kb_to_mb(totals.get("Rss", 0)),
+        "pss_mb": _kb_to_mb(totals.get("Pss", 0)),
+        "shared_mb": _kb_to_mb(shared),
+        "private_mb": _kb_to_mb(private),
+        "anonymous_mb": _kb_to_mb(totals.get("Anonymous", 0)),
+        "model_files": {
+            os.path.basename(path): {
+                "resident_mb": _kb_to_mb(values["Rss"]),
+                "shared_mb": _kb_to_mb(values["Shared_Clean"]),
+                "private_mb": _kb_to_mb(values["Private_Clean"] + values["Private_Dirty"])
+            }
+            for path, values in models.items()
+        }
+    }
+
+
+def read_rss_status():
+    """Güncel ve tepe RSS (KB) - /proc/self/status VmRSS ve VmHWM"""
+    values = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(('VmRSS:', 'VmHWM:')):
+                values[line.split(':')[0]] = int(line.split()[1])
+    return values.get('VmRSS', 0), values.get('VmHWM', 0)
+
+
+def reset_peak_rss():
+    """
+    Sürecin tepe RSS sayacını (VmHWM) güncel RSS'e indir - /proc/self/clear_refs'e 5 yazılır
+    Sıfırlama yapılamazsa (Linux dışı, eski çekirdek) False
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def start_request_memory(reset_peak=False):
+    """
+    İstek başındaki süreç RSS'i - ölçümler süreç geneldir
+    reset_peak: tepe sayacını sıfırla; istek sonundaki VmHWM o isteğin tepesi olur.
+    Sadece tek thread'li worker'da kullanılmalı (bir istek sıfırlarsa eşzamanlı isteğin tepesi kaybolur)
+    """
+    peak_reset = reset_peak and reset_peak_rss()
+    try:
+        rss_kb, _ = read_rss_status()
+    except OSError:
+        return None
+    return {"rss_kb": rss_kb, "peak_reset": peak_reset}
+
+
+def finish_request_memory(start):
+    """
+    İstek süresince süreç RSS'indeki değişim ve - sayaç istek başında sıfırlandıysa -
+    istek boyunca tepe RSS (MB). Sıfırlanmadıysa request_peak_rss_mb None'dır:
+    süreç ömrü boyunca tepe değer tek istek hakkında bilgi vermez
+    """
+    if start is None:
+        return None
+    try:
+        rss_kb, peak_kb = read_rss_status()
+    except OSError:
+        return None
+    return {
+        "request_peak_rss_mb": _kb_to_mb(peak_kb) if start["peak_reset"] else None,
+        "process_rss_delta_mb": _kb_to_mb(rss_kb - start["rss_kb"])
+    }
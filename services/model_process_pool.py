@@ -0,0 +1,336 @@
+"""
+Süreç havuzunda model çalıştırma
+MODEL_EXECUTION_MODE=process iken decode, boyutlandırma ve invoke ayrı süreçlerde
+yapılır; Flask worker'ının thread'leri GIL/CPU için yarışmaz ve hafif route'lar
+(/api/should-water, /api/sensor-data) inference yoğunluğunda da yanıt verir.
+Görüntü baytları pickle yerine paylaşılan bellek (SharedMemory) ile aktarılır
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+from config import Config
+from services.image_preprocessing import read_image_bytes
+
+logger = logging.getLogger(__name__)
+
+# ========== ALT SÜREÇ TARAFI ==========
+
+_worker_service = None
+_startup_barrier = None
+
+
+def _init_worker(startup_barrier):
+    """Alt süreç başlatıcı - modeller görev almadan önce yüklenir ve ısıtılır"""
+    global _worker_service, _startup_barrier
+    _startup_barrier = startup_barrier
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    from services.model_service import ModelService
+    from services.model_warmup import start_warmup
+    _worker_service = ModelService()
+    start_warmup(_worker_service.registry, background=False)
+    _worker_service.start_reloader()
+    logger.info(f"🧵 Model process {os.getpid()} ready")
+
+
+def _run_in_worker(method_name, shm_name, size, args):
+    """Paylaşılan bellekteki görüntü ile ModelService metodunu çalıştır"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    view = shm.buf[:size]
+    try:
+        return getattr(_worker_service, method_name)(view, *args)
+    finally:
+        view.release()
+        shm.close()
+
+
+def _wait_all_started(timeout):
+    """Bariyer her süreçten bir görev girince açılır - böylece tüm süreçler başlatılmış olur"""
+    _startup_barrier.wait(timeout)
+    return os.getpid()
+
+
+def _worker_status():
+    status = _worker_service.get_model_status()
+    status["pid"] = os.getpid()
+    return status
+
+
+# ========== WEB SÜRECİ TARAFI ==========
+
+class ProcessModelService:
+    """
+    ModelService ile aynı arayüzü sunan vekil
+    Bekleyen iş sayısı MODEL_PROCESS_MAX_PENDING ile sınırlıdır; kuyruk doluysa
+    istek beklemeden reddedilir, zaman aşımında hata döner
+    """
+
+    def __init__(self, processes=None, max_pending=None, timeout_seconds=None):
+        self.processes = processes or Config.MODEL_PROCESS_POOL_SIZE
+        self.max_pending = max_pending or Config.MODEL_PROCESS_MAX_PENDING
+        self.timeout_seconds = timeout_seconds or Config.MODEL_PROCESS_TIMEOUT_SECONDS
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._status_snapshot = None
+
+        self._metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "pool_restarts": 0,
+            "pending": 0,
+            "peak_pending": 0,
+            "total_ms": 0.0
+        }
+
+    def _create_executor(self):
+        # spawn: alt süreçler web sürecinin thread/kilit durumunu miras almaz
+        context = multiprocessing.get_context('spawn')
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(context.Barrier(self.processes),)
+        )
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            return self._executor
+
+    def _start_processes(self, executor, timeout, on_started=None):
+        """Tüm alt süreçleri başlat ve başlatıcılarının bitmesini bekle - başlayan pid'leri döndür"""
+        start = time.perf_counter()
+        futures = [executor.submit(_wait_all_started, timeout) for _ in range(self.processes)]
+        pids = []
+        for future in futures:
+            try:
+                pid = future.result(timeout=timeout)
+            except Exception as e:
+                logger.error(f"Model process failed to start: {str(e)}")
+                continue
+            pids.append(pid)
+            if on_started:
+                on_started(pid, (time.perf_counter() - start) * 1000)
+        return pids
+
+    def _reset_executor(self, executor):
+        """Çöken havuzu bir sonraki istekte yeniden oluşturmak üzere bırak"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self._metrics["pool_restarts"] += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, shm, started, completed):
+        """Kuyruk yerini ve paylaşılan belleği bırak"""
+        shm.close()
+        shm.unlink()
+        with self._lock:
+            self._metrics["pending"] -= 1
+            self._metrics["total_ms"] += (time.perf_counter() - started) * 1000
+            if completed:
+                self._metrics["completed"] += 1
+        self._slots.release()
+
+    def _call(self, method_name, image_data, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._metrics["rejected"] += 1
+            logger.warning(f"Model process queue full ({self.max_pending} pending)")
+            return {"error": "Inference queue is full, please retry shortly"}
+
+        try:
+            image_bytes = read_image_bytes(image_data)
+            shm = shared_memory.SharedMemory(create=True, size=max(1, len(image_bytes)))
+            shm.buf[:len(image_bytes)] = image_bytes
+        except Exception as e:
+            self._slots.release()
+            logger.error(f"Error preparing image for model process: {str(e)}")
+            return {"error": str(e)}
+
+        executor = self._get_executor()
+        started = time.perf_counter()
+        with self._lock:
+            self._metrics["submitted"] += 1
+            self._metrics["pending"] += 1
+            self._metrics["peak_pending"] = max(self._metrics["peak_pending"], self._metrics["pending"])
+
+        try:
+            future = executor.submit(_run_in_worker, method_name, shm.name, len(image_bytes), args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._release(shm, started, completed=False)
+            self._reset_executor(executor)
+            logger.error(f"Model process pool unavailable: {str(e)}")
+            return {"error": "Model process pool unavailable"}
+        # Zaman aşımında da alt süreç işi bitirene kadar yer ve bellek tutulur
+        future.add_done_callback(
+            lambda f: self._release(shm, started, completed=not f.cancelled() and f.exception() is None)
+        )
+
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            with self._lock:
+                self._metrics["timeouts"] += 1
+            logger.warning(f"Model process {method_name} timed out after {self.timeout_seconds}s")
+            return {"error": f"Inference timed out after {self.timeout_seconds}s"}
+        except BrokenProcessPool as e:
+            with self._lock:
+                self._metrics["failures"] += 1
+            self._reset_executor(executor)
+            logger.error(f"Model process crashed: {str(e)}")
+            return {"error": "Model process crashed"}
+        except Exception as e:
+            with self._lock:
+                self._metrics["failures"] += 1
+            logger.error(f"Error in model process {method_name}: {str(e)}")
+            return {"error": str(e)}
+
+    def predict_plant_type(self, image_data):
+        return self._call("predict_plant_type", image_data)
+
+    def predict_disease(self, image_data, plant_type=None, tiled=False):
+        return self._call("predict_disease", image_data, plant_type, tiled)
+
+    def identify_and_diagnose(self, image_data):
+        return self._call("identify_and_diagnose", image_data)
+
+    def _refresh_status(self, timeout, executor=None):
+        """Bir alt süreçten model durumunu al - yanıt gelmezse son bilinen durum kullanılır"""
+        executor = executor or self._get_executor()
+        try:
+            self._status_snapshot = executor.submit(_worker_status).result(timeout=timeout)
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+        except Exception as e:
+            logger.warning(f"Could not refresh model process status: {str(e)}")
+        return self._status_snapshot
+
+    def warm_up(self, background=True):
+        """
+        Her alt sürecin başlatıcısının (model yükleme + ısıtma) bitmesini bekle
+        Readiness durumu tüm süreçler hazır olunca 'ready' olur
+        """
+        from services.model_warmup import readiness
+
+        def run():
+            readiness.mark_warming()
+            executor = self._get_executor()
+            start = time.perf_counter()
+            timeout = Config.MODEL_PROCESS_STARTUP_TIMEOUT_SECONDS
+            pids = self._start_processes(
+                executor, timeout,
+                lambda pid, elapsed_ms: readiness.record(f"process-{pid}", elapsed_ms, "warm")
+            )
+
+            if not pids:
+                self._reset_executor(executor)
+                readiness.mark_failed()
+                return
+            self._refresh_status(timeout)
+            readiness.mark_ready()
+            logger.info(f"✅ {self.processes} model processes ready in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="model-process-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def reload_models(self, keys=None, force=False):
+        """
+        Yeni bir süreç havuzu başlat; modelleri yükleyip ısıtınca eskisiyle atomik değiştir
+        Eski havuz kuyruğundaki işleri bitirdikten sonra kapanır. Süreç modunda
+        tüm modeller yeni dosyalardan yüklenir (keys/force yok sayılır)
+        """
+        timeout = Config.MODEL_PROCESS_STARTUP_TIMEOUT_SECONDS
+        executor = self._create_executor()
+        pids = self._start_processes(executor, timeout)
+        if not pids:
+            executor.shutdown(wait=False, cancel_futures=True)
+            return {"error": "New model processes failed to start, keeping current models"}
+
+        previous_versions = (self._status_snapshot or {}).get("model_versions", {})
+        self._refresh_status(timeout, executor)
+        with self._lock:
+            previous, self._executor = self._executor, executor
+        if previous is not None:
+            previous.shutdown(wait=False)
+
+        versions = (self._status_snapshot or {}).get("model_versions", {})
+        logger.info(f"🔄 Model process pool swapped ({len(pids)} processes)")
+        return {
+            "status": "success",
+            "execution_mode": "process",
+            "results": [
+                {
+                    "model": key,
+                    "status": "reloaded" if previous_versions.get(key) != version else "unchanged",
+                    "version": version,
+                    "previous_version": previous_versions.get(key)
+                }
+                for key, version in versions.items()
+            ]
+        }
+
+    def start_reloader(self):
+        """Süreç modunda dosya izleyicisi her alt süreçte ayrı çalışır"""
+        return None
+
+    def model_versions(self):
+        """Alt süreçlerin son bildirdiği model sürümleri (alt sürece istek göndermez)"""
+        return (self._status_snapshot or {}).get("model_versions", {})
+
+    def get_available_plants(self):
+        status = self._status_snapshot or {}
+        return {
+            "status": "success",
+            "plants": Config.AVAILABLE_PLANTS,
+            "total_count": len(Config.AVAILABLE_PLANTS),
+            "plants_with_specific_models": list(Config.SPECIFIC_DISEASE_MODELS.keys()),
+            "available_specific_models": status.get("available_specific_models", []),
+            "loaded_specific_models": status.get("loaded_specific_models", []),
+            "disease_threshold": f"{Config.DISEASE_THRESHOLD * 100:.0f}%"
+        }
+
+    def get_metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+        finished = metrics["completed"] + metrics["timeouts"] + metrics["failures"]
+        metrics["avg_ms"] = round(metrics.pop("total_ms") / finished, 1) if finished else 0.0
+        metrics["processes"] = self.processes
+        metrics["max_pending"] = self.max_pending
+        metrics["timeout_seconds"] = self.timeout_seconds
+        return metrics
+
+    def get_model_status(self):
+        """Alt süreçteki model durumu + havuz metrikleri (durum sorgusu kısa zaman aşımıyla yapılır)"""
+        status = self._refresh_status(Config.MODEL_PROCESS_STATUS_TIMEOUT_SECONDS)
+        status = dict(status) if status else {
+            "plant_identification": False,
+            "disease_detection": False,
+            "available_specific_models": [],
+            "loaded_specific_models": [],
+            "registry": {}
+        }
+        status["execution_mode"] = "process"
+        status["process_pool"] = self.get_metrics()
+        return status
+
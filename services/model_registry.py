@@ -0,0 +1,480 @@
+"""
+Model kayıt defteri
+TFLite modellerini worker süreci başına bir kez yükler, tüm route'lar paylaşır
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config import Config
+from services.interpreter_pool import InterpreterPool
+from services.tflite_backend import create_interpreter, get_backend_info
+from services.thread_tuning import resolve_num_threads, get_threading_info
+
+logger = logging.getLogger(__name__)
+
+# Çekirdek modellerin kayıt anahtarları
+PLANT_TYPE_MODEL = "plant_type"
+GENERAL_DISEASE_MODEL = "general_disease"
+
+
+def load_tflite_interpreter(model_path, model_name, num_threads=None):
+    """Tek bir modeli farklı yöntemlerle yüklemeye çalış - num_threads None ise backend varsayılanı"""
+    if not os.path.exists(model_path):
+        logger.warning(f"{model_name} model not found: {model_path}")
+        return None
+
+    # Dosya boyutunu kontrol et
+    file_size = os.path.getsize(model_path)
+    logger.info(f"Loading {model_name} model: {model_path} (Size: {file_size} bytes)")
+
+    thread_kwargs = {'num_threads': num_threads} if num_threads else {}
+
+    # Yöntem 1: Normal TFLite yükleme
+    try:
+        interpreter = create_interpreter(model_path=model_path, **thread_kwargs)
+        interpreter.allocate_tensors()
+        logger.info(f"{model_name} TFLite model loaded successfully (Method 1)")
+        return interpreter
+    except Exception as e1:
+        logger.warning(f"Method 1 failed for {model_name}: {str(e1)}")
+
+    # Yöntem 2: Experimental delegates olmadan
+    try:
+        interpreter = create_interpreter(
+            model_path=model_path,
+            experimental_delegates=None,
+            **thread_kwargs
+        )
+        interpreter.allocate_tensors()
+        logger.info(f"{model_name} TFLite model loaded successfully (Method 2)")
+        return interpreter
+    except Exception as e2:
+        logger.warning(f"Method 2 failed for {model_name}: {str(e2)}")
+
+    # Yöntem 3: Farklı thread ayarları ile
+    try:
+        interpreter = create_interpreter(
+            model_path=model_path,
+            num_threads=1
+        )
+        interpreter.allocate_tensors()
+        logger.info(f"{model_name} TFLite model loaded successfully (Method 3)")
+        return interpreter
+    except Exception as e3:
+        logger.warning(f"Method 3 failed for {model_name}: {str(e3)}")
+
+    # Yöntem 4: Model dosyasını binary olarak oku
+    try:
+        with open(model_path, 'rb') as f:
+            model_content = f.read()
+
+        interpreter = create_interpreter(model_content=model_content, **thread_kwargs)
+        interpreter.allocate_tensors()
+        logger.info(f"{model_name} TFLite model loaded successfully (Method 4)")
+        return interpreter
+    except Exception as e4:
+        logger.error(f"All methods failed for {model_name}: {str(e4)}")
+
+    return None
+
+
+def estimate_interpreter_memory(interpreter, model_path):
+    """Interpreter bellek kullanımını tahmin et (model dosyası + tüm tensörler, üst sınır)"""
+    total = os.path.getsize(model_path)
+    for tensor in interpreter.get_tensor_details():
+        total += int(np.prod(tensor['shape'])) * np.dtype(tensor['dtype']).itemsize
+    return total
+
+
+def file_checksum(model_path):
+    """Model dosyasının SHA-256 özeti (sürüm kimliği olarak kullanılır)"""
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def describe_tensor(details):
+    """Tensör bilgisini (şekil, dtype, kuantizasyon) JSON uyumlu hale getir"""
+    if details is None:
+        return None
+    scale, zero_point = details.get('quantization', (0.0, 0))
+    return {
+        "shape": [int(d) for d in details['shape']],
+        "dtype": np.dtype(details['dtype']).name,
+        "quantized": bool(scale),
+        "scale": float(scale),
+        "zero_point": int(zero_point)
+    }
+
+
+def get_pool_size(key):
+    """Model için yapılandırılmış interpreter havuzu boyutu"""
+    return Config.INTERPRETER_POOL_SIZES.get(key, Config.INTERPRETER_POOL_SIZE)
+
+
+class LoadedModel:
+    """Yüklenmiş bir model (interpreter havuzu) ve kullanım bilgileri"""
+
+    def __init__(self, key, model_path, pool, instance_bytes, load_seconds, threading_info=None):
+        self.key = key
+        self.model_path = model_path
+        self.pool = pool
+        self.instance_bytes = instance_bytes
+        self.load_seconds = load_seconds
+        self.threading_info = threading_info or {"mode": "default", "num_threads": None}
+        self.checksum = file_checksum(model_path)
+        self.version = self.checksum[:12]
+        pool.version = self.version
+        self.loaded_at = time.time()
+        self.last_used = time.monotonic()
+        self.use_count = 0
+
+    @property
+    def memory_bytes(self):
+        """Havuzdaki tüm interpreter'ların tahmini bellek kullanımı"""
+        return self.instance_bytes * max(1, self.pool.created)
+
+    def touch(self):
+        """Son kullanım zamanını güncelle"""
+        self.last_used = time.monotonic()
+        self.use_count += 1
+
+    def to_dict(self):
+        return {
+            "model_path": self.model_path,
+            "version": self.version,
+            "checksum": self.checksum,
+            "loaded_at": self.loaded_at,
+            "memory_mb": round(self.memory_bytes / (1024 * 1024), 2),
+            "load_ms": round(self.load_seconds * 1000, 1),
+            "threading": self.threading_info,
+            "use_count": self.use_count,
+            "idle_seconds": round(time.monotonic() - self.last_used, 1),
+            "input": describe_tensor(self.pool.input_details),
+            "output": describe_tensor(self.pool.output_details),
+            "pool": self.pool.get_metrics()
+        }
+
+
+class ModelRegistry:
+    """
+    Süreç genelinde model kayıt defteri
+    Çekirdek modeller (tür tespiti + genel hastalık) bir kez yüklenir,
+    özel hastalık modelleri ilk kullanımda yüklenir ve bellek bütçesi
+    aşıldığında en az kullanılan (LRU) model bellekten çıkarılır
+    """
+
+    def __init__(self, memory_budget_bytes=None):
+        if memory_budget_bytes is None:
+            memory_budget_bytes = Config.MODEL_MEMORY_BUDGET_MB * 1024 * 1024
+        self.memory_budget_bytes = memory_budget_bytes
+
+        self._lock = threading.RLock()
+        self._core_loaded = False
+        self._core_models = {}  # key: LoadedModel
+        self._specific_models = OrderedDict()  # plant_type: LoadedModel (LRU sırası)
+        self._load_locks = {}  # plant_type: Lock (aynı model iki kez yüklenmesin)
+        self._unavailable = set()  # Yüklenemeyen özel modeller
+        self._invoke_ms = {}  # key: ısınmış tek invoke süresi (ısıtma/ölçümden, ms)
+
+        self.stats = {
+            "loads": 0,
+            "evictions": 0,
+            "hits": 0,
+            "misses": 0,
+            "reloads": 0,
+            "reload_failures": 0
+        }
+
+    def _load(self, key, model_path, model_name):
+        """Modeli yükle ve interpreter havuzu ile LoadedModel olarak sar"""
+        if not os.path.exists(model_path):
+            logger.warning(f"{model_name} model not found: {model_path}")
+            return None
+
+        pool_size = get_pool_size(key)
+        num_threads, threading_info = resolve_num_threads(key, model_path, model_name, pool_size)
+
+        start = time.perf_counter()
+        interpreter = load_tflite_interpreter(model_path, model_name, num_threads)
+        if interpreter is None:
+            return None
+
+        load_seconds = time.perf_counter() - start
+        instance_bytes = estimate_interpreter_memory(interpreter, model_path)
+        pool = InterpreterPool(
+            model_name,
+            lambda: load_tflite_interpreter(model_path, model_name, num_threads),
+            pool_size,
+            first_interpreter=interpreter
+        )
+        with self._lock:
+            self.stats["loads"] += 1
+
+        logger.info(f"📦 {model_name} registered in {load_seconds * 1000:.1f} ms (~{instance_bytes / (1024 * 1024):.2f} MB per interpreter, pool size {pool.size})")
+        return LoadedModel(key, model_path, pool, instance_bytes, load_seconds, threading_info)
+
+    # ========== CORE MODELS ==========
+
+    def load_core_models(self):
+        """Tür tespiti ve genel hastalık modellerini bir kez yükle"""
+        with self._lock:
+            if self._core_loaded:
+                return
+
+            core_models = (
+                (PLANT_TYPE_MODEL, Config.PLANT_TYPE_MODEL_PATH, "Plant type"),
+                (GENERAL_DISEASE_MODEL, Config.GENERAL_DISEASE_MODEL_PATH, "General disease"),
+            )
+            for key, model_path, model_name in core_models:
+                try:
+                    model = self._load(key, model_path, model_name)
+                    if model:
+                        self._core_models[key] = model
+                except Exception as e:
+                    logger.error(f"Error loading {model_name} model: {str(e)}")
+
+            self._core_loaded = True
+
+    def _get_core_pool(self, key):
+        self.load_core_models()
+        model = self._core_models.get(key)
+        if model is None:
+            return None
+        model.touch()
+        return model.pool
+
+    def get_plant_type_pool(self):
+        """Bitki türü tespit interpreter havuzunu döndür"""
+        return self._get_core_pool(PLANT_TYPE_MODEL)
+
+    def get_general_disease_pool(self):
+        """Genel hastalık interpreter havuzunu döndür"""
+        return self._get_core_pool(GENERAL_DISEASE_MODEL)
+
+    def has_core_model(self, key):
+        """Çekirdek model yüklü mü?"""
+        self.load_core_models()
+        return key in self._core_models
+
+    def get_pool(self, key):
+        """Anahtara göre çekirdek ya da özel model havuzunu döndür"""
+        if key in (PLANT_TYPE_MODEL, GENERAL_DISEASE_MODEL):
+            return self._get_core_pool(key)
+        return self.get_specific_pool(key)
+
+    def get_model_version(self, key):
+        """Yüklü modelin sürümü (dosya özeti) - yüklü değilse None"""
+        with self._lock:
+            model = self._core_models.get(key) or self._specific_models.get(key)
+            return model.version if model else None
+
+    def model_versions(self):
+        """Yüklü tüm modellerin sürümleri"""
+        with self._lock:
+            models = list(self._core_models.items()) + list(self._specific_models.items())
+            return {key: model.version for key, model in models}
+
+    def model_paths(self):
+        """Tüm yapılandırılmış modeller: anahtar -> (dosya yolu, model adı)"""
+        paths = {
+            PLANT_TYPE_MODEL: (Config.PLANT_TYPE_MODEL_PATH, "Plant type"),
+            GENERAL_DISEASE_MODEL: (Config.GENERAL_DISEASE_MODEL_PATH, "General disease")
+        }
+        for plant_type, model_path in Config.SPECIFIC_DISEASE_MODELS.items():
+            paths[plant_type] = (model_path, f"{plant_type} disease")
+        return paths
+
+    # ========== HOT RELOAD ==========
+
+    def reload_model(self, key, force=False):
+        """
+        Modelin yeni sürümünü arka planda yükle, ısıt ve atomik olarak değiştir
+        Eski havuzu almış istekler eski interpreter ile tamamlanır; dosya yerinde
+        değil, yeni dosya yazılıp rename ile değiştirilmelidir (eski eşleme korunur)
+        """
+        from services.model_warmup import warm_pool
+
+        if key not in self.model_paths():
+            return {"model": key, "status": "unknown"}
+        model_path, model_name = self.model_paths()[key]
+        is_core = key in (PLANT_TYPE_MODEL, GENERAL_DISEASE_MODEL)
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                current = self._core_models.get(key) if is_core else self._specific_models.get(key)
+                if not is_core and current is None:
+                    # Özel model bellekte değil - bir sonraki kullanımda yeni dosyadan yüklenir
+                    self._unavailable.discard(key)
+                    return {"model": key, "status": "not_loaded"}
+
+            if not os.path.exists(model_path):
+                return {"model": key, "status": "missing", "version": current.version if current else None}
+
+            previous_version = current.version if current else None
+            if current is not None and not force and file_checksum(model_path) == current.checksum:
+                return {"model": key, "status": "unchanged", "version": previous_version}
+
+            try:
+                model = self._load(key, model_path, model_name)
+                if model is None:
+                    raise RuntimeError("model could not be loaded")
+                invoke_ms = warm_pool(model.pool, Config.MODEL_WARMUP_ITERATIONS)
+            except Exception as e:
+                with self._lock:
+                    self.stats["reload_failures"] += 1
+                logger.error(f"Error reloading {model_name} model, keeping version {previous_version}: {str(e)}")
+                return {"model": key, "status": "failed", "version": previous_version, "error": str(e)}
+
+            with self._lock:
+                if is_core:
+                    self._core_models[key] = model
+                else:
+                    self._specific_models[key] = model
+                    self._evict_if_needed(keep=key)
+                self._invoke_ms[key] = invoke_ms
+                self.stats["reloads"] += 1
+
+        logger.info(f"🔄 {model_name} model swapped: {previous_version} -> {model.version}")
+        return {"model": key, "status": "reloaded", "version": model.version, "previous_version": previous_version}
+
+    def reload_models(self, keys=None, force=False):
+        """Verilen (ya da tüm) modelleri yeniden yükle"""
+        return [self.reload_model(key, force) for key in (keys or list(self.model_paths()))]
+
+    # ========== SPECIFIC DISEASE MODELS ==========
+
+    def has_specific_model(self, plant_type):
+        """Bitki türü için özel model dosyası mevcut mu?"""
+        model_path = Config.SPECIFIC_DISEASE_MODELS.get(plant_type)
+        return (
+            model_path is not None
+            and plant_type not in self._unavailable
+            and os.path.exists(model_path)
+        )
+
+    def get_specific_pool(self, plant_type):
+        """Özel hastalık interpreter havuzunu döndür - gerekirse ilk kullanımda yükle"""
+        model_path = Config.SPECIFIC_DISEASE_MODELS.get(plant_type)
+        if model_path is None:
+            return None
+
+        with self._lock:
+            model = self._get_cached_specific(plant_type)
+            if model is not None:
+                return model.pool
+            if plant_type in self._unavailable:
+                return None
+            load_lock = self._load_locks.setdefault(plant_type, threading.Lock())
+
+        # Yükleme global kilit dışında yapılır, diğer modeller beklemez
+        with load_lock:
+            with self._lock:
+                model = self._get_cached_specific(plant_type)
+                if model is not None:
+                    return model.pool
+                self.stats["misses"] += 1
+
+            model = self._load(plant_type, model_path, f"{plant_type} disease")
+
+            with self._lock:
+                if model is None:
+                    self._unavailable.add(plant_type)
+                    return None
+                self._specific_models[plant_type] = model
+                self._evict_if_needed(keep=plant_type)
+                model.touch()
+                return model.pool
+
+    def _get_cached_specific(self, plant_type):
+        """Önbellekteki özel modeli döndür ve LRU sırasını güncelle (kilit altında çağrılır)"""
+        model = self._specific_models.get(plant_type)
+        if model is None:
+            return None
+        self._specific_models.move_to_end(plant_type)
+        self.stats["hits"] += 1
+        model.touch()
+        return model
+
+    def _evict_if_needed(self, keep=None):
+        """Bellek bütçesi aşıldıysa en az kullanılan özel modelleri çıkar (kilit altında çağrılır)"""
+        for plant_type in list(self._specific_models.keys()):
+            if self.memory_usage_bytes() <= self.memory_budget_bytes:
+                break
+            if plant_type == keep:
+                continue
+            evicted = self._specific_models.pop(plant_type)
+            self.stats["evictions"] += 1
+            logger.info(f"♻️ Evicted {plant_type} disease model (~{evicted.memory_bytes / (1024 * 1024):.2f} MB)")
+
+    def loaded_specific_models(self):
+        """Şu anda bellekte olan özel modeller"""
+        with self._lock:
+            return list(self._specific_models.keys())
+
+    def available_specific_models(self):
+        """Dosyası mevcut olan (yüklenebilir) özel modeller"""
+        return [
+            plant_type for plant_type in Config.SPECIFIC_DISEASE_MODELS
+            if self.has_specific_model(plant_type)
+        ]
+
+    # ========== REPORTING ==========
+
+    def record_invoke_ms(self, key, invoke_ms):
+        """Modelin ölçülen tek invoke süresi - kaskad tasarruf tahmini için"""
+        with self._lock:
+            self._invoke_ms[key] = invoke_ms
+
+    def invoke_ms(self, key):
+        """Ölçülen tek invoke süresi (ms) - ölçülmediyse None"""
+        with self._lock:
+            return self._invoke_ms.get(key)
+
+    def memory_usage_bytes(self):
+        """Yüklü modellerin tahmini toplam bellek kullanımı"""
+        with self._lock:
+            models = list(self._core_models.values()) + list(self._specific_models.values())
+            return sum(model.memory_bytes for model in models)
+
+    def get_status(self):
+        """Yüklü modeller ve bellek kullanımı raporu"""
+        self.load_core_models()
+        with self._lock:
+            return {
+                "backend": get_backend_info(),
+                "threading": get_threading_info(),
+                "memory_budget_mb": round(self.memory_budget_bytes / (1024 * 1024), 2),
+                "memory_used_mb": round(self.memory_usage_bytes() / (1024 * 1024), 2),
+                "core_models": {key: model.to_dict() for key, model in self._core_models.items()},
+                "specific_models": {key: model.to_dict() for key, model in self._specific_models.items()},
+                "available_specific_models": self.available_specific_models(),
+                "measured_invoke_ms": {key: round(ms, 2) for key, ms in self._invoke_ms.items()},
+                "stats": dict(self.stats)
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """Süreç genelinde paylaşılan model kayıt defterini döndür"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
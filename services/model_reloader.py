@@ -0,0 +1,284 @@
+"""
+Model dosyası izleyici ve worker'lar arası yeniden yükleme
+models/ altındaki dosyaların değişimini (mtime, boyut, inode) periyodik olarak
+kontrol eder ve değişen modeli kayıt defterinde sıcak olarak yeniden yükler.
+
+POST /api/admin/reload-models sadece isteği alan worker'a ulaşır; bu yüzden
+istek paylaşılan işaret dosyasındaki nesli artırır ve her worker'ın izleyicisi
+yeni nesli görünce aynı yeniden yüklemeyi uygular. Worker'lar uyguladıkları nesli
+ve model sürümlerini işaretin yanındaki .workers/ klasörüne yazar
+"""
+
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def file_signature(model_path):
+    """Dosyanın değişim imzası - dosya yoksa None"""
+    try:
+        stat = os.stat(model_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class ModelReloader:
+    """
+    Arka plan izleyici thread'i
+    Değişiklik MODEL_RELOAD_SETTLE_SECONDS boyunca durulduktan sonra işlenir
+    (yazımı süren dosya yarım yüklenmez); içerik aynıysa (checksum) model değişmez
+    """
+
+    def __init__(self, registry, interval_seconds=None):
+        self.registry = registry
+        self.interval_seconds = interval_seconds or Config.MODEL_RELOAD_POLL_SECONDS
+        self._signatures = {
+            key: file_signature(model_path)
+            for key, (model_path, _) in registry.model_paths().items()
+        }
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_results = []
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+        self._thread.start()
+        logger.info(f"👀 Watching model files every {self.interval_seconds}s for hot reload")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Model reload check failed: {str(e)}")
+
+    def check(self):
+        """Değişen model dosyalarını yeniden yükle - işlenen sonuçları döndür"""
+        results = []
+        for key, (model_path, _) in self.registry.model_paths().items():
+            signature = file_signature(model_path)
+            if signature is None or signature == self._signatures.get(key):
+                continue
+            if time.time() - signature[0] / 1e9 < Config.MODEL_RELOAD_SETTLE_SECONDS:
+                continue  # Dosya hâlâ yazılıyor olabilir, sonraki turda tekrar bakılır
+
+            # Başarısız dosya her turda tekrar denenmez, yeni bir dağıtım imzayı değiştirir
+            self._signatures[key] = signature
+            results.append(self.registry.reload_model(key))
+
+        if results:
+            self.last_results = results
+        return results
+
+
+_reloader = None
+
+
+def start_model_reloader(registry):
+    """MODEL_RELOAD_POLL_SECONDS > 0 ise süreç başına bir izleyici başlat"""
+    global _reloader
+    if Config.MODEL_RELOAD_POLL_SECONDS <= 0 or _reloader is not None:
+        return _reloader
+    _reloader = ModelReloader(registry)
+    _reloader.start()
+    return _reloader
+
+
+# ========== WORKER'LAR ARASI YENİDEN YÜKLEME ==========
+
+def read_reload_marker():
+    """Paylaşılan yeniden yükleme işareti - yoksa nesil 0"""
+    try:
+        with open(Config.MODEL_RELOAD_MARKER_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"generation": 0}
+
+
+def _write_json(path, data):
+    """Okuyucular yarım dosya görmesin - geçici dosyaya yaz, rename ile değiştir"""
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temporary_path, path)
+
+
+def request_reload(models=None, force=False):
+    """İşaretin neslini artır - tüm worker'lar (isteği alan dahil) bu nesli uygular"""
+    path = Config.MODEL_RELOAD_MARKER_PATH
+    with open(path + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            marker = {
+                "generation": read_reload_marker().get("generation", 0) + 1,
+                "models": models,
+                "force": force,
+                "requested_at": time.time(),
+                "requested_by": os.getpid()
+            }
+            _write_json(path, marker)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    logger.info(f"🔄 Model reload generation {marker['generation']} requested for {models or 'all models'}")
+    return marker
+
+
+def _workers_dir():
+    return Config.MODEL_RELOAD_MARKER_PATH + '.workers'
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def worker_reload_statuses():
+    """Canlı worker'ların uyguladığı nesil ve model sürümleri - ölü worker kayıtları silinir"""
+    statuses = {}
+    try:
+        names = os.listdir(_workers_dir())
+    except OSError:
+        return statuses
+
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(_workers_dir(), name)
+        try:
+            with open(path) as f:
+                status = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not _process_alive(status.get("pid", 0)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        statuses[str(status["worker_id"])] = status
+    return statuses
+
+
+class ReloadMarkerWatcher:
+    """
+    İşaret dosyasını MODEL_RELOAD_MARKER_POLL_SECONDS'ta bir kontrol eder
+    Başlangıçtaki nesil uygulanmış sayılır - worker zaten güncel dosyalardan yükledi
+    """
+
+    def __init__(self, model_service, interval_seconds=None, worker_id=None):
+        self.model_service = model_service
+        self.interval_seconds = interval_seconds or Config.MODEL_RELOAD_MARKER_POLL_SECONDS
+        self.worker_id = worker_id or os.getpid()
+        self.applied_generation = read_reload_marker().get("generation", 0)
+        self.last_results = []
+        self._apply_lock = threading.Lock()
+        self._published = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self.publish_status()
+        threading.Thread(target=self._run, name="model-reload-marker", daemon=True).start()
+        logger.info(f"👀 Checking {Config.MODEL_RELOAD_MARKER_PATH} every {self.interval_seconds}s for reload requests")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.check()
+                self.publish_status()
+            except Exception as e:
+                logger.error(f"Model reload marker check failed: {str(e)}")
+
+    def check(self):
+        """Yeni nesil varsa yeniden yükle ve sonucu döndür, yoksa None"""
+        marker = read_reload_marker()
+        generation = marker.get("generation", 0)
+        if generation <= self.applied_generation:
+            return None
+
+        with self._apply_lock:
+            if generation <= self.applied_generation:
+                return None
+            result = self.model_service.reload_models(marker.get("models"), bool(marker.get("force", False)))
+            # Başarısız yükleme her turda tekrar denenmez - sonuç durum kaydında görünür
+            self.applied_generation = generation
+            self.last_results = result.get("results") or [{"status": "failed", "error": result.get("error")}]
+        logger.info(f"🔄 Worker {self.worker_id} applied model reload generation {generation}")
+        self.publish_status()
+        return result
+
+    def publish_status(self):
+        """Bu worker'ın nesil ve sürümlerini yaz (değiştiyse)"""
+        status = {
+            "worker_id": self.worker_id,
+            "pid": os.getpid(),
+            "generation": self.applied_generation,
+            "model_versions": self.model_service.model_versions(),
+            "last_results": self.last_results
+        }
+        if status == self._published:
+            return
+        os.makedirs(_workers_dir(), exist_ok=True)
+        _write_json(os.path.join(_workers_dir(), f"{self.worker_id}.json"), dict(status, updated_at=time.time()))
+        self._published = status
+
+
+_marker_watcher = None
+
+
+def start_reload_marker_watcher(model_service):
+    """MODEL_RELOAD_MARKER_POLL_SECONDS > 0 ise worker başına bir işaret izleyicisi başlat"""
+    global _marker_watcher
+    if Config.MODEL_RELOAD_MARKER_POLL_SECONDS <= 0 or _marker_watcher is not None:
+        return _marker_watcher
+    _marker_watcher = ReloadMarkerWatcher(model_service)
+    _marker_watcher.start()
+    return _marker_watcher
+
+
+def get_reload_marker_watcher():
+    return _marker_watcher
+
+
+def get_reload_status():
+    """Durum raporu - işaret nesli ve worker başına uygulanan nesil/sürümler"""
+    if Config.MODEL_RELOAD_MARKER_POLL_SECONDS <= 0:
+        return {"enabled": False}
+
+    generation = read_reload_marker().get("generation", 0)
+    workers = worker_reload_statuses()
+
+    # Özel modeller tembel yüklenir - sadece aynı modelin farklı sürümleri tutarsızlıktır
+    versions = {}
+    for status in workers.values():
+        for key, version in (status.get("model_versions") or {}).items():
+            versions.setdefault(key, set()).add(version)
+    mixed_versions = sorted(key for key, seen in versions.items() if len(seen) > 1)
+
+    return {
+        "enabled": True,
+        "generation": generation,
+        "poll_seconds": Config.MODEL_RELOAD_MARKER_POLL_SECONDS,
+        "this_worker": _marker_watcher.worker_id if _marker_watcher else None,
+        "workers": workers,
+        "mixed_versions": mixed_versions,
+        "consistent": not mixed_versions and all(status.get("generation") == generation for status in workers.values())
+    }
@@ -1,122 +1,59 @@
 import numpy as np
-from PIL import Image
-import tensorflow as tf
 import logging
-import os
+import threading
+import time
 from config import Config
+from services.model_registry import get_model_registry, PLANT_TYPE_MODEL, GENERAL_DISEASE_MODEL
+from services.interpreter_pool import PoolTimeoutError, restore_input_shape
+from services.inference_scheduler import InferenceScheduler
+from services.image_preprocessing import (
+    preprocess_image, read_image_bytes, decode_image, image_to_input,
+    input_size_from_shape, DEFAULT_INPUT_SHAPE
+)
+from services.result_cache import InferenceResultCache
 
 logger = logging.getLogger(__name__)
 
-class ModelService:
-    def __init__(self):
-        self.plant_type_interpreter = None
-        self.general_disease_interpreter = None
-        self.specific_disease_interpreters = {}
-        self.load_models()
+def dequantize_output(output_data, output_details):
+    """uint8/int8 çıktıyı float32'ye çevir - float modellerde dokunma"""
+    if output_data.dtype == np.float32:
+        return output_data
     
-    def load_models(self):
-        """TFLite modellerini yükle - farklı yöntemlerle dene"""
-        try:
-            # Bitki türü tespit modeli
-            self.plant_type_interpreter = self._load_single_model(
-                Config.PLANT_TYPE_MODEL_PATH, "Plant type"
-            )
-            
-            # Genel hastalık tespit modeli
-            self.general_disease_interpreter = self._load_single_model(
-                Config.GENERAL_DISEASE_MODEL_PATH, "General disease"
-            )
-            
-            # Özel hastalık modellerini yükle
-            for plant_type, model_path in Config.SPECIFIC_DISEASE_MODELS.items():
-                interpreter = self._load_single_model(model_path, f"{plant_type} disease")
-                if interpreter:
-                    self.specific_disease_interpreters[plant_type] = interpreter
-                    
-        except Exception as e:
-            logger.error(f"General error in loading TFLite models: {str(e)}")
-    
-    def _load_single_model(self, model_path, model_name):
-        """Tek bir modeli farklı yöntemlerle yüklemeye çalış"""
-        if not os.path.exists(model_path):
-            logger.warning(f"{model_name} model not found: {model_path}")
-            return None
-        
-        # Dosya boyutunu kontrol et
-        file_size = os.path.getsize(model_path)
-        logger.info(f"Loading {model_name} model: {model_path} (Size: {file_size} bytes)")
-        
-        # Yöntem 1: Normal TFLite yükleme
-        try:
-            interpreter = tf.lite.Interpreter(model_path=model_path)
-            interpreter.allocate_tensors()
-            logger.info(f"{model_name} TFLite model loaded successfully (Method 1)")
-            return interpreter
-        except Exception as e1:
-            logger.warning(f"Method 1 failed for {model_name}: {str(e1)}")
+    scale, zero_point = output_details.get('quantization', (0.0, 0))
+    if not scale:
+        return output_data.astype(np.float32)
+    return (output_data.astype(np.float32) - zero_point) * np.float32(scale)
+
+class ModelService:
+    def __init__(self, registry=None):
+        # Modeller süreç genelindeki kayıt defterinde tutulur, her istekte yeniden yüklenmez
+        self.registry = registry or get_model_registry()
+        self.registry.load_core_models()
         
-        # Yöntem 2: Experimental delegates olmadan
-        try:
-            interpreter = tf.lite.Interpreter(
-                model_path=model_path,
-                experimental_delegates=None
-            )
-            interpreter.allocate_tensors()
-            logger.info(f"{model_name} TFLite model loaded successfully (Method 2)")
-            return interpreter
-        except Exception as e2:
-            logger.warning(f"Method 2 failed for {model_name}: {str(e2)}")
+        # Eşzamanlı istekleri tek invoke'ta toplayan zamanlayıcı (opsiyonel)
+        self.scheduler = InferenceScheduler(self.registry.get_pool, self.predict_with_tflite)
         
-        # Yöntem 3: Farklı thread ayarları ile
-        try:
-            interpreter = tf.lite.Interpreter(
-                model_path=model_path,
-                num_threads=1
-            )
-            interpreter.allocate_tensors()
-            logger.info(f"{model_name} TFLite model loaded successfully (Method 3)")
-            return interpreter
-        except Exception as e3:
-            logger.warning(f"Method 3 failed for {model_name}: {str(e3)}")
+        # Aynı/benzer fotoğraflar için model çıktısı önbelleği
+        self.result_cache = InferenceResultCache() if Config.RESULT_CACHE_ENABLED else None
         
-        # Yöntem 4: Model dosyasını binary olarak oku
-        try:
-            with open(model_path, 'rb') as f:
-                model_content = f.read()
-            
-            interpreter = tf.lite.Interpreter(model_content=model_content)
-            interpreter.allocate_tensors()
-            logger.info(f"{model_name} TFLite model loaded successfully (Method 4)")
-            return interpreter
-        except Exception as e4:
-            logger.error(f"All methods failed for {model_name}: {str(e4)}")
+        # Model başına ortalama inference süresi (üstel hareketli ortalama, ms)
+        self._latency_ms = {}
         
-        return None
+        # Kaskad modu: genel model hangi oranda tek başına yanıt verdi
+        self._stats_lock = threading.Lock()
+        self._cascade_stats = {
+            "requests": 0,
+            "answered_by_general": 0,
+            "escalated_to_specific": 0
+        }
+        self._cascade_skipped = {}  # plant_type: atlanan özel model çalıştırması
+        # Karelerin batch halinde çalışmadığı (model anahtarı, sürüm) çiftleri
+        self._tiled_batch_unsupported = set()
     
-    def preprocess_image_for_tflite(self, image_data, target_size=(224, 224)):
-        """Görüntüyü TFLite model için hazırla"""
+    def preprocess_image_for_tflite(self, image_data, input_details=None):
+        """Görüntüyü TFLite model için hazırla - boyut, dtype ve kuantizasyon interpreter giriş bilgisinden alınır"""
         try:
-            # PIL Image'a çevir
-            if isinstance(image_data, bytes):
-                from io import BytesIO
-                image = Image.open(BytesIO(image_data))
-            else:
-                image = Image.open(image_data)
-            
-            # RGB'ye çevir
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Boyutlandır
-            image = image.resize(target_size)
-            
-            # NumPy array'e çevir ve normalize et
-            image_array = np.array(image, dtype=np.float32) / 255.0
-            
-            # Batch dimension ekle
-            image_array = np.expand_dims(image_array, axis=0)
-            
-            return image_array
+            return preprocess_image(image_data, input_details)
             
         except Exception as e:
             logger.error(f"Error preprocessing image for TFLite: {str(e)}")
@@ -127,6 +64,14 @@ class ModelService:
         try:
             # Input tensor bilgilerini al
             input_details = interpreter.get_input_details()
+            
+            # Batch boyutu değiştiyse input tensor'ı yeniden boyutlandır
+            input_shape = tuple(input_details[0]['shape'])
+            if input_shape != image_array.shape and input_shape[1:] == image_array.shape[1:]:
+                interpreter.resize_tensor_input(input_details[0]['index'], list(image_array.shape))
+                interpreter.allocate_tensors()
+                input_details = interpreter.get_input_details()
+            
             output_details = interpreter.get_output_details()
             
             # Input'u set et
@@ -138,53 +83,121 @@ class ModelService:
             # Output'u al
             output_data = interpreter.get_tensor(output_details[0]['index'])
             
-            return output_data
+            # Kuantize çıktıyı olasılık değerine çevir
+            return dequantize_output(output_data, output_details[0])
             
         except Exception as e:
             logger.error(f"Error in TFLite prediction: {str(e)}")
             return None
     
+    def run_model(self, model_key, image_array, pool=None):
+        """
+        Modeli çalıştır - batch açıksa zamanlayıcıya, değilse doğrudan havuza gönder
+        pool verilirse o havuz kullanılır (yeniden yükleme sırasında sürüm tutarlılığı için)
+        """
+        try:
+            if Config.INFERENCE_BATCHING_ENABLED:
+                return self.scheduler.submit(model_key, image_array, pool)
+            
+            if pool is None:
+                pool = self.registry.get_pool(model_key)
+            if pool is None:
+                return None
+            with pool.interpreter() as interpreter:
+                return self.predict_with_tflite(interpreter, image_array)
+        except (PoolTimeoutError, TimeoutError) as e:
+            logger.warning(f"Inference capacity saturated: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Error running TFLite model from pool: {str(e)}")
+            return None
+    
+    def infer(self, model_key, pool, image_data, decoded_image=None):
+        """
+        Önbellek -> ön işleme -> model zinciri
+        decoded_image verilirse görüntü tekrar decode edilmez
+        (çıktı, önbellekten mi) döndürür, hata durumunda RuntimeError fırlatır
+        """
+        image_bytes = read_image_bytes(image_data)
+        
+        lookup = None
+        if self.result_cache is not None:
+            cached, lookup = self.result_cache.get(model_key, pool.version, image_bytes)
+            if cached is not None:
+                return cached, True
+        
+        if decoded_image is not None:
+            processed_image = image_to_input(decoded_image, pool.input_details)
+        else:
+            processed_image = self.preprocess_image_for_tflite(image_bytes, pool.input_details)
+        if processed_image is None:
+            raise RuntimeError("Image preprocessing failed")
+        
+        start = time.perf_counter()
+        output = self.run_model(model_key, processed_image, pool)
+        if output is None:
+            raise RuntimeError("TFLite prediction failed")
+        self._record_latency(model_key, (time.perf_counter() - start) * 1000)
+        
+        if lookup is not None:
+            self.result_cache.put(lookup, output)
+        return output, False
+    
+    def _record_latency(self, model_key, elapsed_ms):
+        with self._stats_lock:
+            previous = self._latency_ms.get(model_key)
+            self._latency_ms[model_key] = elapsed_ms if previous is None else previous * 0.8 + elapsed_ms * 0.2
+    
+    def _estimated_latency_ms(self, model_key):
+        """
+        Modelin tahmini çalışma süresi - gerçek istek ortalaması, yoksa ısıtma/başlangıç ölçümü
+        Kaskadın atladığı özel model hiç çalışmamış olabilir
+        """
+        with self._stats_lock:
+            latency = self._latency_ms.get(model_key)
+        return latency if latency is not None else self.registry.invoke_ms(model_key)
+    
     def predict_plant_type(self, image_data):
         """Bitki türü tahmini yap - 5 sonuç döndür"""
         try:
-            if self.plant_type_interpreter is None:
+            pool = self.registry.get_plant_type_pool()
+            if pool is None:
                 # Model yoksa mock data döndür (geliştirme için)
                 return self._get_mock_plant_predictions()
             
-            processed_image = self.preprocess_image_for_tflite(image_data)
-            if processed_image is None:
-                return {"error": "Image preprocessing failed"}
-            
-            # TFLite ile tahmin yap
-            predictions = self.predict_with_tflite(self.plant_type_interpreter, processed_image)
-            if predictions is None:
-                return {"error": "TFLite prediction failed"}
+            # TFLite ile tahmin yap (önbellekte varsa model çalıştırılmaz)
+            predictions, cache_hit = self.infer(PLANT_TYPE_MODEL, pool, image_data)
             
-            # En yüksek 5 tahmini döndür
-            predictions_flat = predictions.flatten()
-            top_5_indices = np.argsort(predictions_flat)[-5:][::-1]
-            
-            results = []
-            for i, idx in enumerate(top_5_indices):
-                if idx < len(Config.AVAILABLE_PLANTS):
-                    confidence = float(predictions_flat[idx])
-                    results.append({
-                        "plant_type": Config.AVAILABLE_PLANTS[idx],
-                        "confidence": confidence,
-                        "confidence_percentage": f"{confidence * 100:.1f}%"
-                    })
-            
-            return {
-                "status": "success",
-                "predictions": results,
-                "total_available_plants": len(Config.AVAILABLE_PLANTS),
-                "model_used": "tflite"
-            }
+            return self._format_plant_predictions(predictions, cache_hit, pool.version)
             
         except Exception as e:
             logger.error(f"Error in plant type prediction: {str(e)}")
             return {"error": str(e)}
     
+    def _format_plant_predictions(self, predictions, cache_hit, model_version=None):
+        """Model çıktısından en yüksek 5 tahmini döndür"""
+        predictions_flat = predictions.flatten()
+        top_5_indices = np.argsort(predictions_flat)[-5:][::-1]
+        
+        results = []
+        for i, idx in enumerate(top_5_indices):
+            if idx < len(Config.AVAILABLE_PLANTS):
+                confidence = float(predictions_flat[idx])
+                results.append({
+                    "plant_type": Config.AVAILABLE_PLANTS[idx],
+                    "confidence": confidence,
+                    "confidence_percentage": f"{confidence * 100:.1f}%"
+                })
+        
+        return {
+            "status": "success",
+            "predictions": results,
+            "total_available_plants": len(Config.AVAILABLE_PLANTS),
+            "model_used": "tflite",
+            "model_version": model_version,
+            "cache_hit": cache_hit
+        }
+    
     def _get_mock_plant_predictions(self):
         """Model yokken test için mock data"""
         import random
@@ -212,59 +225,278 @@ class ModelService:
             "note": "Mock data - TFLite model not loaded"
         }
     
-    def predict_disease(self, image_data, plant_type=None):
-        """Hibrit hastalık tahmini - özel model varsa onu kullan, yoksa genel model"""
+    def _select_disease_model(self, plant_type):
+        """Özel model varsa onu, yoksa genel modeli seç - (model_key, pool, model_used)"""
+        # Özel model var mı kontrol et (ilk kullanımda yüklenir)
+        if plant_type:
+            pool = self.registry.get_specific_pool(plant_type)
+            if pool is not None:
+                logger.info(f"Using specific TFLite model for {plant_type}")
+                return plant_type, pool, "specific"
+        
+        logger.info(f"Using general TFLite model for plant type: {plant_type}")
+        return GENERAL_DISEASE_MODEL, self.registry.get_general_disease_pool(), "general"
+    
+    def predict_disease(self, image_data, plant_type=None, tiled=False):
+        """
+        Hibrit hastalık tahmini - özel model varsa onu kullan, yoksa genel model
+        tiled=True ise görüntü örtüşen karelere bölünerek incelenir
+        """
         try:
-            processed_image = self.preprocess_image_for_tflite(image_data)
-            if processed_image is None:
-                return {"error": "Image preprocessing failed"}
+            if tiled:
+                return self._predict_disease_tiled(image_data, plant_type)
             
-            model_used = "general"
-            interpreter = self.general_disease_interpreter
+            if Config.DISEASE_CASCADE_ENABLED:
+                result = self._predict_disease_cascade(image_data, plant_type)
+                if result is not None:
+                    return result
             
-            # Özel model var mı kontrol et
-            if plant_type and plant_type in self.specific_disease_interpreters:
-                interpreter = self.specific_disease_interpreters[plant_type]
-                model_used = "specific"
-                logger.info(f"Using specific TFLite model for {plant_type}")
-            else:
-                logger.info(f"Using general TFLite model for plant type: {plant_type}")
+            model_key, pool, model_used = self._select_disease_model(plant_type)
             
-            if interpreter is None:
+            if pool is None:
                 return {
                     "error": f"No TFLite model available ({'specific' if plant_type in Config.SPECIFIC_DISEASE_MODELS else 'general'})"
                 }
             
-            # TFLite ile tahmin yap
-            prediction = self.predict_with_tflite(interpreter, processed_image)
-            if prediction is None:
-                return {"error": "TFLite disease prediction failed"}
+            # TFLite ile tahmin yap (önbellekte varsa model çalıştırılmaz)
+            prediction, cache_hit = self.infer(model_key, pool, image_data)
             
-            # Binary classification (Healthy vs Diseased)
-            disease_probability = float(prediction[0][0])
-            is_diseased = disease_probability > Config.DISEASE_THRESHOLD
-            confidence = disease_probability if is_diseased else (1 - disease_probability)
+            return self._format_disease_result(prediction, model_used, plant_type, cache_hit, pool.version)
+            
+        except Exception as e:
+            logger.error(f"Error in disease prediction: {str(e)}")
+            return {"error": str(e)}
+    
+    def _predict_disease_cascade(self, image_data, plant_type, decoded_image=None):
+        """
+        Kaskad: önce hafif genel model, olasılık eşik etrafındaki belirsiz bantta
+        kalırsa özel model. Genel model ya da özel model yoksa None (normal akış)
+        """
+        general_pool = self.registry.get_general_disease_pool()
+        if general_pool is None or not plant_type or not self.registry.has_specific_model(plant_type):
+            return None
+        
+        prediction, cache_hit = self.infer(GENERAL_DISEASE_MODEL, general_pool, image_data, decoded_image)
+        general_probability = float(prediction[0][0])
+        band = (
+            max(0.0, Config.DISEASE_THRESHOLD - Config.DISEASE_CASCADE_BAND),
+            min(1.0, Config.DISEASE_THRESHOLD + Config.DISEASE_CASCADE_BAND)
+        )
+        cascade = {
+            "stage": "general",
+            "general_probability": general_probability,
+            "uncertain_band": [round(band[0], 4), round(band[1], 4)],
+            "specific_model_skipped": True,
+            "estimated_ms_saved": None
+        }
+        
+        specific_pool = None
+        if band[0] <= general_probability <= band[1]:
+            specific_pool = self.registry.get_specific_pool(plant_type)
+        
+        with self._stats_lock:
+            self._cascade_stats["requests"] += 1
+            if specific_pool is None:
+                self._cascade_stats["answered_by_general"] += 1
+                self._cascade_skipped[plant_type] = self._cascade_skipped.get(plant_type, 0) + 1
+            else:
+                self._cascade_stats["escalated_to_specific"] += 1
+        
+        if specific_pool is None:
+            # Net sonuç - özel model hiç çalıştırılmaz
+            saved_ms = self._estimated_latency_ms(plant_type)
+            cascade["estimated_ms_saved"] = round(saved_ms, 2) if saved_ms is not None else None
+            result = self._format_disease_result(prediction, "general", plant_type, cache_hit, general_pool.version)
+        else:
+            prediction, cache_hit = self.infer(plant_type, specific_pool, image_data, decoded_image)
+            cascade.update({"stage": "specific", "specific_model_skipped": False})
+            result = self._format_disease_result(prediction, "specific", plant_type, cache_hit, specific_pool.version)
+        
+        result["cascade"] = cascade
+        return result
+    
+    def _predict_disease_tiled(self, image_data, plant_type):
+        """
+        Kareler TILED_INFERENCE_BATCH_SIZE'lık batch'lerle aynı interpreter'da çalıştırılır
+        Kare sayısı ve batch boyutu gecikmeyi sınırlar; sonuç önbelleğe alınmaz
+        """
+        from services.tiled_inference import prepare_tiles, aggregate
+        
+        model_key, pool, model_used = self._select_disease_model(plant_type)
+        if pool is None:
+            return {"error": "No TFLite disease model available"}
+        
+        batch, rows, cols, decoded_size = prepare_tiles(read_image_bytes(image_data), pool.input_details)
+        batch_size = max(1, Config.TILED_INFERENCE_BATCH_SIZE)
+        # Sabit batch boyutlu model - kareler tek tek çalıştırılır
+        batched = (model_key, pool.version) not in self._tiled_batch_unsupported
+        
+        start = time.perf_counter()
+        outputs = []
+        with pool.interpreter() as interpreter:
+            input_index = interpreter.get_input_details()[0]['index']
+            original_shape = list(interpreter.get_input_details()[0]['shape'])
+            try:
+                for offset in range(0, len(batch), batch_size):
+                    chunk = batch[offset:offset + batch_size]
+                    output = self.predict_with_tflite(interpreter, chunk) if batched and len(chunk) > 1 else None
+                    if output is None or len(output) != len(chunk):
+                        if batched and len(chunk) > 1:
+                            batched = False
+                            self._tiled_batch_unsupported.add((model_key, pool.version))
+                            logger.warning(f"Batched tile invoke not supported by {model_key}, invoking tiles one by one")
+                            restore_input_shape(interpreter, input_index, original_shape)
+                        output = self._invoke_tiles(interpreter, chunk)
+                    outputs.append(output.reshape(len(output), -1)[:, 0])
+            finally:
+                # Havuzdaki interpreter bir sonraki tekli istek için giriş boyutuyla geri verilir
+                restore_input_shape(interpreter, input_index, original_shape)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        probabilities = np.concatenate(outputs)
+        overall, tiling = aggregate(probabilities, rows, cols)
+        
+        result = self._format_disease_result(np.array([[overall]]), model_used, plant_type, False, pool.version)
+        tiling.update({
+            "grid": [rows, cols],
+            "tiles": len(batch),
+            "overlap": Config.TILED_INFERENCE_OVERLAP,
+            "batch_size": batch_size if batched else 1,
+            "batched": batched,
+            "batches": len(outputs),
+            "aggregation": Config.TILED_INFERENCE_AGGREGATION,
+            "decoded_size": list(decoded_size),
+            "inference_ms": round(elapsed_ms, 2)
+        })
+        result["tiling"] = tiling
+        return result
+    
+    def _invoke_tiles(self, interpreter, tiles):
+        """Kareleri tek tek çalıştır - (N, sınıf) çıktı"""
+        outputs = []
+        for i in range(len(tiles)):
+            output = self.predict_with_tflite(interpreter, tiles[i:i + 1])
+            if output is None:
+                raise RuntimeError("TFLite prediction failed")
+            outputs.append(output)
+        return np.concatenate(outputs, axis=0)
+    
+    def get_cascade_stats(self):
+        """Kaskad istatistikleri ve tahmini tasarruf"""
+        with self._stats_lock:
+            stats = dict(self._cascade_stats)
+            skipped = dict(self._cascade_skipped)
+        
+        stats["enabled"] = Config.DISEASE_CASCADE_ENABLED
+        stats["band"] = Config.DISEASE_CASCADE_BAND
+        stats["early_exit_ratio"] = round(stats["answered_by_general"] / stats["requests"], 3) if stats["requests"] else 0.0
+        stats["specific_invocations_saved"] = skipped
+        latencies = {plant_type: self._estimated_latency_ms(plant_type) for plant_type in skipped}
+        stats["estimated_ms_saved"] = round(sum(
+            count * latencies[plant_type] for plant_type, count in skipped.items()
+            if latencies[plant_type] is not None
+        ), 1)
+        stats["unmeasured_models"] = sorted(plant_type for plant_type, latency in latencies.items() if latency is None)
+        return stats
+    
+    def _format_disease_result(self, prediction, model_used, plant_type, cache_hit, model_version=None):
+        """Binary classification (Healthy vs Diseased) sonucunu hazırla"""
+        disease_probability = float(prediction[0][0])
+        is_diseased = disease_probability > Config.DISEASE_THRESHOLD
+        confidence = disease_probability if is_diseased else (1 - disease_probability)
+        
+        return {
+            "status": "success",
+            "is_healthy": not is_diseased,
+            "is_diseased": is_diseased,
+            "disease_status": "Diseased" if is_diseased else "Healthy",
+            "disease_probability": disease_probability,
+            "disease_percentage": f"{disease_probability * 100:.1f}%",
+            "confidence": confidence,
+            "confidence_percentage": f"{confidence * 100:.1f}%",
+            "model_used": model_used,
+            "model_version": model_version,
+            "cache_hit": cache_hit,
+            "plant_type": plant_type,
+            "threshold_used": f"{Config.DISEASE_THRESHOLD * 100:.0f}%",
+            "message": f"Analysis completed using {model_used} TFLite model" + 
+                      (f" for {plant_type}" if model_used == "specific" else "")
+        }
+    
+    def identify_and_diagnose(self, image_data):
+        """
+        Tek decode ile tür tespiti + hastalık kontrolü
+        En olası tür için özel model varsa o, yoksa genel model kullanılır
+        """
+        try:
+            image_bytes = read_image_bytes(image_data)
+            plant_pool = self.registry.get_plant_type_pool()
+            general_pool = self.registry.get_general_disease_pool()
+            
+            # Görüntü en büyük model girişine yetecek ölçekte bir kez decode edilir
+            input_shapes = [DEFAULT_INPUT_SHAPE] + [
+                pool.input_details['shape'] for pool in (plant_pool, general_pool)
+                if pool is not None and pool.input_details is not None
+            ]
+            target_size = max((input_size_from_shape(shape) for shape in input_shapes), key=lambda size: size[0] * size[1])
+            image = decode_image(image_bytes, target_size)
+            
+            # 1. Tür tespiti
+            if plant_pool is None:
+                identification = self._get_mock_plant_predictions()
+            else:
+                predictions, cache_hit = self.infer(PLANT_TYPE_MODEL, plant_pool, image_bytes, image)
+                identification = self._format_plant_predictions(predictions, cache_hit, plant_pool.version)
+            
+            top_predictions = identification.get("predictions") or []
+            plant_type = top_predictions[0]["plant_type"] if top_predictions else None
+            
+            # 2. Hastalık kontrolü - en olası tür ile
+            diagnosis = None
+            if Config.DISEASE_CASCADE_ENABLED:
+                diagnosis = self._predict_disease_cascade(image_bytes, plant_type, image)
+            
+            if diagnosis is None:
+                model_key, disease_pool, model_used = self._select_disease_model(plant_type)
+                if disease_pool is None:
+                    diagnosis = {"error": "No TFLite disease model available"}
+                else:
+                    prediction, cache_hit = self.infer(model_key, disease_pool, image_bytes, image)
+                    diagnosis = self._format_disease_result(prediction, model_used, plant_type, cache_hit, disease_pool.version)
             
             return {
                 "status": "success",
-                "is_healthy": not is_diseased,
-                "is_diseased": is_diseased,
-                "disease_status": "Diseased" if is_diseased else "Healthy",
-                "disease_probability": disease_probability,
-                "disease_percentage": f"{disease_probability * 100:.1f}%",
-                "confidence": confidence,
-                "confidence_percentage": f"{confidence * 100:.1f}%",
-                "model_used": model_used,
                 "plant_type": plant_type,
-                "threshold_used": f"{Config.DISEASE_THRESHOLD * 100:.0f}%",
-                "message": f"Analysis completed using {model_used} TFLite model" + 
-                          (f" for {plant_type}" if model_used == "specific" else "")
+                "identification": identification,
+                "diagnosis": diagnosis
             }
             
         except Exception as e:
-            logger.error(f"Error in disease prediction: {str(e)}")
+            logger.error(f"Error in combined identification and diagnosis: {str(e)}")
             return {"error": str(e)}
     
+    def warm_up(self, background=True):
+        """Modelleri sentetik girişle ısıt - bitince worker hazır işaretlenir"""
+        from services.model_warmup import start_warmup
+        return start_warmup(self.registry, background)
+    
+    def start_reloader(self):
+        """Model dosyası izleyicisini başlat (MODEL_RELOAD_POLL_SECONDS > 0 ise)"""
+        from services.model_reloader import start_model_reloader
+        return start_model_reloader(self.registry)
+    
+    def reload_models(self, keys=None, force=False):
+        """Modelleri sıcak olarak yeniden yükle - eski sürüm işlemdeki istekleri tamamlar"""
+        return {
+            "status": "success",
+            "execution_mode": "inline",
+            "results": self.registry.reload_models(keys, force)
+        }
+    
+    def model_versions(self):
+        """Bu süreçte yüklü model sürümleri"""
+        return self.registry.model_versions()
+    
     def get_available_plants(self):
         """Mevcut bitki listesini döndür"""
         return {
@@ -272,6 +504,54 @@ class ModelService:
             "plants": Config.AVAILABLE_PLANTS,
             "total_count": len(Config.AVAILABLE_PLANTS),
             "plants_with_specific_models": list(Config.SPECIFIC_DISEASE_MODELS.keys()),
-            "loaded_specific_models": list(self.specific_disease_interpreters.keys()),
+            "available_specific_models": self.registry.available_specific_models(),
+            "loaded_specific_models": self.registry.loaded_specific_models(),
             "disease_threshold": f"{Config.DISEASE_THRESHOLD * 100:.0f}%"
         }
+
+    def get_model_status(self):
+        """Model hazır olma durumları ve kayıt defteri raporu"""
+        return {
+            "plant_identification": self.registry.has_core_model(PLANT_TYPE_MODEL),
+            "disease_detection": self.registry.has_core_model(GENERAL_DISEASE_MODEL),
+            "available_specific_models": self.registry.available_specific_models(),
+            "loaded_specific_models": self.registry.loaded_specific_models(),
+            "model_versions": self.registry.model_versions(),
+            "registry": self.registry.get_status(),
+            "execution_mode": "inline",
+            "result_cache": self.result_cache.get_stats() if self.result_cache else {"enabled": False},
+            "cascade": self.get_cascade_stats(),
+            "tiling": {
+                "max_tiles": Config.TILED_INFERENCE_MAX_TILES,
+                "overlap": Config.TILED_INFERENCE_OVERLAP,
+                "batch_size": Config.TILED_INFERENCE_BATCH_SIZE,
+                "aggregation": Config.TILED_INFERENCE_AGGREGATION
+            },
+            "batching": {
+                "enabled": Config.INFERENCE_BATCHING_ENABLED,
+                "max_batch_size": Config.INFERENCE_MAX_BATCH_SIZE,
+                "max_wait_ms": Config.INFERENCE_MAX_WAIT_MS,
+                "models": self.scheduler.get_metrics()
+            }
+        }
+
+
+_model_service = None
+_model_service_lock = threading.Lock()
+
+
+def get_model_service():
+    """
+    Süreç genelinde paylaşılan ModelService örneğini döndür
+    MODEL_EXECUTION_MODE=process ise aynı arayüzlü süreç havuzu vekili döner
+    """
+    global _model_service
+    if _model_service is None:
+        with _model_service_lock:
+            if _model_service is None:
+                if Config.MODEL_EXECUTION_MODE == "process":
+                    from services.model_process_pool import ProcessModelService
+                    _model_service = ProcessModelService()
+                else:
+                    _model_service = ModelService()
+    return _model_service
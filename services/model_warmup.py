@@ -0,0 +1,214 @@
+"""
+Model ısıtma ve hazır olma (readiness) durumu
+Başlangıçta çekirdek modellere (ve yapılandırılan özel modellere) doğru şekil ve
+tipte sentetik giriş verilerek ilk invoke maliyeti (tensor ayırma, kernel hazırlığı,
+sayfa hataları) kullanıcıdan önce ödenir. Çekirdek model yüklenemez ya da
+ısıtılamazsa worker hazır işaretlenmez. Isıtmadaki invoke süreleri kayıt
+defterine yazılır; kaskad açıkken yüklenmemiş özel modellerin süresi de geçici
+bir interpreter ile ölçülür (atlanan çalıştırmanın tasarrufu tahmin edilebilsin)
+"""
+
+import os
+
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from config import Config
+from services.model_registry import PLANT_TYPE_MODEL, GENERAL_DISEASE_MODEL
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessState:
+    """Worker'ın trafik almaya hazır olup olmadığı"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "starting"
+        self.started_at = None
+        self.finished_at = None
+        self.reason = None
+        self.models = {}  # model_key: {"warmup_ms", "status"}
+
+    def mark_warming(self):
+        with self._lock:
+            self.state = "warming"
+            self.started_at = time.time()
+            self.reason = None
+            self.models = {}
+
+    def record(self, model_key, warmup_ms, status):
+        with self._lock:
+            self.models[model_key] = {"warmup_ms": round(warmup_ms, 1), "status": status}
+
+    def mark_ready(self):
+        with self._lock:
+            self.state = "ready"
+            self.finished_at = time.time()
+
+    def mark_failed(self, reason=None):
+        with self._lock:
+            self.state = "failed"
+            self.reason = reason
+            self.finished_at = time.time()
+
+    @property
+    def is_ready(self):
+        return self.state == "ready"
+
+    def to_dict(self):
+        with self._lock:
+            total_ms = None
+            if self.started_at and self.finished_at:
+                total_ms = round((self.finished_at - self.started_at) * 1000, 1)
+            return {
+                "ready": self.state == "ready",
+                "state": self.state,
+                "warmup_total_ms": total_ms,
+                "reason": self.reason,
+                "models": dict(self.models)
+            }
+
+
+readiness = ReadinessState()
+
+
+def synthetic_input(input_details):
+    """Modelin giriş şekli ve tipinde sentetik veri"""
+    dtype = np.dtype(input_details['dtype'])
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        return np.full(input_details['shape'], (int(info.min) + int(info.max)) // 2, dtype=dtype)
+    return np.full(input_details['shape'], 0.5, dtype=dtype)
+
+
+def time_invokes(interpreter, iterations):
+    """Sentetik girişle invoke'lar - ilk (soğuk) invoke hariç medyan süre (ms)"""
+    input_details = interpreter.get_input_details()[0]
+    sample = synthetic_input(input_details)
+    samples = []
+    for _ in range(max(1, iterations) + 1):
+        start = time.perf_counter()
+        interpreter.set_tensor(input_details['index'], sample)
+        interpreter.invoke()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples[1:])
+
+
+def warm_pool(pool, iterations):
+    """Havuzdaki bir interpreter ile birkaç sentetik invoke çalıştır - ısınmış invoke süresini (ms) döndür"""
+    with pool.interpreter() as interpreter:
+        return time_invokes(interpreter, iterations)
+
+
+def warm_model(registry, model_key, iterations):
+    """Tek modeli yükle ve birkaç sentetik invoke çalıştır - toplam süreyi (ms) döndür"""
+    start = time.perf_counter()
+    pool = registry.get_pool(model_key)
+    if pool is None:
+        return None
+
+    registry.record_invoke_ms(model_key, warm_pool(pool, iterations))
+    return (time.perf_counter() - start) * 1000
+
+
+def measure_unloaded_models(registry):
+    """
+    Kaskad açıkken yüklenmemiş özel modellerin invoke süresini geçici interpreter ile ölç
+    Interpreter havuza ve bellek bütçesine eklenmez; modeller sırayla ölçülür
+    """
+    if not Config.DISEASE_CASCADE_ENABLED:
+        return {}
+
+    from services.model_registry import load_tflite_interpreter, get_pool_size
+    from services.thread_tuning import resolve_num_threads
+
+    measured = {}
+    for model_key in registry.available_specific_models():
+        if registry.invoke_ms(model_key) is not None:
+            continue
+        model_path, model_name = registry.model_paths()[model_key]
+        try:
+            num_threads, _ = resolve_num_threads(model_key, model_path, model_name, get_pool_size(model_key))
+            interpreter = load_tflite_interpreter(model_path, model_name, num_threads)
+            if interpreter is None:
+                continue
+            measured[model_key] = time_invokes(interpreter, Config.MODEL_WARMUP_ITERATIONS)
+            registry.record_invoke_ms(model_key, measured[model_key])
+            del interpreter
+        except Exception as e:
+            logger.warning(f"Could not measure {model_key} invoke latency: {str(e)}")
+    if measured:
+        logger.info(f"⏱️ Measured unloaded specific models: { {key: round(ms, 1) for key, ms in measured.items()} } ms")
+    return measured
+
+
+def warmup_model_keys(registry):
+    """Çekirdek modeller + MODEL_WARMUP_SPECIFIC_MODELS'teki mevcut özel modeller"""
+    available = registry.available_specific_models()
+    specific = [key for key in Config.MODEL_WARMUP_SPECIFIC_MODELS if key in available]
+    return [PLANT_TYPE_MODEL, GENERAL_DISEASE_MODEL] + specific
+
+
+def warm_up_models(registry, state=readiness):
+    """
+    Modelleri paralel ısıt. Çekirdek modellerden biri yüklenemez/ısıtılamazsa ya
+    da hiçbiri yoksa worker failed işaretlenir ve /ready 503 döner
+    """
+    model_keys = warmup_model_keys(registry)
+    model_paths = registry.model_paths()
+    state.mark_warming()
+    logger.info(f"🔥 Warming up {len(model_keys)} models...")
+
+    def warm(model_key):
+        try:
+            warmup_ms = warm_model(registry, model_key, Config.MODEL_WARMUP_ITERATIONS)
+            if warmup_ms is None:
+                # Dosya yoksa model yapılandırılmamıştır (mock); varsa yükleme başarısız olmuştur
+                status = "failed" if os.path.exists(model_paths[model_key][0]) else "missing"
+                state.record(model_key, 0.0, status)
+                return status
+            state.record(model_key, warmup_ms, "warm")
+            logger.info(f"🔥 {model_key} warmed up in {warmup_ms:.1f} ms")
+            return "warm"
+        except Exception as e:
+            state.record(model_key, 0.0, "failed")
+            logger.error(f"Error warming up {model_key}: {str(e)}")
+            return "failed"
+
+    with ThreadPoolExecutor(max_workers=Config.MODEL_WARMUP_PARALLELISM, thread_name_prefix="warmup") as executor:
+        statuses = dict(zip(model_keys, executor.map(warm, model_keys)))
+
+    core = {key: statuses[key] for key in (PLANT_TYPE_MODEL, GENERAL_DISEASE_MODEL)}
+    failed = [key for key, status in core.items() if status == "failed"]
+    if failed:
+        state.mark_failed(f"Core models failed to load or warm up: {', '.join(failed)}")
+    elif "warm" not in core.values():
+        state.mark_failed("No core model is available")
+    else:
+        state.mark_ready()
+        logger.info(f"✅ Worker ready - warm-up finished in {state.to_dict()['warmup_total_ms']} ms")
+        # Hazır olduktan sonra - ölçüm readiness'ı geciktirmez
+        measure_unloaded_models(registry)
+        return
+    logger.error(f"❌ Worker not ready: {state.reason}")
+
+
+def start_warmup(registry, background=True):
+    """Isıtmayı başlat - kapalıysa worker doğrudan hazır işaretlenir"""
+    if not Config.MODEL_WARMUP_ENABLED:
+        readiness.mark_ready()
+        return None
+
+    if not background:
+        warm_up_models(registry)
+        return None
+
+    thread = threading.Thread(target=warm_up_models, args=(registry,), name="model-warmup", daemon=True)
+    thread.start()
+    return thread
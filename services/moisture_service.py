@@ -8,7 +8,10 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 class MoistureService:
-    def __init__(self):
+    def __init__(self, firebase_service=None):
+        # Süreç genelinde paylaşılan Firestore erişimi (verilmezse ilk kullanımda alınır)
+        self._firebase_service = firebase_service
+        
         # Bekleyen sulama komutları (basit implementasyon)
         self.pending_commands = {}  # plant_id: command_info
         
@@ -16,16 +19,20 @@ class MoistureService:
         self.default_moisture_threshold = 30  # %30
         self.critical_moisture_threshold = 20  # %20
     
+    @property
+    def firebase_service(self):
+        if self._firebase_service is not None:
+            return self._firebase_service
+        from services.firebase_service import get_firebase_service
+        return get_firebase_service()
+    
     def check_moisture_level(self, plant_id, moisture_level):
         """
         Nem seviyesini kontrol et ve uyarı gerekip gerekmediğini belirle
         """
         try:
             # Bitki profilinden eşik değerini al
-            from services.firebase_service import FirebaseService
-            firebase_service = FirebaseService()
-            
-            profile = firebase_service.get_plant_profile(plant_id)
+            profile = self.firebase_service.get_plant_profile(plant_id)
             threshold = profile.get('moisture_threshold', self.default_moisture_threshold) if profile else self.default_moisture_threshold
             
             logger.info(f"Moisture check: {moisture_level}% (threshold: {threshold}%)")
@@ -87,10 +94,7 @@ class MoistureService:
         """Otomatik sulama yapılmalı mı?"""
         try:
             # Bitki profilinden otomatik sulama ayarını kontrol et
-            from services.firebase_service import FirebaseService
-            firebase_service = FirebaseService()
-            
-            profile = firebase_service.get_plant_profile(plant_id)
+            profile = self.firebase_service.get_plant_profile(plant_id)
             
             if not profile:
                 return False
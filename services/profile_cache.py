@@ -0,0 +1,168 @@
+"""
+Bitki profili önbelleği
+get_plant_profile neredeyse her akışta (profil/ayar okuma, nem kararları)
+çağrılır. Profiller TTL ile süreç içinde tutulur, yazmalarda güncellenir ya da
+geçersiz kılınır. Opsiyonel Firestore on_snapshot dinleyicisi diğer worker'ların
+yazmalarını da önbelleğe yansıtır
+"""
+
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+class _ProfileEntry:
+    __slots__ = ("profile", "stored_at", "expires_at")
+
+    def __init__(self, profile, ttl_seconds):
+        self.profile = profile
+        self.stored_at = time.monotonic()
+        self.expires_at = self.stored_at + ttl_seconds
+
+
+class PlantProfileCache:
+    """LRU + TTL sınırlı profil önbelleği - olmayan profil (None) de saklanır"""
+
+    def __init__(self, ttl_seconds=None, max_entries=None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.PROFILE_CACHE_TTL_SECONDS
+        self.max_entries = max_entries if max_entries is not None else Config.PROFILE_CACHE_MAX_ENTRIES
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # plant_id: _ProfileEntry
+        # plant_id: yazma/geçersiz kılma sayacı - okuma sırasında değiştiyse okunan profil bayattır
+        self._generations = {}
+        self._listener = None
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "write_updates": 0,
+            "snapshot_updates": 0,
+            "stale_reads_skipped": 0,
+            "evictions": 0,
+            "total_hit_age_ms": 0.0,
+            "max_hit_age_ms": 0.0
+        }
+
+    def get(self, plant_id):
+        """Önbellekteki profilin kopyası - yoksa/süresi dolduysa MISSING"""
+        with self._lock:
+            entry = self._entries.get(plant_id)
+            now = time.monotonic()
+            if entry is None or entry.expires_at < now:
+                if entry is not None:
+                    del self._entries[plant_id]
+                    self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return MISSING
+
+            self._entries.move_to_end(plant_id)
+            age_ms = (now - entry.stored_at) * 1000
+            self.stats["hits"] += 1
+            self.stats["total_hit_age_ms"] += age_ms
+            self.stats["max_hit_age_ms"] = max(self.stats["max_hit_age_ms"], age_ms)
+            profile = entry.profile
+
+        # Çağıranlar dönen sözlüğü değiştirebilir, önbellekteki kayıt etkilenmesin
+        return copy.deepcopy(profile)
+
+    def generation(self, plant_id):
+        """Firestore okumasından önce alınır, put(generation=...) ile geri verilir"""
+        with self._lock:
+            return self._generations.get(plant_id, 0)
+
+    def put(self, plant_id, profile, source="read", generation=None):
+        """
+        source="read" için generation verilirse ve okuma sırasında profil yazıldı ya da
+        geçersiz kılındıysa kayıt saklanmaz - eski profil TTL boyunca servis edilmez
+        """
+        with self._lock:
+            if source == "read":
+                if generation is not None and generation != self._generations.get(plant_id, 0):
+                    self.stats["stale_reads_skipped"] += 1
+                    return
+            else:
+                self._generations[plant_id] = self._generations.get(plant_id, 0) + 1
+            # Dinleyici aktifken kayıtlar güncel tutulur - TTL sadece güvenlik ağıdır
+            ttl = self.ttl_seconds * (Config.PROFILE_CACHE_LISTENER_TTL_MULTIPLIER if self._listener else 1)
+            self._entries[plant_id] = _ProfileEntry(copy.deepcopy(profile), ttl)
+            self._entries.move_to_end(plant_id)
+            if source == "write":
+                self.stats["write_updates"] += 1
+            elif source == "snapshot":
+                self.stats["snapshot_updates"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, plant_id):
+        with self._lock:
+            self._generations[plant_id] = self._generations.get(plant_id, 0) + 1
+            if self._entries.pop(plant_id, None) is not None:
+                self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def start_listener(self, db):
+        """
+        plant_profiles koleksiyonunu dinle - başka worker'ın yazması bu
+        süreçteki önbelleği de günceller. Başarısızsa sadece TTL kullanılır
+        """
+        if self._listener is not None or db is None or not Config.PROFILE_CACHE_LISTENER_ENABLED:
+            return self._listener
+
+        def on_snapshot(collection_snapshot, changes, read_time):
+            for change in changes:
+                if change.type.name == 'REMOVED':
+                    self.put(change.document.id, None, source="snapshot")
+                else:
+                    profile = change.document.to_dict()
+                    profile['id'] = change.document.id
+                    self.put(change.document.id, profile, source="snapshot")
+
+        try:
+            self._listener = db.collection('plant_profiles').on_snapshot(on_snapshot)
+            logger.info("👂 Listening to plant_profiles for cache coherence")
+        except Exception as e:
+            logger.warning(f"Plant profile listener could not start, using TTL only: {str(e)}")
+        return self._listener
+
+    def stop_listener(self):
+        if self._listener is not None:
+            try:
+                self._listener.unsubscribe()
+            except Exception as e:
+                logger.warning(f"Error stopping plant profile listener: {str(e)}")
+            self._listener = None
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            now = time.monotonic()
+            ages = [(now - entry.stored_at) * 1000 for entry in self._entries.values()]
+            stats["entries"] = len(self._entries)
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        # Bayatlık: servis edilen kaydın Firestore'dan okunduğundan bu yana geçen süre
+        stats["avg_hit_age_ms"] = round(stats.pop("total_hit_age_ms") / stats["hits"], 1) if stats["hits"] else 0.0
+        stats["max_hit_age_ms"] = round(stats["max_hit_age_ms"], 1)
+        stats["oldest_entry_age_ms"] = round(max(ages), 1) if ages else 0.0
+        stats.update({
+            "enabled": Config.PROFILE_CACHE_ENABLED,
+            "ttl_seconds": self.ttl_seconds,
+            "listener_active": self._listener is not None
+        })
+        return stats
@@ -0,0 +1,163 @@
+"""
+Inference sonuç önbelleği
+Model kimliği + sürümü ve görüntünün içerik hash'i ile model çıktısını saklar;
+opsiyonel algısal hash (dHash) modu neredeyse aynı fotoğrafları da yakalar
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import Image
+
+from config import Config
+from services.image_preprocessing import open_image
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(image_bytes):
+    """Görüntü baytlarının içerik hash'i"""
+    return hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+
+
+def perceptual_hash(image_bytes, hash_size=8):
+    """
+    64 bitlik fark hash'i (dHash)
+    Yeniden sıkıştırma, küçük kırpma ve boyut farklarına dayanıklıdır
+    """
+    image = open_image(image_bytes)
+    if image.format == 'JPEG':
+        image.draft('L', (hash_size * 8, hash_size * 8))
+    pixels = list(image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR).getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+class _CacheEntry:
+    __slots__ = ("value", "expires_at", "model_id", "phash")
+
+    def __init__(self, value, expires_at, model_id, phash):
+        self.value = value
+        self.expires_at = expires_at
+        self.model_id = model_id
+        self.phash = phash
+
+
+class InferenceResultCache:
+    """LRU + TTL sınırlı sonuç önbelleği"""
+
+    def __init__(self, max_entries=None, ttl_seconds=None, phash_enabled=None, phash_max_distance=None):
+        self.max_entries = max_entries if max_entries is not None else Config.RESULT_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.RESULT_CACHE_TTL_SECONDS
+        self.phash_enabled = phash_enabled if phash_enabled is not None else Config.RESULT_CACHE_PHASH_ENABLED
+        self.phash_max_distance = (
+            phash_max_distance if phash_max_distance is not None else Config.RESULT_CACHE_PHASH_MAX_DISTANCE
+        )
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (model_id, content_hash): _CacheEntry
+
+        self.stats = {
+            "hits": 0,
+            "phash_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+    def get(self, model_key, model_version, image_bytes):
+        """
+        Önbellekteki model çıktısını döndür
+        Dönen değer: (çıktı ya da None, arama anahtarı) - anahtar put() için tekrar kullanılır
+        """
+        model_id = (model_key, model_version)
+        lookup = {"key": (model_id, content_hash(image_bytes)), "phash": None}
+
+        with self._lock:
+            value = self._get_entry(lookup["key"])
+            if value is not None:
+                self.stats["hits"] += 1
+                return value, lookup
+
+        if self.phash_enabled:
+            try:
+                lookup["phash"] = perceptual_hash(image_bytes)
+            except Exception as e:
+                logger.warning(f"Perceptual hash failed: {str(e)}")
+
+            if lookup["phash"] is not None:
+                with self._lock:
+                    value = self._find_similar(model_id, lookup["phash"])
+                    if value is not None:
+                        self.stats["phash_hits"] += 1
+                        return value, lookup
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None, lookup
+
+    def put(self, lookup, value):
+        """Model çıktısını önbelleğe ekle"""
+        if hasattr(value, 'setflags'):
+            # Paylaşılan çıktı yanlışlıkla değiştirilmesin
+            value.setflags(write=False)
+
+        key = lookup["key"]
+        entry = _CacheEntry(value, time.monotonic() + self.ttl_seconds, key[0], lookup["phash"])
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def _get_entry(self, key):
+        """Kilit altında çağrılır - süresi dolan kaydı siler"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            del self._entries[key]
+            self.stats["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def _find_similar(self, model_id, phash):
+        """Aynı model için Hamming mesafesi eşik altındaki en yakın kaydı bul (kilit altında)"""
+        best_key, best_distance = None, self.phash_max_distance + 1
+        for key, entry in self._entries.items():
+            if entry.model_id != model_id or entry.phash is None:
+                continue
+            distance = bin(entry.phash ^ phash).count('1')
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+                if distance == 0:
+                    break
+
+        if best_key is None:
+            return None
+        return self._get_entry(best_key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["phash_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["phash_hits"]) / lookups, 3) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl_seconds
+        stats["phash_enabled"] = self.phash_enabled
+        return stats
@@ -0,0 +1,109 @@
+"""
+Sensör zaman serisi özetleri (rollup)
+Her okuma geldiğinde bitkinin 5 dakikalık, saatlik ve günlük kovaları
+Firestore alan dönüşümleriyle (Increment/Minimum/Maximum) artımlı güncellenir.
+Uzun aralıklı grafikler ham kayıtlar yerine birkaç özet doküman okur
+"""
+
+from datetime import datetime, timedelta
+
+from firebase_admin import firestore
+
+ROLLUP_COLLECTION = 'sensor_rollups'
+
+# Çözünürlük: kova uzunluğu
+RESOLUTIONS = {
+    "5m": timedelta(minutes=5),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1)
+}
+
+METRICS = ("moisture", "temperature", "humidity")
+
+
+def parse_reading_time(value):
+    """
+    Okuma zamanını yerel, saat dilimsiz datetime'a çevir (kayıtlar datetime.now() ile aynı düzlemde)
+    Okunamazsa şimdiki zaman kullanılır
+    """
+    try:
+        timestamp = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return datetime.now()
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
+
+
+def bucket_start(timestamp, resolution):
+    """Okumanın düştüğü kovanın başlangıcı"""
+    if resolution == "1d":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == "1h":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(minute=timestamp.minute - timestamp.minute % 5, second=0, microsecond=0)
+
+
+def rollup_document_id(plant_id, resolution, start):
+    """Kova başına sabit doküman: main_plant_1h_20240115T1000"""
+    return f"{plant_id}_{resolution}_{start.strftime('%Y%m%dT%H%M')}"
+
+
+def build_rollup_writes(reading):
+    """
+    Okuma için her çözünürlükte (doküman id, merge ile yazılacak alanlar)
+    Ortalama okumada sum/count'tan hesaplanır
+    """
+    timestamp = parse_reading_time(reading.get('timestamp'))
+    values = {
+        metric: float(reading[metric]) for metric in METRICS
+        if isinstance(reading.get(metric), (int, float)) and not isinstance(reading.get(metric), bool)
+    }
+
+    writes = []
+    for resolution, length in RESOLUTIONS.items():
+        start = bucket_start(timestamp, resolution)
+        fields = {
+            "plant_id": reading.get('plant_id'),
+            "resolution": resolution,
+            "timestamp": start.isoformat(),  # Kova başlangıcı - geçmiş sorgusu bu alana göre sıralar
+            "bucket_end": (start + length).isoformat(),
+            "count": firestore.Increment(1),
+            "last_timestamp": timestamp.isoformat()
+        }
+        for metric, value in values.items():
+            fields.update({
+                f"{metric}_sum": firestore.Increment(value),
+                f"{metric}_count": firestore.Increment(1),
+                f"{metric}_min": firestore.Minimum(value),
+                f"{metric}_max": firestore.Maximum(value),
+                f"{metric}_last": value
+            })
+        writes.append((rollup_document_id(reading.get('plant_id'), resolution, start), fields))
+    return writes
+
+
+def summarize_rollup(data):
+    """Özet dokümanını yanıt biçimine çevir - metrik başına min/max/mean/count/last"""
+    summary = {
+        "id": data.get('id'),
+        "plant_id": data.get('plant_id'),
+        "resolution": data.get('resolution'),
+        "timestamp": data.get('timestamp'),
+        "bucket_end": data.get('bucket_end'),
+        "count": data.get('count', 0),
+        "last_timestamp": data.get('last_timestamp')
+    }
+    for metric in METRICS:
+        count = data.get(f"{metric}_count")
+        if not count:
+            summary[metric] = None
+            continue
+        summary[metric] = {
+            "min": data.get(f"{metric}_min"),
+            "max": data.get(f"{metric}_max"),
+            "mean": round(data.get(f"{metric}_sum", 0.0) / count, 3),
+            "count": count,
+            "last": data.get(f"{metric}_last")
+        }
+    return summary
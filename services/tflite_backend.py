@@ -0,0 +1,104 @@
+"""
+TFLite interpreter backend seçimi
+Tam TensorFlow yerine hafif çalışma zamanlarını (ai_edge_litert, tflite_runtime)
+tercih eder; modül ilk model yüklenirken tembel olarak import edilir
+"""
+
+import importlib
+import logging
+import threading
+import time
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# backend adı: (modül, Interpreter sınıfına giden öznitelik yolu)
+BACKENDS = {
+    "litert": ("ai_edge_litert.interpreter", "Interpreter"),
+    "tflite_runtime": ("tflite_runtime.interpreter", "Interpreter"),
+    "tensorflow": ("tensorflow", "lite.Interpreter")
+}
+
+# OpResolverType enum'unun backend'deki yeri
+OP_RESOLVER_TYPES = {
+    "litert": ("ai_edge_litert.interpreter", "OpResolverType"),
+    "tflite_runtime": ("tflite_runtime.interpreter", "OpResolverType"),
+    "tensorflow": ("tensorflow", "lite.experimental.OpResolverType")
+}
+
+# 'auto' modunda denenme sırası - en hafiften en ağıra
+AUTO_ORDER = ("litert", "tflite_runtime", "tensorflow")
+
+_lock = threading.Lock()
+_selected = None  # (backend adı, Interpreter sınıfı, import süresi)
+
+
+def _resolve(module_name, attribute_path):
+    target = importlib.import_module(module_name)
+    for attribute in attribute_path.split('.'):
+        target = getattr(target, attribute)
+    return target
+
+
+def import_backend(name):
+    """Backend modülünü import et ve Interpreter sınıfını döndür"""
+    return _resolve(*BACKENDS[name])
+
+
+def _select_backend():
+    requested = Config.TFLITE_BACKEND
+    candidates = AUTO_ORDER if requested == "auto" else (requested,)
+
+    errors = []
+    for name in candidates:
+        if name not in BACKENDS:
+            errors.append(f"{name}: unknown backend")
+            continue
+        start = time.perf_counter()
+        try:
+            interpreter_class = import_backend(name)
+        except ImportError as e:
+            errors.append(f"{name}: {str(e)}")
+            continue
+        import_seconds = time.perf_counter() - start
+        logger.info(f"🧠 TFLite backend: {name} (import {import_seconds * 1000:.0f} ms)")
+        return name, interpreter_class, import_seconds
+
+    raise ImportError(f"No TFLite backend available ({'; '.join(errors)})")
+
+
+def get_interpreter_class():
+    """Seçilen backend'in Interpreter sınıfı - ilk çağrıda import edilir"""
+    global _selected
+    if _selected is None:
+        with _lock:
+            if _selected is None:
+                _selected = _select_backend()
+    return _selected[1]
+
+
+def create_interpreter(**kwargs):
+    """
+    Seçilen backend ile Interpreter oluştur
+    TFLITE_USE_XNNPACK kapalıysa XNNPACK ağırlıkları worker'a özel belleğe
+    yeniden paketlemez; ağırlıklar paylaşılan mmap'te kalır (daha yavaş invoke)
+    """
+    interpreter_class = get_interpreter_class()
+    if not Config.TFLITE_USE_XNNPACK and 'experimental_op_resolver_type' not in kwargs:
+        op_resolver_type = _resolve(*OP_RESOLVER_TYPES[_selected[0]])
+        kwargs['experimental_op_resolver_type'] = op_resolver_type.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+    return interpreter_class(**kwargs)
+
+
+def get_backend_info():
+    """Backend durumu - henüz model yüklenmediyse import tetiklenmez"""
+    if _selected is None:
+        return {"requested": Config.TFLITE_BACKEND, "selected": None}
+    name, _, import_seconds = _selected
+    return {
+        "requested": Config.TFLITE_BACKEND,
+        "selected": name,
+        "xnnpack": Config.TFLITE_USE_XNNPACK,
+        "import_ms": round(import_seconds * 1000, 1)
+    }
@@ -0,0 +1,238 @@
+"""
+Interpreter thread sayısı ayarı
+Model başına sabit num_threads ya da 'auto' ile başlangıçta kısa bir kalibrasyon.
+Kalibrasyon, makinedeki çekirdekleri aynı anda invoke çalıştırabilecek
+gunicorn worker'ları (ve süreç havuzu / interpreter havuzu) arasında paylaştırır
+"""
+
+import fcntl
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+
+from config import Config
+from services.tflite_backend import create_interpreter
+
+logger = logging.getLogger(__name__)
+
+_calibrations = {}  # (model_path, budget): sonuç - tahliye/yeniden yüklemede tekrar ölçülmez
+
+
+def available_cpus():
+    """Sürecin kullanabileceği çekirdek sayısı (container CPU affinity dahil)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_processes():
+    """Makinede model çalıştıran süreç sayısı"""
+    workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+    if Config.MODEL_EXECUTION_MODE == "process":
+        workers *= Config.MODEL_PROCESS_POOL_SIZE
+    return max(1, workers)
+
+
+def thread_budget():
+    """
+    Bir invoke'un kullanabileceği en fazla thread - süreç başına düşen çekirdek
+    Havuzdaki eşzamanlı invoke'ların çekişmesi throughput ölçümünde görülür
+    """
+    return max(1, available_cpus() // worker_processes())
+
+
+def configured_num_threads(key):
+    """Model için yapılandırılmış değer: None (backend varsayılanı), 'auto' ya da sayı"""
+    value = Config.INTERPRETER_NUM_THREADS_PER_MODEL.get(key, Config.INTERPRETER_NUM_THREADS)
+    if value in (None, ''):
+        return None
+    if str(value).lower() == 'auto':
+        return 'auto'
+    return max(1, int(value))
+
+
+def candidate_thread_counts(budget):
+    """1, 2, 4, ... bütçeye kadar (bütçenin kendisi dahil)"""
+    candidates, count = [], 1
+    while count < budget:
+        candidates.append(count)
+        count *= 2
+    candidates.append(budget)
+    return candidates
+
+
+def measure_latency(model_path, num_threads, iterations):
+    """Verilen thread sayısıyla medyan invoke süresi (ms)"""
+    from services.model_warmup import synthetic_input
+
+    interpreter = create_interpreter(model_path=model_path, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    details = interpreter.get_input_details()[0]
+    sample = synthetic_input(details)
+
+    samples = []
+    for i in range(iterations + 2):
+        start = time.perf_counter()
+        interpreter.set_tensor(details['index'], sample)
+        interpreter.invoke()
+        if i >= 2:  # İlk iki invoke ısınma
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def measure_throughput(model_path, num_threads, concurrency, iterations):
+    """
+    Havuz boyutu kadar interpreter aynı anda invoke ederken saniyedeki toplam invoke
+    Üretimdeki gibi her interpreter kendi thread'inde çalışır
+    """
+    from services.model_warmup import synthetic_input
+
+    interpreters = []
+    for _ in range(concurrency):
+        interpreter = create_interpreter(model_path=model_path, num_threads=num_threads)
+        interpreter.allocate_tensors()
+        details = interpreter.get_input_details()[0]
+        sample = synthetic_input(details)
+        for _ in range(2):  # Isınma
+            interpreter.set_tensor(details['index'], sample)
+            interpreter.invoke()
+        interpreters.append((interpreter, details, sample))
+
+    barrier = threading.Barrier(concurrency + 1)
+
+    def run(interpreter, details, sample):
+        barrier.wait()
+        for _ in range(iterations):
+            interpreter.set_tensor(details['index'], sample)
+            interpreter.invoke()
+
+    threads = [threading.Thread(target=run, args=entry) for entry in interpreters]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return concurrency * iterations / (time.perf_counter() - start)
+
+
+def calibrate(model_path, budget, pool_size=1):
+    """
+    Adayları ölç ve en iyisini seç
+    latency: en düşük medyan süre | throughput: havuz aynı anda çalışırken en yüksek invoke/s
+    Daha fazla thread ancak THREAD_CALIBRATION_MIN_GAIN kadar iyiyse tercih edilir
+    """
+    iterations = Config.THREAD_CALIBRATION_ITERATIONS
+    candidates = candidate_thread_counts(budget)
+
+    if Config.THREAD_CALIBRATION_OBJECTIVE == "throughput" and pool_size > 1:
+        throughput = {
+            num_threads: round(measure_throughput(model_path, num_threads, pool_size, iterations), 2)
+            for num_threads in candidates
+        }
+        best = min(throughput)
+        for num_threads in sorted(throughput):
+            if throughput[num_threads] > throughput[best] * (1 + Config.THREAD_CALIBRATION_MIN_GAIN):
+                best = num_threads
+        return {"num_threads": best, "throughput_per_s": throughput, "concurrency": pool_size, "budget": budget}
+
+    timings = {}
+    for num_threads in candidates:
+        timings[num_threads] = round(measure_latency(model_path, num_threads, iterations), 3)
+
+    best = min(timings)
+    for num_threads in sorted(timings):
+        if timings[num_threads] < timings[best] * (1 - Config.THREAD_CALIBRATION_MIN_GAIN):
+            best = num_threads
+    return {"num_threads": best, "timings_ms": timings, "budget": budget}
+
+
+def _shared_calibration(model_path, budget, pool_size):
+    """
+    Kalibrasyonu worker'lar arasında paylaş - ilk worker ölçer, diğerleri dosyadan okur
+    Aynı anda ölçüm yapan worker'lar birbirinin sonucunu bozmaz
+    """
+    cache_path = Config.THREAD_CALIBRATION_CACHE_PATH
+    if not cache_path:
+        return calibrate(model_path, budget, pool_size)
+
+    from services.model_registry import file_checksum
+    cache_key = (
+        f"{file_checksum(model_path)[:12]}:{budget}:{available_cpus()}:"
+        f"{Config.THREAD_CALIBRATION_OBJECTIVE}:{pool_size}"
+    )
+
+    with open(cache_path + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(cache_path) as f:
+                    cache = json.load(f)
+            except (OSError, ValueError):
+                cache = {}
+
+            if cache_key in cache:
+                result = dict(cache[cache_key])
+                for measurements in ("timings_ms", "throughput_per_s"):
+                    if measurements in result:
+                        result[measurements] = {int(k): v for k, v in result[measurements].items()}
+                result["source"] = "shared_cache"
+                return result
+
+            result = calibrate(model_path, budget, pool_size)
+            cache[cache_key] = result
+            with open(cache_path, 'w') as f:
+                json.dump(cache, f)
+            return result
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def resolve_num_threads(key, model_path, model_name, pool_size):
+    """
+    Model için kullanılacak num_threads ve açıklaması
+    Dönen değer: (num_threads ya da None, bilgi sözlüğü)
+    """
+    configured = configured_num_threads(key)
+    if configured is None:
+        return None, {"mode": "default", "num_threads": None}
+    if configured != 'auto':
+        logger.info(f"🧵 {model_name}: num_threads={configured} (configured)")
+        return configured, {"mode": "fixed", "num_threads": configured}
+
+    budget = thread_budget()
+    cache_key = (model_path, budget, Config.THREAD_CALIBRATION_OBJECTIVE, pool_size)
+    if cache_key not in _calibrations:
+        if budget == 1:
+            _calibrations[cache_key] = {"num_threads": 1, "timings_ms": {}, "budget": 1}
+        else:
+            try:
+                _calibrations[cache_key] = _shared_calibration(model_path, budget, pool_size)
+            except Exception as e:
+                logger.warning(f"Thread calibration failed for {model_name}: {str(e)}")
+                return None, {"mode": "default", "num_threads": None, "error": str(e)}
+
+    result = dict(_calibrations[cache_key], mode="auto", objective=Config.THREAD_CALIBRATION_OBJECTIVE)
+    if "throughput_per_s" in result:
+        measured = f"throughput {result['throughput_per_s']} invokes/s with {pool_size} concurrent interpreters"
+    else:
+        measured = f"timings {result['timings_ms']} ms"
+    logger.info(
+        f"🧵 {model_name}: num_threads={result['num_threads']} "
+        f"(auto, budget {budget} of {available_cpus()} cpus, {measured})"
+    )
+    return result["num_threads"], result
+
+
+def get_threading_info():
+    """Kalibrasyon girdileri - durum raporu için"""
+    return {
+        "available_cpus": available_cpus(),
+        "worker_processes": worker_processes(),
+        "default_num_threads": Config.INTERPRETER_NUM_THREADS or None,
+        "objective": Config.THREAD_CALIBRATION_OBJECTIVE
+    }
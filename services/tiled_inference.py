@@ -0,0 +1,91 @@
+"""
+Döşemeli (tiled) hastalık tespiti
+Yüksek çözünürlüklü fotoğraf tek 224x224 girişe küçültülünce küçük lezyonlar
+kaybolur. Görüntü örtüşen karelere bölünür, kareler tek batch halinde modele
+verilir; kare olasılıkları genel karara ve kaba bir ısı haritasına dönüştürülür
+"""
+
+import math
+
+import numpy as np
+
+from config import Config
+from services.image_preprocessing import (
+    open_image, decode_image, image_to_input, input_spec, input_size_from_shape
+)
+
+
+def tile_grid(width, height, max_tiles):
+    """Görüntü oranına göre (satır, sütun) - satır*sütun <= max_tiles"""
+    max_tiles = max(1, max_tiles)
+    rows = max(1, min(max_tiles, round(math.sqrt(max_tiles * height / width))))
+    cols = max(1, max_tiles // rows)
+    return rows, cols
+
+
+def tile_boxes(width, height, rows, cols, overlap):
+    """
+    Örtüşen karelerin (sol, üst, sağ, alt) kutuları, satır sırasıyla
+    Komşu kareler kare boyunun overlap oranı kadar ortak alan paylaşır
+    """
+    tile_width = width / (cols - (cols - 1) * overlap)
+    tile_height = height / (rows - (rows - 1) * overlap)
+    step_x = tile_width * (1 - overlap)
+    step_y = tile_height * (1 - overlap)
+
+    boxes = []
+    for row in range(rows):
+        for col in range(cols):
+            left, top = round(col * step_x), round(row * step_y)
+            boxes.append((left, top, min(width, round(left + tile_width)), min(height, round(top + tile_height))))
+    return boxes
+
+
+def build_tile_batch(image, boxes, input_details):
+    """Kareleri model girişine çevirip (N, H, W, C) batch dizisine yaz"""
+    input_shape, dtype, _, _ = input_spec(input_details)
+    batch = np.empty((len(boxes),) + tuple(int(d) for d in input_shape[1:]), dtype=dtype)
+    for i, box in enumerate(boxes):
+        # image_to_input thread buffer'ı döndürür - bir sonraki kareden önce kopyalanır
+        batch[i] = image_to_input(image.crop(box), input_details)[0]
+    return batch
+
+
+def aggregate(probabilities, rows, cols):
+    """Kare olasılıklarından genel olasılık ve ısı haritası"""
+    heat_map = probabilities.reshape(rows, cols)
+    if Config.TILED_INFERENCE_AGGREGATION == "mean":
+        overall = float(probabilities.mean())
+    else:
+        # Tek hastalıklı yaprak bitkiyi hasta yapar
+        overall = float(probabilities.max())
+
+    hottest = int(np.argmax(probabilities))
+    return overall, {
+        "heat_map": [[round(float(p), 4) for p in row] for row in heat_map],
+        "max_tile": {"row": hottest // cols, "col": hottest % cols, "probability": round(float(probabilities[hottest]), 4)},
+        "mean_probability": round(float(probabilities.mean()), 4),
+        "diseased_tiles": int((probabilities > Config.DISEASE_THRESHOLD).sum())
+    }
+
+
+def prepare_tiles(image_data, input_details):
+    """
+    Görüntüyü karelere yetecek en küçük ölçekte tek sefer decode edip batch'i hazırla
+    Dönen değer: (batch, satır, sütun, decode edilen boyut)
+    """
+    input_shape, _, _, _ = input_spec(input_details)
+    input_width, input_height = input_size_from_shape(input_shape)
+
+    # Izgara başlıktaki boyuttan kurulur (decode yok); her kare model girişinden
+    # küçük olmayacak şekilde draft ölçeği seçilir
+    width, height = open_image(image_data).size
+    rows, cols = tile_grid(width, height, Config.TILED_INFERENCE_MAX_TILES)
+    overlap = Config.TILED_INFERENCE_OVERLAP
+    image = decode_image(image_data, (
+        math.ceil(input_width * (cols - (cols - 1) * overlap)),
+        math.ceil(input_height * (rows - (rows - 1) * overlap))
+    ))
+
+    boxes = tile_boxes(image.width, image.height, rows, cols, overlap)
+    return build_tile_batch(image, boxes, input_details), rows, cols, image.size
@@ -0,0 +1,153 @@
+"""
+Görsel yükleme doğrulaması
+Gövde baytları belleğe okunmadan önce bildirilen içerik tipi, dosya imzası
+(magic bytes) ve başlıktaki piksel boyutu kontrol edilir. Sıkıştırma
+bombaları decode edilmeden reddedilir. Geçici dosyaya taşmış büyük yüklemeler
+belleğe okunmaz, salt okunur eşlenir (mmap)
+"""
+
+import io
+import logging
+import mmap
+import threading
+
+from PIL import Image
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Dosya imzası: format
+SIGNATURES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+)
+
+CONTENT_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp"
+}
+
+# Mobil istemciler dosya tipini her zaman bildirmez - imza belirleyicidir
+GENERIC_CONTENT_TYPES = ("", "application/octet-stream")
+
+
+class UploadValidationError(Exception):
+    """Geçersiz yükleme - status_code route'un döneceği HTTP kodudur"""
+
+    def __init__(self, message, status_code=400, reason="invalid"):
+        super().__init__(message)
+        self.status_code = status_code
+        self.reason = reason
+
+
+_stats_lock = threading.Lock()
+_stats = {"accepted": 0, "rejected": {}}
+
+
+def _reject(message, status_code, reason):
+    with _stats_lock:
+        _stats["rejected"][reason] = _stats["rejected"].get(reason, 0) + 1
+    logger.warning(f"Image upload rejected ({reason}): {message}")
+    raise UploadValidationError(message, status_code, reason)
+
+
+def sniff_format(header):
+    """İlk baytlardan görsel formatı - tanınmıyorsa None"""
+    for signature, image_format in SIGNATURES:
+        if header.startswith(signature):
+            return image_format
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+def stream_size(stream):
+    """Akışın bayt uzunluğu (konum korunur)"""
+    position = stream.tell()
+    stream.seek(0, 2)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+def map_upload(stream, size_bytes):
+    """
+    Yüklemenin içeriği - büyük dosyalar salt okunur eşlenmiş memoryview olarak döner
+    (sayfalar dosya destekli kalır, RSS'e anonim kopya eklenmez). Eşleme dosya
+    kapandıktan sonra da geçerlidir; arka plan yüklemesi istekten uzun yaşayabilir
+    """
+    if size_bytes >= Config.UPLOAD_MMAP_MIN_BYTES:
+        try:
+            return memoryview(mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ))
+        except (OSError, ValueError, AttributeError, io.UnsupportedOperation):
+            pass  # Bellekteki akış (BytesIO) - dosya tanımlayıcısı yok
+    data = stream.read()
+    stream.seek(0)
+    return data
+
+
+def validate_image_upload(image_file):
+    """
+    Yüklenen dosyayı doğrula ve içeriğini döndür
+    Dönen değer: (bytes ya da eşlenmiş memoryview, bilgi sözlüğü); geçersizse UploadValidationError
+    """
+    declared = (image_file.mimetype or "").lower()
+    if declared not in GENERIC_CONTENT_TYPES and declared not in CONTENT_TYPES.values():
+        _reject(f"Unsupported content type: {declared}", 415, "content_type")
+
+    stream = image_file.stream
+    stream.seek(0)
+    image_format = sniff_format(stream.read(16))
+    stream.seek(0)
+    if image_format is None or image_format not in Config.IMAGE_ALLOWED_FORMATS:
+        _reject("File is not a supported image (JPEG, PNG or WebP expected)", 415, "signature")
+    if declared not in GENERIC_CONTENT_TYPES and declared != CONTENT_TYPES[image_format]:
+        _reject(f"Content type {declared} does not match {image_format} data", 415, "content_type_mismatch")
+
+    size_bytes = stream_size(stream)
+    if size_bytes > Config.IMAGE_MAX_UPLOAD_BYTES:
+        _reject(f"Image is larger than {Config.IMAGE_MAX_UPLOAD_BYTES} bytes", 413, "file_size")
+
+    # Image.open sadece başlığı okur - piksel verisi decode edilmez. Sınır aşağıda
+    # açıkça kontrol edilir; Pillow'un süreç genelindeki MAX_IMAGE_PIXELS ayarına dokunulmaz
+    try:
+        with Image.open(stream) as probe:
+            width, height = probe.size
+    except Image.DecompressionBombError as e:
+        _reject(str(e), 413, "dimensions")
+    except Exception as e:
+        _reject(f"Image header could not be read: {str(e)}", 400, "header")
+    finally:
+        stream.seek(0)
+
+    if width * height > Config.IMAGE_MAX_PIXELS:
+        _reject(
+            f"Image dimensions {width}x{height} exceed the {Config.IMAGE_MAX_PIXELS} pixel limit", 413, "dimensions"
+        )
+
+    image_bytes = map_upload(stream, size_bytes)
+    with _stats_lock:
+        _stats["accepted"] += 1
+
+    return image_bytes, {
+        "format": image_format,
+        "content_type": CONTENT_TYPES[image_format],
+        "width": width,
+        "height": height,
+        "size_bytes": size_bytes
+    }
+
+
+def get_upload_stats():
+    """Kabul/ret sayaçları ve geçerli sınırlar"""
+    with _stats_lock:
+        stats = {"accepted": _stats["accepted"], "rejected": dict(_stats["rejected"])}
+    stats.update({
+        "allowed_formats": list(Config.IMAGE_ALLOWED_FORMATS),
+        "max_pixels": Config.IMAGE_MAX_PIXELS,
+        "max_upload_bytes": Config.IMAGE_MAX_UPLOAD_BYTES,
+        "mmap_min_bytes": Config.UPLOAD_MMAP_MIN_BYTES
+    })
+    return stats
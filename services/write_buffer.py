@@ -0,0 +1,324 @@
+"""
+Firestore write-behind tamponu
+Sensör, nem ve sulama kayıtları istek thread'inde yazılmaz; tampona eklenir ve
+arka plan thread'i bunları en fazla 500 yazmalık WriteBatch commit'leriyle
+(boyut ya da süre dolunca) Firestore'a gönderir. Kapanışta tampon boşaltılır.
+
+Yeniden denemeler güvenlidir: her kayıt tampona girerken sabit doküman id'si
+alır ve her batch aynı commit'te bir işaret dokümanı oluşturur (create). Sonucu
+belirsiz bir commit aslında yazılmışsa tekrar denemede işaret zaten vardır,
+batch yazılmış sayılır - rollup'lardaki Increment'ler iki kez uygulanmaz.
+Yeniden denemeleri tükenen batch kuyruğun başına geri konur; WRITE_BUFFER_MAX_REQUEUES
+kez geri konduktan sonra ya da max_pending aşılacaksa atılır ve sayılır.
+Tampon dolduğunda istek thread'i yeniden deneme beklemesi yapmaz: tek deneme
+yapar, flusher o an commit ediyorsa en eski kayıtları atar
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Firestore'un tek WriteBatch'te izin verdiği en fazla yazma - commit işareti bir yazma kullanır
+FIRESTORE_BATCH_LIMIT = 500
+
+# Batch başına commit işareti - expire_at alanına Firestore TTL politikası tanımlanabilir
+COMMIT_MARKER_COLLECTION = 'write_buffer_commits'
+COMMIT_MARKER_TTL = timedelta(days=1)
+
+
+def new_document_id():
+    """Firestore otomatik id'si yerine tampona girerken verilen sabit id (20 karakter)"""
+    return uuid.uuid4().hex[:20]
+
+
+def already_committed(error):
+    """İşaret dokümanı zaten var (ALREADY_EXISTS / 409) - önceki deneme commit olmuş"""
+    return type(error).__name__ in ("AlreadyExists", "Conflict") or getattr(error, "code", None) == 409
+
+
+class PendingWrite:
+    """
+    Tampondaki tek yazma - document_id yoksa burada verilir, yeniden denemede
+    aynı doküman yazılır. batch_id ilk commit denemesinde atanır, requeues
+    batch'in kaç kez kuyruğa geri konduğunu sayar
+    """
+
+    __slots__ = ("collection", "data", "document_id", "merge", "queued_at", "batch_id", "requeues")
+
+    def __init__(self, collection, data, document_id=None, merge=False):
+        self.collection = collection
+        self.data = data
+        self.document_id = document_id or new_document_id()
+        self.merge = merge
+        self.queued_at = time.monotonic()
+        self.batch_id = None
+        self.requeues = 0
+
+
+class WriteBehindBuffer:
+    """Boyut/süre tetiklemeli toplu Firestore yazıcı"""
+
+    def __init__(self, db_provider, max_batch=None, flush_interval=None, max_pending=None):
+        self._db_provider = db_provider
+        self.max_batch = min(FIRESTORE_BATCH_LIMIT - 1, max_batch or Config.WRITE_BUFFER_MAX_BATCH)
+        self.flush_interval = flush_interval or Config.WRITE_BUFFER_FLUSH_INTERVAL_SECONDS
+        self.max_pending = max_pending or Config.WRITE_BUFFER_MAX_PENDING
+
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()  # Commit'ler sırayla yapılır
+        self._pending = deque()
+        self._pid = None
+
+        self._metrics = {
+            "enqueued": 0,
+            "written": 0,
+            "commits": 0,
+            "retries": 0,
+            "failed_commits": 0,
+            "requeued_writes": 0,
+            "dropped_writes": 0,
+            "dead_lettered_writes": 0,
+            "recovered_commits": 0,
+            "inline_flushes": 0,
+            "skipped_mock": 0,
+            "total_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "last_flush_at": None
+        }
+
+    def _ensure_worker(self):
+        """Thread'ler fork'tan sağ çıkmaz - süreç değiştiyse tamponu ve flusher'ı yeniden kur"""
+        with self._condition:
+            if self._pid == os.getpid():
+                return
+            # Üst süreçten kalan kayıtları üst süreç yazar - alt süreçte tekrar yazılmaz
+            self._pending = deque()
+            self._flush_lock = threading.Lock()
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="firestore-write-buffer", daemon=True).start()
+
+    def add(self, collection, data, document_id=None, merge=False):
+        """Yazmayı tampona ekle - tampon doluysa çağıran thread'de bir batch denenir"""
+        self._ensure_worker()
+
+        with self._condition:
+            self._pending.append(PendingWrite(collection, data, document_id, merge))
+            self._metrics["enqueued"] += 1
+            pending = len(self._pending)
+            if pending >= self.max_batch:
+                self._condition.notify()
+
+        if pending > self.max_pending:
+            # Backpressure: Firestore yavaşsa bellek sınırsız büyümez
+            self._inline_flush()
+
+    def _inline_flush(self):
+        """
+        İstek thread'inde backpressure - yeniden deneme beklemesi yapılmaz. Flusher
+        o an commit ediyorsa (beklemeleri sürüyor olabilir) kilit beklenmez, tampon
+        en eski kayıtlar atılarak max_pending'e indirilir
+        """
+        if not self._flush_lock.acquire(blocking=False):
+            self._drop_oldest()
+            return
+        try:
+            with self._condition:
+                self._metrics["inline_flushes"] += 1
+            self._flush_batch(max_retries=0)
+        finally:
+            self._flush_lock.release()
+
+    def _drop_oldest(self):
+        """Tamponu max_pending'e indir - atılan kayıtlar dropped_writes'a sayılır"""
+        with self._condition:
+            dropped = 0
+            while len(self._pending) > self.max_pending:
+                self._pending.popleft()
+                dropped += 1
+            self._metrics["dropped_writes"] += dropped
+        if dropped:
+            logger.error(f"Write buffer full while a commit is in progress, dropped {dropped} oldest writes")
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._pending) >= self.max_batch, timeout=self.flush_interval)
+            try:
+                while self._flush_once() >= self.max_batch:
+                    pass
+            except Exception as e:
+                logger.error(f"Write buffer flush failed: {str(e)}")
+
+    def _take_batch(self):
+        """
+        Sıradaki batch - geri konmuş bir batch aynı içerik ve batch_id ile alınır
+        (önceki denemesi commit olmuşsa işaret dokümanı bunu gösterir)
+        """
+        with self._condition:
+            if self._pending and self._pending[0].batch_id is not None:
+                batch_id = self._pending[0].batch_id
+                writes = []
+                while self._pending and self._pending[0].batch_id == batch_id:
+                    writes.append(self._pending.popleft())
+                return writes
+
+            count = min(self.max_batch, len(self._pending))
+            writes = [self._pending.popleft() for _ in range(count)]
+        if writes:
+            batch_id = uuid.uuid4().hex
+            for write in writes:
+                write.batch_id = batch_id
+        return writes
+
+    def _requeue(self, writes):
+        """
+        Commit edilemeyen batch'i kuyruğun başına geri koy - WRITE_BUFFER_MAX_REQUEUES
+        kez geri konduysa ya da max_pending aşılacaksa at ve say
+        """
+        with self._condition:
+            if writes[0].requeues >= Config.WRITE_BUFFER_MAX_REQUEUES:
+                self._metrics["dead_lettered_writes"] += len(writes)
+                collections = sorted({write.collection for write in writes})
+                logger.error(
+                    f"Dropping batch {writes[0].batch_id} ({len(writes)} writes to {', '.join(collections)}) "
+                    f"after {writes[0].requeues} requeues"
+                )
+                return
+            if len(self._pending) + len(writes) > self.max_pending:
+                self._metrics["dropped_writes"] += len(writes)
+                logger.error(
+                    f"Write buffer full ({len(self._pending)} pending), dropping {len(writes)} writes that could not be committed"
+                )
+                return
+            for write in writes:
+                write.requeues += 1
+            self._pending.extendleft(reversed(writes))
+            self._metrics["requeued_writes"] += len(writes)
+
+    def _commit(self, db, writes):
+        """Yazmaları ve batch'in commit işaretini tek WriteBatch'te commit et"""
+        batch = db.batch()
+        for write in writes:
+            doc_ref = db.collection(write.collection).document(write.document_id)
+            batch.set(doc_ref, write.data, merge=write.merge)
+        batch.create(db.collection(COMMIT_MARKER_COLLECTION).document(writes[0].batch_id), {
+            "writes": len(writes),
+            "created_at": datetime.now().isoformat(),
+            "expire_at": datetime.now() + COMMIT_MARKER_TTL
+        })
+        batch.commit()
+
+    def _flush_once(self):
+        """
+        Bir batch'i yeniden denemelerle commit et - commit edilen kayıt sayısını döndür
+        Başarısız batch kuyruğa geri konur ve 0 döner
+        """
+        with self._flush_lock:
+            return self._flush_batch(Config.WRITE_BUFFER_MAX_RETRIES)
+
+    def _flush_batch(self, max_retries):
+        """Sıradaki batch'i en fazla max_retries yeniden denemeyle commit et (_flush_lock tutulurken)"""
+        writes = self._take_batch()
+        if not writes:
+            return 0
+
+        db = self._db_provider()
+        if db is None:
+            with self._condition:
+                self._metrics["skipped_mock"] += len(writes)
+            logger.warning(f"Firebase not initialized, skipping {len(writes)} buffered writes")
+            return len(writes)
+
+        start = time.perf_counter()
+        for attempt in range(max_retries + 1):
+            try:
+                self._commit(db, writes)
+                break
+            except Exception as e:
+                if already_committed(e):
+                    # Önceki denemenin sonucu belirsizdi ama yazılmış
+                    with self._condition:
+                        self._metrics["recovered_commits"] += 1
+                    break
+                if attempt < max_retries:
+                    with self._condition:
+                        self._metrics["retries"] += 1
+                    time.sleep(Config.WRITE_BUFFER_RETRY_BACKOFF_SECONDS * (2 ** attempt))
+                else:
+                    with self._condition:
+                        self._metrics["failed_commits"] += 1
+                    logger.error(f"Could not commit {len(writes)} buffered writes after {attempt + 1} attempts, requeueing: {str(e)}")
+                    self._requeue(writes)
+                    return 0
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._condition:
+            self._metrics["written"] += len(writes)
+            self._metrics["commits"] += 1
+            self._metrics["total_flush_ms"] += elapsed_ms
+            self._metrics["max_flush_ms"] = max(self._metrics["max_flush_ms"], elapsed_ms)
+            self._metrics["last_flush_at"] = time.time()
+        return len(writes)
+
+    def flush(self, timeout=None):
+        """Tampondaki her şeyi şimdi yaz (kapanışta) - tampon boşaldıysa True"""
+        if self._pid != os.getpid():
+            return True
+        deadline = time.monotonic() + (timeout if timeout is not None else Config.WRITE_BUFFER_SHUTDOWN_TIMEOUT_SECONDS)
+        while self._pending and time.monotonic() < deadline:
+            self._flush_once()
+        if self._pending:
+            logger.error(f"Write buffer shutdown timed out with {len(self._pending)} writes pending")
+        return not self._pending
+
+    def get_metrics(self):
+        with self._condition:
+            metrics = dict(self._metrics)
+            metrics["queue_depth"] = len(self._pending)
+            oldest = self._pending[0].queued_at if self._pending else None
+        metrics["oldest_pending_age_ms"] = round((time.monotonic() - oldest) * 1000, 1) if oldest else 0.0
+        metrics["avg_flush_ms"] = round(metrics.pop("total_flush_ms") / metrics["commits"], 2) if metrics["commits"] else 0.0
+        metrics["max_flush_ms"] = round(metrics["max_flush_ms"], 2)
+        metrics["writes_per_commit"] = round(metrics["written"] / metrics["commits"], 1) if metrics["commits"] else 0.0
+        metrics.update({
+            "enabled": Config.WRITE_BUFFER_ENABLED,
+            "max_batch": self.max_batch,
+            "flush_interval_seconds": self.flush_interval,
+            "max_pending": self.max_pending
+        })
+        return metrics
+
+
+def _firestore_client():
+    from services.firebase_service import get_firebase_service
+    return get_firebase_service().db
+
+
+_write_buffer = None
+_write_buffer_lock = threading.Lock()
+
+
+def get_write_buffer():
+    """Süreç genelinde paylaşılan write-behind tamponunu döndür"""
+    global _write_buffer
+    if _write_buffer is None:
+        with _write_buffer_lock:
+            if _write_buffer is None:
+                _write_buffer = WriteBehindBuffer(_firestore_client)
+                atexit.register(_write_buffer.flush)
+    return _write_buffer
+
+
+def flush_write_buffer():
+    """Gunicorn worker_exit ve atexit için - tampon hiç kullanılmadıysa bir şey yapmaz"""
+    if _write_buffer is not None:
+        _write_buffer.flush()
@@ -0,0 +1,10 @@
+"""
+Birim testleri - Flask, Firestore ve TFLite gerektirmeyen servis parçaları
+Çalıştırma: python -m pytest -q
+"""
+
+import os
+import sys
+
+# `pytest` doğrudan çalıştırıldığında da config/services import edilebilsin
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
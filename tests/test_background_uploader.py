@@ -0,0 +1,82 @@
+import threading
+import time
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from services.background_uploader import BackgroundUploader, UploadQueueFullError, skipped_upload
+
+
+def jpeg_bytes():
+    buffer = BytesIO()
+    Image.new('RGB', (64, 48), (40, 160, 60)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class FakeFirebase:
+    """Storage yüklemesi release() çağrılana kadar bekler"""
+
+    def __init__(self):
+        self.released = threading.Event()
+        self.uploaded = []
+        self.saved = {}
+
+    def build_image_name(self, path, filename):
+        return f"{path}/{filename}"
+
+    def image_public_url(self, blob_name):
+        return f"https://storage.test/{blob_name}"
+
+    def upload_image_bytes(self, data, blob_name, content_type=None):
+        self.released.wait(5)
+        self.uploaded.append(blob_name)
+        return self.image_public_url(blob_name)
+
+    def save_image_upload(self, upload_id, upload, record_collections=()):
+        self.saved[upload_id] = (upload["status"], record_collections)
+        return True
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_full_queue_rejects_without_blocking_and_queued_uploads_finish():
+    firebase = FakeFirebase()
+    uploader = BackgroundUploader(workers=1, queue_size=1, max_retries=0)
+
+    first = uploader.submit(firebase, jpeg_bytes(), "disease_checks", "a.jpg", "image/jpeg", ('disease_checks',))
+    assert wait_for(lambda: uploader.get_status(first["upload_id"])["status"] == "uploading")
+    second = uploader.submit(firebase, jpeg_bytes(), "disease_checks", "b.jpg", "image/jpeg", ('disease_checks',))
+
+    start = time.perf_counter()
+    with pytest.raises(UploadQueueFullError):
+        uploader.submit(firebase, jpeg_bytes(), "disease_checks", "c.jpg", "image/jpeg")
+    assert time.perf_counter() - start < 0.5
+    assert uploader.get_metrics()["rejected_queue_full"] == 1
+
+    firebase.released.set()
+    assert uploader.drain(timeout=5)
+    assert firebase.saved == {
+        first["upload_id"]: ("uploaded", ('disease_checks',)),
+        second["upload_id"]: ("uploaded", ('disease_checks',))
+    }
+    # URL'ler kuyruğa alırken hesaplanan adreslerle aynı
+    assert uploader.get_status(first["upload_id"])["thumbnail_url"] == first["thumbnail_url"]
+
+
+def test_skipped_upload_has_the_upload_reference_shape():
+    firebase = FakeFirebase()
+    firebase.released.set()
+    queued = BackgroundUploader(workers=1, queue_size=1).submit(firebase, jpeg_bytes(), "p", "a.jpg", "image/jpeg")
+
+    skipped = skipped_upload("queue full")
+
+    assert set(skipped) == set(queued)
+    assert skipped["status"] == "skipped"
+    assert skipped["image_url"] is None and skipped["files"] == {}
+    assert skipped["upload_id"] != queued["upload_id"]
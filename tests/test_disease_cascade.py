@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from config import Config
+from services.model_registry import GENERAL_DISEASE_MODEL
+from services.model_service import ModelService
+
+
+class FakePool:
+    def __init__(self, version):
+        self.version = version
+
+
+class FakeRegistry:
+    def __init__(self, specific_models=("Aloe Vera",), invoke_ms=None):
+        self.specific_models = set(specific_models)
+        self.general_pool = FakePool("general-v1")
+        self.specific_pool = FakePool("aloe-v1")
+        self.specific_requests = 0
+        self._invoke_ms = dict(invoke_ms or {})
+
+    def load_core_models(self):
+        pass
+
+    def get_pool(self, key):
+        return None
+
+    def get_general_disease_pool(self):
+        return self.general_pool
+
+    def has_specific_model(self, plant_type):
+        return plant_type in self.specific_models
+
+    def get_specific_pool(self, plant_type):
+        self.specific_requests += 1
+        return self.specific_pool if plant_type in self.specific_models else None
+
+    def invoke_ms(self, key):
+        return self._invoke_ms.get(key)
+
+
+@pytest.fixture(autouse=True)
+def cascade_config(monkeypatch):
+    monkeypatch.setattr(Config, "DISEASE_CASCADE_ENABLED", True)
+    monkeypatch.setattr(Config, "DISEASE_CASCADE_BAND", 0.15)
+    monkeypatch.setattr(Config, "DISEASE_THRESHOLD", 0.85)
+    monkeypatch.setattr(Config, "RESULT_CACHE_ENABLED", False)
+
+
+def make_service(general_probability, specific_probability=0.99, **registry_options):
+    service = ModelService(registry=FakeRegistry(**registry_options))
+    outputs = {GENERAL_DISEASE_MODEL: general_probability, "Aloe Vera": specific_probability}
+    service.infer = lambda model_key, pool, image_data, decoded_image=None: (
+        np.array([[outputs[model_key]]], dtype=np.float32), False
+    )
+    return service
+
+
+@pytest.mark.parametrize("probability", [0.05, 0.5, 0.69])
+def test_clear_general_result_skips_specific_model(probability):
+    service = make_service(probability, invoke_ms={"Aloe Vera": 12.5})
+
+    result = service._predict_disease_cascade(b"image", "Aloe Vera")
+
+    assert result["model_used"] == "general"
+    assert result["cascade"]["stage"] == "general"
+    assert result["cascade"]["uncertain_band"] == [0.7, 1.0]
+    # Özel model hiç çalışmadı - tahmini süre başlangıç ölçümünden gelir
+    assert result["cascade"]["estimated_ms_saved"] == 12.5
+    assert service.registry.specific_requests == 0
+
+
+@pytest.mark.parametrize("probability", [0.71, 0.85, 1.0])
+def test_uncertain_general_result_escalates_to_specific_model(probability):
+    service = make_service(probability, specific_probability=0.2)
+
+    result = service._predict_disease_cascade(b"image", "Aloe Vera")
+
+    assert result["model_used"] == "specific"
+    assert result["cascade"]["stage"] == "specific"
+    assert result["cascade"]["general_probability"] == pytest.approx(probability)
+    assert result["is_healthy"] is True
+
+
+def test_cascade_needs_a_specific_model():
+    service = make_service(0.1, specific_models=())
+
+    assert service._predict_disease_cascade(b"image", "Aloe Vera") is None
+    assert service._predict_disease_cascade(b"image", None) is None
+
+
+def test_cascade_stats_use_measured_and_observed_latency():
+    service = make_service(0.1, invoke_ms={"Aloe Vera": 10.0})
+    for _ in range(3):
+        service._predict_disease_cascade(b"image", "Aloe Vera")
+
+    stats = service.get_cascade_stats()
+    assert stats["answered_by_general"] == 3
+    assert stats["early_exit_ratio"] == 1.0
+    assert stats["estimated_ms_saved"] == 30.0
+    assert stats["unmeasured_models"] == []
+
+    # Gerçek istek ortalaması başlangıç ölçümünün yerine geçer
+    service._record_latency("Aloe Vera", 20.0)
+    assert service.get_cascade_stats()["estimated_ms_saved"] == 60.0
+
+
+def test_unmeasured_specific_model_is_reported():
+    service = make_service(0.1)
+    service._predict_disease_cascade(b"image", "Aloe Vera")
+
+    stats = service.get_cascade_stats()
+    assert stats["estimated_ms_saved"] == 0
+    assert stats["unmeasured_models"] == ["Aloe Vera"]
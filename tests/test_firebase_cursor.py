@@ -0,0 +1,100 @@
+import pytest
+
+from services.firestore_pagination import decode_cursor, encode_cursor, fetch_page
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("2024-01-15T10:30:00.123456", "AbC123xyz")
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2024-01-15T10:30:00.123456", "AbC123xyz")
+
+
+def test_cursor_round_trip_with_unicode_and_null_timestamp():
+    assert decode_cursor(encode_cursor(None, "bitki_ğüş")) == (None, "bitki_ğüş")
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor("2024-01-15", "")])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+class FakeDocument:
+    def __init__(self, document_id, data):
+        self.id = document_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeQuery:
+    """Firestore sorgusu yerine - zincirlenen çağrıları kaydeder, limit kadar doküman döndürür"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.calls = []
+
+    def order_by(self, field, direction=None):
+        self.calls.append(("order_by", field, direction))
+        return self
+
+    def start_after(self, values):
+        self.calls.append(("start_after", values))
+        return self
+
+    def limit(self, count):
+        self.calls.append(("limit", count))
+        self._limit = count
+        return self
+
+    def stream(self):
+        return iter(self.documents[:self._limit])
+
+
+def make_documents(count):
+    return [FakeDocument(f"doc{i}", {"timestamp": f"2024-01-15T10:{59 - i:02d}:00", "moisture": i}) for i in range(count)]
+
+
+def test_fetch_page_over_fetches_one_and_returns_cursor():
+    query = FakeQuery(make_documents(5))
+
+    history, next_cursor = fetch_page(query, 3, None)
+
+    assert ("limit", 4) in query.calls
+    assert [record["id"] for record in history] == ["doc0", "doc1", "doc2"]
+    assert decode_cursor(next_cursor) == ("2024-01-15T10:57:00", "doc2")
+    assert query.calls[:2] == [
+        ("order_by", "timestamp", "DESCENDING"),
+        ("order_by", "__name__", "DESCENDING")
+    ]
+    assert not any(call[0] == "start_after" for call in query.calls)
+
+
+def test_fetch_page_last_page_has_no_cursor():
+    history, next_cursor = fetch_page(FakeQuery(make_documents(3)), 3, None)
+
+    assert len(history) == 3
+    assert next_cursor is None
+
+
+def test_fetch_page_starts_after_cursor():
+    query = FakeQuery(make_documents(2))
+
+    fetch_page(query, 10, decode_cursor(encode_cursor("2024-01-15T10:57:00", "doc2")))
+
+    assert ("start_after", {"timestamp": "2024-01-15T10:57:00", "__name__": "doc2"}) in query.calls
+
+
+def test_fetch_page_transform_keeps_id():
+    def summarize(data):
+        return {"id": data["id"], "timestamp": data["timestamp"], "level": data["moisture"] * 10}
+
+    history, next_cursor = fetch_page(FakeQuery(make_documents(3)), 2, None, summarize)
+
+    assert history == [
+        {"id": "doc0", "timestamp": "2024-01-15T10:59:00", "level": 0},
+        {"id": "doc1", "timestamp": "2024-01-15T10:58:00", "level": 10}
+    ]
+    assert decode_cursor(next_cursor) == ("2024-01-15T10:58:00", "doc1")
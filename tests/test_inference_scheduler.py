@@ -0,0 +1,143 @@
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from services.inference_scheduler import ModelBatcher, _PendingRequest
+
+INPUT_SHAPE = [1, 4]
+
+
+class FakeInterpreter:
+    def __init__(self, resizable=True):
+        self.resizable = resizable
+        self.shape = list(INPUT_SHAPE)
+        self.resizes = []
+
+    def get_input_details(self):
+        return [{"index": 0, "shape": np.array(self.shape)}]
+
+    def resize_tensor_input(self, index, shape):
+        if not self.resizable and shape[0] != INPUT_SHAPE[0]:
+            raise ValueError("Cannot resize input with fixed batch dimension")
+        self.resizes.append(list(shape))
+        self.shape = list(shape)
+
+    def allocate_tensors(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, version, interpreter=None):
+        self.version = version
+        self.interpreter_instance = interpreter or FakeInterpreter()
+
+    @contextmanager
+    def interpreter(self, timeout=None):
+        yield self.interpreter_instance
+
+
+class FakePredict:
+    """Her invoke'un batch boyutunu kaydeder; fail_batched ile batch invoke'u geçici olarak başarısız olur"""
+
+    def __init__(self, fail_batched=0):
+        self.calls = []
+        self.fail_batched = fail_batched
+        self._lock = threading.Lock()
+
+    def __call__(self, interpreter, image_array):
+        with self._lock:
+            self.calls.append(len(image_array))
+            if len(image_array) > 1 and self.fail_batched:
+                self.fail_batched -= 1
+                return None
+        return image_array.sum(axis=1, keepdims=True)
+
+
+def make_batcher(predict, max_batch_size=4, max_wait_ms=0):
+    return ModelBatcher("plant_type", lambda key: None, predict, max_batch_size, max_wait_ms)
+
+
+def make_requests(pool, count):
+    return [_PendingRequest(np.full((1, 4), i, dtype=np.float32), pool) for i in range(count)]
+
+
+def test_batch_results_are_distributed_and_shape_restored():
+    predict = FakePredict()
+    pool = FakePool("v1")
+    requests = make_requests(pool, 3)
+
+    make_batcher(predict)._execute(requests)
+
+    assert predict.calls == [3]
+    assert [float(request.result[0][0]) for request in requests] == [0.0, 4.0, 8.0]
+    # Havuza tekli giriş boyutuyla geri verilir
+    assert pool.interpreter_instance.shape == INPUT_SHAPE
+
+
+def test_transient_prediction_error_keeps_batching_enabled():
+    predict = FakePredict(fail_batched=1)
+    batcher = make_batcher(predict)
+    pool = FakePool("v1")
+
+    first = make_requests(pool, 2)
+    batcher._execute(first)
+    assert predict.calls == [2, 1, 1]
+    assert all(request.result is not None for request in first)
+
+    batcher._execute(make_requests(pool, 2))
+    assert predict.calls[-1] == 2
+    assert batcher.get_metrics()["batch_unsupported_versions"] == []
+
+
+def test_resize_failure_disables_batching_for_that_version_only():
+    predict = FakePredict()
+    batcher = make_batcher(predict)
+    fixed_pool = FakePool("v1", FakeInterpreter(resizable=False))
+
+    batcher._execute(make_requests(fixed_pool, 2))
+    batcher._execute(make_requests(fixed_pool, 2))
+    assert predict.calls == [1, 1, 1, 1]
+    assert batcher.get_metrics()["batch_unsupported_versions"] == ["v1"]
+
+    # Yeniden yüklenen sürüm batch'i tekrar dener
+    batcher._execute(make_requests(FakePool("v2"), 2))
+    assert predict.calls[-1] == 2
+
+
+def test_output_batch_mismatch_disables_batching():
+    batcher = make_batcher(lambda interpreter, image_array: image_array[:1].sum(axis=1, keepdims=True))
+    pool = FakePool("v1")
+    requests = make_requests(pool, 2)
+
+    batcher._execute(requests)
+
+    assert [float(request.result[0][0]) for request in requests] == [0.0, 4.0]
+    assert batcher.get_metrics()["batch_unsupported_versions"] == ["v1"]
+    assert pool.interpreter_instance.shape == INPUT_SHAPE
+
+
+def test_requests_on_different_pools_are_not_batched_together():
+    predict = FakePredict()
+    batcher = make_batcher(predict, max_batch_size=4, max_wait_ms=300)
+    old_pool, new_pool = FakePool("v1"), FakePool("v2")
+    results = {}
+
+    def submit(name, pool, value):
+        results[name] = batcher.submit(np.full((1, 4), value, dtype=np.float32), pool, timeout=5)
+
+    threads = [
+        threading.Thread(target=submit, args=(f"request-{i}", pool, i))
+        for i, pool in enumerate((old_pool, new_pool, old_pool, new_pool))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert sorted(predict.calls) == [2, 2]
+    assert old_pool.interpreter_instance.resizes[0] == [2, 4]
+    assert new_pool.interpreter_instance.resizes[0] == [2, 4]
+    assert {name: float(result[0][0]) for name, result in results.items()} == {
+        "request-0": 0.0, "request-1": 4.0, "request-2": 8.0, "request-3": 12.0
+    }
@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+from services.interpreter_pool import InterpreterPool, PoolTimeoutError
+
+
+class FakeInterpreter:
+    def get_input_details(self):
+        return [{"index": 0, "shape": [1, 224, 224, 3]}]
+
+    def get_output_details(self):
+        return [{"index": 1, "shape": [1, 2]}]
+
+
+def test_checkout_times_out_when_pool_is_exhausted():
+    pool = InterpreterPool("test", FakeInterpreter, 1, first_interpreter=FakeInterpreter())
+    held = pool.checkout(timeout=0.05)
+
+    with pytest.raises(PoolTimeoutError):
+        pool.checkout(timeout=0.05)
+
+    metrics = pool.get_metrics()
+    assert metrics["timeouts"] == 1
+    assert metrics["in_use"] == 1
+
+    pool.checkin(held)
+    assert pool.checkout(timeout=0.05) is held
+
+
+def test_waiting_checkout_gets_released_interpreter():
+    pool = InterpreterPool("test", FakeInterpreter, 1, first_interpreter=FakeInterpreter())
+    held = pool.checkout(timeout=0.05)
+    result = {}
+
+    waiter = threading.Thread(target=lambda: result.setdefault("interpreter", pool.checkout(timeout=2)))
+    waiter.start()
+    pool.checkin(held)
+    waiter.join(timeout=2)
+
+    assert result["interpreter"] is held
+    assert pool.get_metrics()["saturated_checkouts"] == 1
+
+
+def test_pool_grows_lazily_up_to_size():
+    pool = InterpreterPool("test", FakeInterpreter, 2, first_interpreter=FakeInterpreter())
+    first = pool.checkout(timeout=0.05)
+    second = pool.checkout(timeout=0.05)
+
+    assert first is not second
+    assert pool.created == 2
+    with pytest.raises(PoolTimeoutError):
+        pool.checkout(timeout=0.05)
+
+
+def test_failed_factory_releases_reserved_slot():
+    pool = InterpreterPool("test", lambda: None, 2, first_interpreter=FakeInterpreter())
+    pool.checkout(timeout=0.05)
+
+    with pytest.raises(RuntimeError):
+        pool.checkout(timeout=0.05)
+    assert pool.created == 1
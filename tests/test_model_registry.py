@@ -0,0 +1,77 @@
+import pytest
+
+from config import Config
+from services import model_registry
+from services.interpreter_pool import InterpreterPool
+from services.model_registry import LoadedModel, ModelRegistry
+
+MODEL_BYTES = 100
+
+
+class FakeInterpreter:
+    def get_input_details(self):
+        return [{"index": 0, "shape": [1, 224, 224, 3], "dtype": "float32"}]
+
+    def get_output_details(self):
+        return [{"index": 1, "shape": [1, 2], "dtype": "float32"}]
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Bütçesi iki özel modele yeten, TFLite yüklemeyen kayıt defteri"""
+    models = {}
+    for plant_type in ("aloe_vera", "baris_cicegi", "pasa_kilici"):
+        model_path = tmp_path / f"{plant_type}.tflite"
+        model_path.write_bytes(plant_type.encode())
+        models[plant_type] = str(model_path)
+    monkeypatch.setattr(Config, "SPECIFIC_DISEASE_MODELS", models)
+
+    def fake_load(self, key, model_path, model_name):
+        pool = InterpreterPool(model_name, FakeInterpreter, 1, first_interpreter=FakeInterpreter())
+        self.stats["loads"] += 1
+        return LoadedModel(key, model_path, pool, MODEL_BYTES, 0.0)
+
+    monkeypatch.setattr(ModelRegistry, "_load", fake_load)
+    return ModelRegistry(memory_budget_bytes=2 * MODEL_BYTES + MODEL_BYTES // 2)
+
+
+def test_least_recently_used_specific_model_is_evicted(registry):
+    registry.get_specific_pool("aloe_vera")
+    registry.get_specific_pool("baris_cicegi")
+    registry.get_specific_pool("aloe_vera")  # aloe_vera tekrar en son kullanılan
+    registry.get_specific_pool("pasa_kilici")
+
+    assert registry.loaded_specific_models() == ["aloe_vera", "pasa_kilici"]
+    assert registry.stats["evictions"] == 1
+    assert registry.memory_usage_bytes() <= registry.memory_budget_bytes
+
+
+def test_evicted_model_is_reloaded_on_next_use(registry):
+    for plant_type in ("aloe_vera", "baris_cicegi", "pasa_kilici"):
+        registry.get_specific_pool(plant_type)
+
+    assert registry.get_specific_pool("aloe_vera") is not None
+    assert registry.stats["loads"] == 4
+    assert "aloe_vera" in registry.loaded_specific_models()
+
+
+def test_model_larger_than_budget_is_kept(registry):
+    registry.memory_budget_bytes = MODEL_BYTES // 2
+    registry.get_specific_pool("aloe_vera")
+    registry.get_specific_pool("baris_cicegi")
+
+    # İstenen model bütçeyi tek başına aşsa da çıkarılmaz, diğerleri çıkarılır
+    assert registry.loaded_specific_models() == ["baris_cicegi"]
+
+
+def test_unknown_plant_type_has_no_pool(registry):
+    assert registry.get_specific_pool("kaktus") is None
+    assert registry.stats["loads"] == 0
+
+
+def test_cache_hits_do_not_reload(registry, monkeypatch):
+    first = registry.get_specific_pool("aloe_vera")
+    monkeypatch.setattr(model_registry.ModelRegistry, "_load", lambda *args: pytest.fail("model reloaded"))
+
+    assert registry.get_specific_pool("aloe_vera") is first
+    assert registry.stats["hits"] == 1
@@ -0,0 +1,99 @@
+import json
+import os
+
+import pytest
+
+from config import Config
+from services import model_reloader
+from services.model_reloader import ReloadMarkerWatcher, get_reload_status, request_reload
+
+
+class FakeModelService:
+    """reload_models çağrılarını kaydeder, her yeniden yüklemede sürümü ilerletir"""
+
+    def __init__(self):
+        self.reloads = []
+        self.versions = {"plant_type": "v1"}
+
+    def reload_models(self, keys=None, force=False):
+        self.reloads.append((keys, force))
+        self.versions = {"plant_type": f"v{len(self.reloads) + 1}"}
+        return {"status": "success", "results": [{"model": "plant_type", "status": "reloaded"}]}
+
+    def model_versions(self):
+        return dict(self.versions)
+
+
+@pytest.fixture(autouse=True)
+def marker_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "model_reload.json")
+    monkeypatch.setattr(Config, "MODEL_RELOAD_MARKER_PATH", path)
+    monkeypatch.setattr(Config, "MODEL_RELOAD_MARKER_POLL_SECONDS", 60)
+    monkeypatch.setattr(model_reloader, "_marker_watcher", None)
+    return path
+
+
+def test_request_reload_increments_generation():
+    assert request_reload()["generation"] == 1
+    marker = request_reload(["plant_type"], force=True)
+
+    assert marker["generation"] == 2
+    assert marker["models"] == ["plant_type"]
+    assert model_reloader.read_reload_marker()["force"] is True
+
+
+def test_every_worker_applies_each_generation_once():
+    workers = [FakeModelService(), FakeModelService()]
+    watchers = [ReloadMarkerWatcher(service, worker_id=f"w{i}") for i, service in enumerate(workers)]
+
+    request_reload(["plant_type"], force=True)
+    for watcher in watchers:
+        assert watcher.check()["status"] == "success"
+        assert watcher.check() is None
+
+    assert [service.reloads for service in workers] == [[(["plant_type"], True)]] * 2
+    assert all(watcher.applied_generation == 1 for watcher in watchers)
+
+
+def test_worker_started_after_request_does_not_reload_again():
+    request_reload()
+    service = FakeModelService()
+
+    assert ReloadMarkerWatcher(service, worker_id="late").check() is None
+    assert service.reloads == []
+
+
+def test_status_reports_per_worker_versions_and_mixed_state():
+    services = [FakeModelService(), FakeModelService()]
+    watchers = [ReloadMarkerWatcher(service, worker_id=f"w{i}") for i, service in enumerate(services)]
+    for watcher in watchers:
+        watcher.publish_status()
+
+    request_reload()
+    watchers[0].check()
+    status = get_reload_status()
+    assert status["generation"] == 1
+    assert {key: worker["generation"] for key, worker in status["workers"].items()} == {"w0": 1, "w1": 0}
+    assert status["mixed_versions"] == ["plant_type"]
+    assert status["consistent"] is False
+
+    watchers[1].check()
+    status = get_reload_status()
+    assert status["workers"]["w1"]["model_versions"] == {"plant_type": "v2"}
+    assert status["consistent"] is True
+
+
+def test_status_drops_exited_workers(marker_path):
+    workers_dir = marker_path + '.workers'
+    os.makedirs(workers_dir)
+    with open(os.path.join(workers_dir, "dead.json"), 'w') as f:
+        json.dump({"worker_id": "dead", "pid": 2 ** 22 + 1, "generation": 0, "model_versions": {}}, f)
+
+    assert get_reload_status()["workers"] == {}
+    assert not os.path.exists(os.path.join(workers_dir, "dead.json"))
+
+
+def test_status_disabled_without_polling(monkeypatch):
+    monkeypatch.setattr(Config, "MODEL_RELOAD_MARKER_POLL_SECONDS", 0)
+
+    assert get_reload_status() == {"enabled": False}
@@ -0,0 +1,51 @@
+from services.profile_cache import MISSING, PlantProfileCache
+
+
+def test_read_is_skipped_when_profile_changed_during_read():
+    cache = PlantProfileCache(ttl_seconds=60, max_entries=10)
+    generation = cache.generation("main_plant")
+
+    # Firestore okuması sürerken başka bir istek profili yazar
+    cache.put("main_plant", {"name": "new"}, source="write")
+    cache.put("main_plant", {"name": "old"}, source="read", generation=generation)
+
+    assert cache.get("main_plant") == {"name": "new"}
+    assert cache.get_stats()["stale_reads_skipped"] == 1
+
+
+def test_read_is_skipped_after_invalidate():
+    cache = PlantProfileCache(ttl_seconds=60, max_entries=10)
+    generation = cache.generation("main_plant")
+
+    cache.invalidate("main_plant")
+    cache.put("main_plant", {"name": "old"}, source="read", generation=generation)
+
+    assert cache.get("main_plant") is MISSING
+
+
+def test_read_with_current_generation_is_cached():
+    cache = PlantProfileCache(ttl_seconds=60, max_entries=10)
+    cache.put("main_plant", {"name": "first"}, source="write")
+    generation = cache.generation("main_plant")
+
+    cache.put("main_plant", {"name": "read"}, source="read", generation=generation)
+
+    assert cache.get("main_plant") == {"name": "read"}
+
+
+def test_returned_profile_is_a_copy():
+    cache = PlantProfileCache(ttl_seconds=60, max_entries=10)
+    cache.put("main_plant", {"settings": {"threshold": 30}}, source="write")
+
+    cache.get("main_plant")["settings"]["threshold"] = 99
+
+    assert cache.get("main_plant") == {"settings": {"threshold": 30}}
+
+
+def test_oldest_entry_is_evicted_over_max_entries():
+    cache = PlantProfileCache(ttl_seconds=60, max_entries=2)
+    for plant_id in ("a", "b", "c"):
+        cache.put(plant_id, {"id": plant_id}, source="write")
+
+    assert cache.get("a") is MISSING
+    assert cache.get_stats()["evictions"] == 1
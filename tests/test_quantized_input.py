@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from services.image_preprocessing import image_to_input
+from services.model_service import dequantize_output
+
+SHAPE = np.array([1, 4, 4, 3])
+
+
+def make_image():
+    pixels = np.arange(4 * 4 * 3, dtype=np.uint8).reshape(4, 4, 3) * 5
+    return Image.fromarray(pixels, 'RGB'), pixels
+
+
+def details(dtype, scale=0.0, zero_point=0):
+    return {"shape": SHAPE, "dtype": dtype, "quantization": (scale, zero_point)}
+
+
+def test_float_input_is_normalized():
+    image, pixels = make_image()
+
+    result = image_to_input(image, details(np.float32))
+
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result[0], pixels / 255.0, rtol=1e-6)
+
+
+def test_uint8_unit_scale_input_is_raw_pixels():
+    image, pixels = make_image()
+
+    result = image_to_input(image, details(np.uint8, 1 / 255.0, 0))
+
+    assert result.dtype == np.uint8
+    np.testing.assert_array_equal(result[0], pixels)
+
+
+def test_int8_unit_scale_input_is_shifted_pixels():
+    image, pixels = make_image()
+
+    result = image_to_input(image, details(np.int8, 1 / 255.0, -128))
+
+    assert result.dtype == np.int8
+    np.testing.assert_array_equal(result[0], pixels.astype(np.int16) - 128)
+
+
+def test_general_quantization_rounds_and_clips():
+    image, pixels = make_image()
+    scale, zero_point = 2 / 255.0, 200
+
+    result = image_to_input(image, details(np.uint8, scale, zero_point))
+
+    expected = np.clip(np.rint(pixels / 2.0 + zero_point), 0, 255)
+    np.testing.assert_array_equal(result[0], expected)
+    assert result.max() == 255  # Aralık dışı değerler kırpılır
+
+
+def test_unsupported_input_dtype_raises():
+    image, _ = make_image()
+
+    with pytest.raises(ValueError):
+        image_to_input(image, details(np.float16))
+
+
+def test_dequantize_output():
+    output_details = {"quantization": (1 / 256.0, 0)}
+    np.testing.assert_allclose(
+        dequantize_output(np.array([[0, 128, 255]], dtype=np.uint8), output_details),
+        [[0.0, 0.5, 255 / 256.0]]
+    )
+
+    int8_details = {"quantization": (1 / 256.0, -128)}
+    np.testing.assert_allclose(
+        dequantize_output(np.array([[-128, 0, 127]], dtype=np.int8), int8_details),
+        [[0.0, 0.5, 255 / 256.0]]
+    )
+
+
+def test_dequantize_leaves_float_output_untouched():
+    output = np.array([[0.25, 0.75]], dtype=np.float32)
+
+    assert dequantize_output(output, {"quantization": (0.5, 3)}) is output
+
+
+def test_dequantize_without_scale_only_casts():
+    result = dequantize_output(np.array([[3]], dtype=np.uint8), {"quantization": (0.0, 0)})
+
+    assert result.dtype == np.float32
+    assert result[0][0] == 3.0
@@ -0,0 +1,91 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from services.result_cache import InferenceResultCache, perceptual_hash
+
+
+def photo_bytes(size=128, quality=95, mirrored=False):
+    """Yatay gradyan + blok desenli JPEG - yeniden sıkıştırmada dHash'i korunur"""
+    x = np.linspace(0, 255, size)
+    pixels = np.tile(x, (size, 1))
+    pixels[size // 4:size // 2, size // 4:size // 2] = 30
+    if mirrored:
+        pixels = pixels[:, ::-1]
+    image = Image.fromarray(np.stack([pixels] * 3, axis=-1).astype(np.uint8), 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def make_cache(**kwargs):
+    options = {"max_entries": 10, "ttl_seconds": 60, "phash_enabled": False, "phash_max_distance": 4}
+    options.update(kwargs)
+    return InferenceResultCache(**options)
+
+
+def store(cache, model_key, version, image_bytes, value):
+    cached, lookup = cache.get(model_key, version, image_bytes)
+    assert cached is None
+    cache.put(lookup, value)
+
+
+def test_exact_content_hit_is_scoped_to_model_version():
+    cache = make_cache()
+    image = photo_bytes()
+    output = np.array([[0.9]], dtype=np.float32)
+    store(cache, "general_disease", "v1", image, output)
+
+    assert cache.get("general_disease", "v1", image)[0] is output
+    assert cache.get("general_disease", "v2", image)[0] is None
+    assert cache.get("plant_type", "v1", image)[0] is None
+    # Paylaşılan çıktı salt okunur
+    assert not output.flags.writeable
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = make_cache(max_entries=2)
+    for name in (b"a", b"b"):
+        store(cache, "plant_type", "v1", name, name)
+    cache.get("plant_type", "v1", b"a")
+    store(cache, "plant_type", "v1", b"c", b"c")
+
+    assert cache.get("plant_type", "v1", b"a")[0] == b"a"
+    assert cache.get("plant_type", "v1", b"b")[0] is None
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_expired_entry_is_not_returned():
+    cache = make_cache(ttl_seconds=-1)
+    store(cache, "plant_type", "v1", b"a", b"a")
+
+    assert cache.get("plant_type", "v1", b"a")[0] is None
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_perceptual_hash_matches_recompressed_photo():
+    original, recompressed = photo_bytes(quality=95), photo_bytes(size=120, quality=60)
+    assert original != recompressed
+    assert bin(perceptual_hash(original) ^ perceptual_hash(recompressed)).count('1') <= 4
+
+    cache = make_cache(phash_enabled=True)
+    store(cache, "general_disease", "v1", original, "diseased")
+
+    assert cache.get("general_disease", "v1", recompressed)[0] == "diseased"
+    assert cache.get("general_disease", "v2", recompressed)[0] is None
+    assert cache.get_stats()["phash_hits"] == 1
+
+
+def test_perceptual_hash_rejects_different_photo():
+    cache = make_cache(phash_enabled=True)
+    store(cache, "general_disease", "v1", photo_bytes(), "diseased")
+
+    assert cache.get("general_disease", "v1", photo_bytes(mirrored=True))[0] is None
+
+
+def test_near_duplicate_misses_without_perceptual_hash():
+    cache = make_cache(phash_enabled=False)
+    store(cache, "general_disease", "v1", photo_bytes(), "diseased")
+
+    assert cache.get("general_disease", "v1", photo_bytes(quality=60))[0] is None
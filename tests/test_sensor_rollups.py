@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("firebase_admin")
+
+from services.sensor_rollups import bucket_start, rollup_document_id, summarize_rollup
+
+READING_TIME = datetime(2024, 1, 15, 10, 37, 42, 123456)
+
+
+@pytest.mark.parametrize("resolution, expected", [
+    ("5m", datetime(2024, 1, 15, 10, 35)),
+    ("1h", datetime(2024, 1, 15, 10, 0)),
+    ("1d", datetime(2024, 1, 15, 0, 0)),
+])
+def test_bucket_start(resolution, expected):
+    assert bucket_start(READING_TIME, resolution) == expected
+
+
+def test_rollup_document_id_is_stable_per_bucket():
+    first = rollup_document_id("main_plant", "5m", bucket_start(datetime(2024, 1, 15, 10, 35, 1), "5m"))
+    second = rollup_document_id("main_plant", "5m", bucket_start(datetime(2024, 1, 15, 10, 39, 59), "5m"))
+
+    assert first == second == "main_plant_5m_20240115T1035"
+    assert rollup_document_id("main_plant", "5m", bucket_start(datetime(2024, 1, 15, 10, 40), "5m")) != first
+
+
+def test_summarize_rollup():
+    summary = summarize_rollup({
+        "id": "main_plant_1h_20240115T1000",
+        "plant_id": "main_plant",
+        "resolution": "1h",
+        "timestamp": "2024-01-15T10:00:00",
+        "bucket_end": "2024-01-15T11:00:00",
+        "count": 3,
+        "last_timestamp": "2024-01-15T10:55:00",
+        "moisture_sum": 125.0,
+        "moisture_count": 3,
+        "moisture_min": 40.0,
+        "moisture_max": 43.0,
+        "moisture_last": 42.0,
+        "temperature_sum": 21.5,
+        "temperature_count": 1,
+        "temperature_min": 21.5,
+        "temperature_max": 21.5,
+        "temperature_last": 21.5
+    })
+
+    assert summary["count"] == 3
+    assert summary["moisture"] == {"min": 40.0, "max": 43.0, "mean": 41.667, "count": 3, "last": 42.0}
+    assert summary["temperature"]["mean"] == 21.5
+    # Hiç okunmamış metrik boş döner
+    assert summary["humidity"] is None
@@ -0,0 +1,152 @@
+from contextlib import contextmanager
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from config import Config
+from services.model_service import ModelService
+from services.tiled_inference import aggregate, prepare_tiles, tile_boxes, tile_grid
+
+INPUT_DETAILS = {"index": 0, "shape": np.array([1, 32, 32, 3]), "dtype": np.float32, "quantization": (0.0, 0)}
+
+
+@pytest.mark.parametrize("width, height, max_tiles, expected", [
+    (4000, 4000, 9, (3, 3)),
+    (4000, 2000, 9, (2, 4)),
+    (2000, 4000, 9, (4, 2)),
+    (4000, 3000, 1, (1, 1)),
+    (100, 5000, 4, (4, 1)),
+])
+def test_tile_grid_follows_aspect_ratio(width, height, max_tiles, expected):
+    rows, cols = tile_grid(width, height, max_tiles)
+
+    assert (rows, cols) == expected
+    assert rows * cols <= max_tiles
+
+
+def test_tile_boxes_cover_image_with_overlap():
+    boxes = tile_boxes(1000, 600, 2, 3, 0.25)
+
+    assert len(boxes) == 6
+    assert boxes[0][:2] == (0, 0)
+    assert boxes[-1][2:] == (1000, 600)
+    tile_width = boxes[0][2] - boxes[0][0]
+    # Komşu kareler kare genişliğinin %25'ini paylaşır
+    assert boxes[0][2] - boxes[1][0] == pytest.approx(tile_width * 0.25, abs=1)
+    assert all(right <= 1000 and bottom <= 600 for _, _, right, bottom in boxes)
+
+
+def test_aggregate_max_and_heat_map(monkeypatch):
+    monkeypatch.setattr(Config, "TILED_INFERENCE_AGGREGATION", "max")
+    probabilities = np.array([0.1, 0.2, 0.95, 0.3, 0.9, 0.4])
+
+    overall, tiling = aggregate(probabilities, 2, 3)
+
+    assert overall == pytest.approx(0.95)
+    assert tiling["heat_map"] == [[0.1, 0.2, 0.95], [0.3, 0.9, 0.4]]
+    assert tiling["max_tile"] == {"row": 0, "col": 2, "probability": 0.95}
+    assert tiling["diseased_tiles"] == 2
+    assert tiling["mean_probability"] == pytest.approx(0.475)
+
+
+def test_aggregate_mean(monkeypatch):
+    monkeypatch.setattr(Config, "TILED_INFERENCE_AGGREGATION", "mean")
+
+    overall, _ = aggregate(np.array([0.2, 0.4, 0.6, 0.8]), 2, 2)
+
+    assert overall == pytest.approx(0.5)
+
+
+def jpeg_bytes(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (90, 140, 60)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def test_prepare_tiles_builds_batch_from_one_decode(monkeypatch):
+    monkeypatch.setattr(Config, "TILED_INFERENCE_MAX_TILES", 9)
+    monkeypatch.setattr(Config, "TILED_INFERENCE_OVERLAP", 0.25)
+
+    batch, rows, cols, decoded_size = prepare_tiles(jpeg_bytes(1200, 1200), INPUT_DETAILS)
+
+    assert (rows, cols) == (3, 3)
+    assert batch.shape == (9, 32, 32, 3)
+    # Draft decode küçültür ama her kare model girişinden küçük olmaz
+    assert 80 <= decoded_size[0] < 1200
+    np.testing.assert_allclose(batch[4, 0, 0], np.array([90, 140, 60]) / 255.0, atol=0.05)
+
+
+class FixedBatchInterpreter:
+    """Batch boyutu değiştirilemeyen model - tek kare ortasındaki kırmızıya göre olasılık"""
+
+    def __init__(self):
+        self.shape = [1, 32, 32, 3]
+        self.input = None
+
+    def get_input_details(self):
+        return [dict(INPUT_DETAILS, shape=np.array(self.shape))]
+
+    def get_output_details(self):
+        return [{"index": 1, "quantization": (0.0, 0)}]
+
+    def resize_tensor_input(self, index, shape):
+        if shape[0] != 1:
+            raise ValueError("fixed batch dimension")
+        self.shape = list(shape)
+
+    def allocate_tensors(self):
+        pass
+
+    def set_tensor(self, index, value):
+        assert list(value.shape) == self.shape
+        self.input = value
+
+    def invoke(self):
+        pass
+
+    def get_tensor(self, index):
+        return self.input[:, 16, 16, :1].astype(np.float32)
+
+
+class FakePool:
+    version = "v1"
+    input_details = INPUT_DETAILS
+
+    def __init__(self):
+        self.instance = FixedBatchInterpreter()
+
+    @contextmanager
+    def interpreter(self, timeout=None):
+        yield self.instance
+
+
+def test_tiled_prediction_falls_back_to_single_tiles_and_restores_shape(monkeypatch):
+    monkeypatch.setattr(Config, "TILED_INFERENCE_MAX_TILES", 4)
+    monkeypatch.setattr(Config, "TILED_INFERENCE_BATCH_SIZE", 4)
+    monkeypatch.setattr(Config, "TILED_INFERENCE_AGGREGATION", "max")
+
+    class Registry:
+        def load_core_models(self):
+            pass
+
+        def get_pool(self, key):
+            return None
+
+    pool = FakePool()
+    service = ModelService(registry=Registry())
+    monkeypatch.setattr(service, "_select_disease_model", lambda plant_type: ("general_disease", pool, "general"))
+
+    image = Image.new('RGB', (400, 400), (0, 0, 0))
+    image.paste((255, 255, 255), (240, 240, 400, 400))  # Sağ alt karede "lezyon"
+    buffer = BytesIO()
+    image.save(buffer, 'PNG')
+
+    result = service._predict_disease_tiled(buffer.getvalue(), None)
+
+    assert result["tiling"]["batched"] is False
+    assert result["tiling"]["grid"] == [2, 2]
+    assert result["tiling"]["max_tile"]["row"] == 1 and result["tiling"]["max_tile"]["col"] == 1
+    assert pool.instance.shape == [1, 32, 32, 3]
+    assert ("general_disease", "v1") in service._tiled_batch_unsupported
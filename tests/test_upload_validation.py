@@ -0,0 +1,120 @@
+import os
+import struct
+import zlib
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from config import Config
+from services.memory_report import finish_request_memory, start_request_memory
+from services.upload_validation import UploadValidationError, sniff_format, validate_image_upload
+
+
+class FakeUpload:
+    """Werkzeug FileStorage yerine - sadece mimetype ve stream kullanılır"""
+
+    def __init__(self, data, mimetype):
+        self.mimetype = mimetype
+        self.stream = BytesIO(data)
+
+
+def image_bytes(image_format, size=(64, 48)):
+    buffer = BytesIO()
+    Image.new('RGB', size, (10, 120, 30)).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def png_header_only(width, height):
+    """Sadece başlığı olan PNG - piksel verisi yok, boyut başlıkta bildirilir"""
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    chunk = b"IHDR" + ihdr
+    iend = struct.pack(">I", 0) + b"IEND" + struct.pack(">I", zlib.crc32(b"IEND"))
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + chunk + struct.pack(">I", zlib.crc32(chunk)) + iend
+
+
+@pytest.mark.parametrize("image_format, expected", [("JPEG", "JPEG"), ("PNG", "PNG"), ("WEBP", "WEBP")])
+def test_sniff_format_reads_signature(image_format, expected):
+    assert sniff_format(image_bytes(image_format)[:16]) == expected
+
+
+def test_accepts_generic_content_type_by_signature():
+    data = image_bytes("PNG")
+
+    content, info = validate_image_upload(FakeUpload(data, "application/octet-stream"))
+
+    assert bytes(content) == data
+    assert info["format"] == "PNG"
+    assert info["content_type"] == "image/png"
+    assert (info["width"], info["height"]) == (64, 48)
+
+
+def test_rejects_unknown_signature():
+    with pytest.raises(UploadValidationError) as error:
+        validate_image_upload(FakeUpload(b"GIF89a" + b"\x00" * 64, "image/jpeg"))
+
+    assert error.value.status_code == 415
+    assert error.value.reason == "signature"
+
+
+def test_rejects_unsupported_content_type_before_reading_body():
+    with pytest.raises(UploadValidationError) as error:
+        validate_image_upload(FakeUpload(image_bytes("JPEG"), "text/html"))
+
+    assert error.value.reason == "content_type"
+
+
+def test_rejects_content_type_mismatch():
+    with pytest.raises(UploadValidationError) as error:
+        validate_image_upload(FakeUpload(image_bytes("PNG"), "image/jpeg"))
+
+    assert error.value.status_code == 415
+    assert error.value.reason == "content_type_mismatch"
+
+
+def test_rejects_pixel_limit_from_header_without_decoding(monkeypatch):
+    monkeypatch.setattr(Config, "IMAGE_MAX_PIXELS", 1_000_000)
+
+    with pytest.raises(UploadValidationError) as error:
+        validate_image_upload(FakeUpload(png_header_only(2000, 1000), "image/png"))
+
+    assert error.value.status_code == 413
+    assert error.value.reason == "dimensions"
+
+
+def test_rejects_oversized_body(monkeypatch):
+    monkeypatch.setattr(Config, "IMAGE_MAX_UPLOAD_BYTES", 100)
+
+    with pytest.raises(UploadValidationError) as error:
+        validate_image_upload(FakeUpload(image_bytes("PNG", (200, 200)), "image/png"))
+
+    assert error.value.reason == "file_size"
+
+
+def test_large_file_upload_is_memory_mapped(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "UPLOAD_MMAP_MIN_BYTES", 1)
+    path = tmp_path / "leaf.jpg"
+    path.write_bytes(image_bytes("JPEG"))
+    upload = FakeUpload(b"", "image/jpeg")
+    upload.stream = open(path, "rb")
+
+    try:
+        content, _ = validate_image_upload(upload)
+    finally:
+        upload.stream.close()
+
+    assert isinstance(content, memoryview)
+    assert bytes(content) == path.read_bytes()
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/clear_refs'), reason="VmHWM reset needs Linux /proc")
+def test_request_peak_is_reset_per_request():
+    start = start_request_memory(reset_peak=True)
+    block = bytearray(64 * 1024 * 1024)
+    first = finish_request_memory(start)
+    del block
+
+    second = finish_request_memory(start_request_memory(reset_peak=True))
+
+    assert first["request_peak_rss_mb"] - second["request_peak_rss_mb"] > 32
+    assert finish_request_memory(start_request_memory())["request_peak_rss_mb"] is None
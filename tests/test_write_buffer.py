@@ -0,0 +1,233 @@
+import pytest
+
+from config import Config
+from services.write_buffer import COMMIT_MARKER_COLLECTION, WriteBehindBuffer
+
+
+class AlreadyExists(Exception):
+    """google.api_core.exceptions.AlreadyExists yerine"""
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.sets = []
+        self.creates = []
+
+    def set(self, ref, data, merge=False):
+        self.sets.append((ref, data))
+
+    def create(self, ref, data):
+        self.creates.append((ref, data))
+
+    def commit(self):
+        self.db.commit_attempts += 1
+        outcome = self.db.outcomes.pop(0) if self.db.outcomes else "ok"
+        if outcome == "fail":
+            raise ConnectionError("deadline exceeded")
+
+        for ref, _ in self.creates:
+            if ref in self.db.documents:
+                raise AlreadyExists(f"{ref} already exists")
+        for ref, data in self.creates + self.sets:
+            self.db.documents[ref] = data
+        self.db.commits += 1
+
+        if outcome == "ambiguous":
+            # Commit uygulandı ama yanıt istemciye ulaşmadı
+            raise ConnectionError("connection reset")
+
+
+class FakeCollection:
+    def __init__(self, name):
+        self.name = name
+
+    def document(self, document_id):
+        return (self.name, document_id)
+
+
+class FakeFirestore:
+    """Batch commit sonuçları outcomes listesinden sırayla okunur: ok / fail / ambiguous"""
+
+    def __init__(self, outcomes=()):
+        self.outcomes = list(outcomes)
+        self.documents = {}
+        self.commit_attempts = 0
+        self.commits = 0
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def collection(self, name):
+        return FakeCollection(name)
+
+    def records(self, collection):
+        return {key[1]: data for key, data in self.documents.items() if key[0] == collection}
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(Config, "WRITE_BUFFER_MAX_RETRIES", 2)
+    monkeypatch.setattr(Config, "WRITE_BUFFER_RETRY_BACKOFF_SECONDS", 0)
+
+
+def make_buffer(db, max_batch=10, max_pending=100):
+    # Uzun aralık: arka plan thread'i test sırasında flush etmez
+    return WriteBehindBuffer(lambda: db, max_batch=max_batch, flush_interval=60, max_pending=max_pending)
+
+
+def test_flush_commits_writes_and_marker_in_one_batch():
+    db = FakeFirestore()
+    buffer = make_buffer(db)
+    for moisture in (40, 41, 42):
+        buffer.add("sensor_data", {"moisture": moisture})
+
+    assert buffer.flush(timeout=1)
+
+    assert sorted(record["moisture"] for record in db.records("sensor_data").values()) == [40, 41, 42]
+    assert len(db.records(COMMIT_MARKER_COLLECTION)) == 1
+    metrics = buffer.get_metrics()
+    assert metrics["written"] == 3
+    assert metrics["commits"] == 1
+    assert metrics["queue_depth"] == 0
+
+
+def test_flush_splits_into_max_batch_commits():
+    db = FakeFirestore()
+    buffer = make_buffer(db, max_batch=2)
+    for moisture in range(5):
+        buffer.add("sensor_data", {"moisture": moisture})
+
+    assert buffer.flush(timeout=1)
+
+    assert db.commits == 3
+    assert len(db.records("sensor_data")) == 5
+
+
+def test_transient_failure_is_retried():
+    db = FakeFirestore(outcomes=["fail", "ok"])
+    buffer = make_buffer(db)
+    buffer.add("sensor_data", {"moisture": 40})
+
+    assert buffer.flush(timeout=1)
+
+    assert db.commit_attempts == 2
+    assert buffer.get_metrics()["retries"] == 1
+    assert len(db.records("sensor_data")) == 1
+
+
+def test_ambiguous_commit_is_not_applied_twice():
+    db = FakeFirestore(outcomes=["ambiguous"])
+    buffer = make_buffer(db)
+    buffer.add("sensor_data", {"moisture": 40}, document_id="reading-1")
+
+    assert buffer.flush(timeout=1)
+
+    # İkinci denemede işaret dokümanı zaten var - batch yazılmış sayılır
+    assert db.commits == 1
+    assert db.commit_attempts == 2
+    metrics = buffer.get_metrics()
+    assert metrics["recovered_commits"] == 1
+    assert metrics["written"] == 1
+
+
+def test_exhausted_retries_requeue_batch_with_same_ids():
+    db = FakeFirestore(outcomes=["fail", "fail", "fail"])
+    buffer = make_buffer(db)
+    buffer.add("sensor_data", {"moisture": 40})
+    buffer.add("sensor_data", {"moisture": 41})
+
+    assert buffer._flush_once() == 0
+    pending = list(buffer._pending)
+    assert len(pending) == 2
+    assert buffer.get_metrics()["requeued_writes"] == 2
+
+    # Firestore düzeldiğinde aynı dokümanlar aynı batch_id ile yazılır
+    assert buffer._flush_once() == 2
+    assert set(db.records("sensor_data")) == {write.document_id for write in pending}
+    assert set(db.records(COMMIT_MARKER_COLLECTION)) == {pending[0].batch_id}
+
+
+def test_exhausted_retries_drop_batch_when_buffer_is_full():
+    db = FakeFirestore(outcomes=["fail", "fail", "fail"])
+
+    def db_provider():
+        # Batch alındıktan sonra yeni kayıtlar gelir, geri koymaya yer kalmaz
+        buffer.add("sensor_data", {"moisture": 50})
+        buffer.add("sensor_data", {"moisture": 51})
+        return db
+
+    buffer = WriteBehindBuffer(db_provider, max_batch=10, flush_interval=60, max_pending=3)
+    for moisture in range(3):
+        buffer.add("sensor_data", {"moisture": moisture})
+
+    assert buffer._flush_once() == 0
+
+    metrics = buffer.get_metrics()
+    assert metrics["dropped_writes"] == 3
+    assert metrics["queue_depth"] == 2
+
+
+def test_missing_firestore_skips_writes():
+    buffer = WriteBehindBuffer(lambda: None, max_batch=10, flush_interval=60, max_pending=100)
+    buffer.add("sensor_data", {"moisture": 40})
+
+    assert buffer.flush(timeout=1)
+    assert buffer.get_metrics()["skipped_mock"] == 1
+
+
+def test_batch_leaves_room_for_commit_marker():
+    buffer = make_buffer(FakeFirestore(), max_batch=1000)
+
+    assert buffer.max_batch == 499
+
+
+def test_batch_is_dropped_after_max_requeues(monkeypatch):
+    monkeypatch.setattr(Config, "WRITE_BUFFER_MAX_REQUEUES", 2)
+    db = FakeFirestore(outcomes=["fail"] * 9)
+    buffer = make_buffer(db)
+    buffer.add("sensor_data", {"moisture": 40})
+    buffer.add("sensor_data", {"moisture": 41})
+
+    for _ in range(3):
+        assert buffer._flush_once() == 0
+
+    metrics = buffer.get_metrics()
+    assert metrics["requeued_writes"] == 4
+    assert metrics["dead_lettered_writes"] == 2
+    assert metrics["queue_depth"] == 0
+
+    # Sonraki kayıtlar takılı batch'in arkasında beklemez
+    buffer.add("sensor_data", {"moisture": 42})
+    assert buffer._flush_once() == 1
+
+
+def test_backpressure_tries_once_without_retry_sleep(monkeypatch):
+    monkeypatch.setattr(Config, "WRITE_BUFFER_RETRY_BACKOFF_SECONDS", 60)
+    db = FakeFirestore(outcomes=["fail"])
+    buffer = make_buffer(db, max_batch=10, max_pending=3)
+
+    for moisture in range(4):
+        buffer.add("sensor_data", {"moisture": moisture})
+
+    assert db.commit_attempts == 1
+    metrics = buffer.get_metrics()
+    assert metrics["inline_flushes"] == 1
+    assert metrics["retries"] == 0
+    # Geri koymaya yer yok - batch atıldı, tampon sınırı aşılmadı
+    assert metrics["dropped_writes"] == 4
+    assert metrics["queue_depth"] == 0
+
+
+def test_backpressure_drops_oldest_while_flusher_commits():
+    db = FakeFirestore()
+    buffer = make_buffer(db, max_batch=10, max_pending=3)
+    buffer._ensure_worker()
+
+    with buffer._flush_lock:  # Flusher commit ediyor (yeniden deneme beklemesinde)
+        for moisture in range(5):
+            buffer.add("sensor_data", {"moisture": moisture})
+
+    assert db.commit_attempts == 0
+    assert [write.data["moisture"] for write in buffer._pending] == [2, 3, 4]
+    assert buffer.get_metrics()["dropped_writes"] == 2
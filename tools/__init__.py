@@ -0,0 +1,2 @@
+# Tools modülü
+# Repo kök dizininden çalıştırılır: python -m tools.<script>
@@ -0,0 +1,296 @@
+"""
+Offline model kuantizasyon ve optimizasyon aracı
+Config'deki her model için dinamik aralık (dynamic-range), float16 ve tam int8
+varyantları üretir; dosya boyutu, yükleme süresi, gecikme yüzdelikleri ve float
+modelle tahmin uyumunu raporlar
+
+TFLite dosyası yeniden kuantize edilemediği için varyantlar modelin kaynak
+hâlinden (SavedModel klasörü veya .keras/.h5) üretilir. Repoda sadece .tflite
+dosyaları bulunur; kaynaklar eğitim ortamından alınıp `--source-dir` altına
+.tflite dosyasıyla aynı adla konmalıdır (bkz. README):
+    sources/aloe_vera/          (SavedModel)
+    sources/baris_cicegi.keras
+İşlenecek bir modelin kaynağı yoksa araç hiçbir şey üretmeden hata koduyla çıkar
+
+Kullanım:
+    python -m tools.optimize_models --calibration-dir calib/ --source-dir sources/
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from config import Config
+from services.image_preprocessing import preprocess_image
+from services.model_service import dequantize_output
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def configured_models():
+    """Aracın işleyeceği (ad, tflite yolu) listesi"""
+    models = [
+        ("plant_type", Config.PLANT_TYPE_MODEL_PATH),
+        ("general_disease", Config.GENERAL_DISEASE_MODEL_PATH)
+    ]
+    models.extend(Config.SPECIFIC_DISEASE_MODELS.items())
+    return models
+
+
+def load_calibration_images(calibration_dir, limit):
+    images = []
+    for name in sorted(os.listdir(calibration_dir)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            with open(os.path.join(calibration_dir, name), 'rb') as f:
+                images.append(f.read())
+        if len(images) >= limit:
+            break
+    return images
+
+
+def find_source_model(source_dir, model_path):
+    """tflite dosyasıyla aynı adı taşıyan SavedModel/Keras kaynağını bul"""
+    if not source_dir:
+        return None, None
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+
+    saved_model_dir = os.path.join(source_dir, stem)
+    if os.path.isdir(saved_model_dir):
+        return "saved_model", saved_model_dir
+    for extension in ('.keras', '.h5'):
+        keras_path = os.path.join(source_dir, stem + extension)
+        if os.path.exists(keras_path):
+            return "keras", keras_path
+    return None, None
+
+
+def make_converter(source_kind, source_path):
+    if source_kind == "saved_model":
+        return tf.lite.TFLiteConverter.from_saved_model(source_path)
+    model = tf.keras.models.load_model(source_path, compile=False)
+    return tf.lite.TFLiteConverter.from_keras_model(model)
+
+
+def convert_variant(source_kind, source_path, variant, calibration_inputs):
+    """
+    dynamic: sadece ağırlıklar int8; fp16: ağırlıklar float16;
+    int8: ağırlık + aktivasyon, uint8 giriş/çıkış
+    """
+    converter = make_converter(source_kind, source_path)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if variant == "fp16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == "int8":
+        def representative_dataset():
+            for sample in calibration_inputs:
+                yield [sample]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.uint8
+
+    return converter.convert()
+
+
+def load_interpreter(model_path, num_threads):
+    start = time.perf_counter()
+    interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    return interpreter, (time.perf_counter() - start) * 1000
+
+
+def run_inference(interpreter, image_data):
+    input_details = interpreter.get_input_details()[0]
+    output_details = interpreter.get_output_details()[0]
+    interpreter.set_tensor(input_details['index'], preprocess_image(image_data, input_details))
+    interpreter.invoke()
+    return dequantize_output(interpreter.get_tensor(output_details['index']), output_details).flatten()
+
+
+def percentile(sorted_samples, fraction):
+    index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def evaluate(model_path, images, runs, num_threads):
+    """Boyut, yükleme süresi, tek görüntü gecikmesi (ön işleme + invoke) ve tüm tahminler"""
+    interpreter, load_ms = load_interpreter(model_path, num_threads)
+    outputs = [run_inference(interpreter, image_data) for image_data in images]
+
+    latencies = []
+    for i in range(runs):
+        image_data = images[i % len(images)]
+        start = time.perf_counter()
+        run_inference(interpreter, image_data)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    return {
+        "path": model_path,
+        "size_bytes": os.path.getsize(model_path),
+        "load_ms": round(load_ms, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p90": round(percentile(latencies, 0.90), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "mean": round(statistics.fmean(latencies), 3)
+        }
+    }, outputs
+
+
+def agreement(reference_outputs, variant_outputs):
+    """
+    Float modelle uyum: çok sınıflı çıktıda top-1 eşleşme oranı,
+    tek çıktılı (hastalık) modelde DISEASE_THRESHOLD kararının eşleşme oranı
+    """
+    matches = 0
+    abs_diffs = []
+    for reference, variant in zip(reference_outputs, variant_outputs):
+        if reference.size == 1:
+            matches += (reference[0] > Config.DISEASE_THRESHOLD) == (variant[0] > Config.DISEASE_THRESHOLD)
+        else:
+            matches += int(np.argmax(reference) == np.argmax(variant))
+        abs_diffs.append(float(np.mean(np.abs(reference - variant))))
+
+    return {
+        "decision_agreement": round(matches / len(reference_outputs), 4),
+        "mean_abs_diff": round(statistics.fmean(abs_diffs), 5)
+    }
+
+
+def recommend(report, min_agreement):
+    """Uyum eşiğini geçen varyantlar arasından en düşük p50 gecikmeli olanı öner"""
+    candidates = [("float", report["float"]["latency_ms"]["p50"])]
+    for variant, result in report.get("variants", {}).items():
+        if "error" not in result and result["agreement"]["decision_agreement"] >= min_agreement:
+            candidates.append((variant, result["latency_ms"]["p50"]))
+    return min(candidates, key=lambda item: item[1])[0]
+
+
+def optimize_model(name, model_path, args, images, calibration_inputs_cache):
+    report = {"model": name}
+    if not os.path.exists(model_path):
+        report["error"] = f"Model not found: {model_path}"
+        return report
+
+    float_result, float_outputs = evaluate(model_path, images, args.runs, args.threads)
+    report["float"] = float_result
+
+    source_kind, source_path = find_source_model(args.source_dir, model_path)
+
+    # Kalibrasyon girişleri float modelin giriş şekline göre hazırlanır
+    float_interpreter, _ = load_interpreter(model_path, args.threads)
+    input_details = float_interpreter.get_input_details()[0]
+    shape_key = tuple(input_details['shape'])
+    if shape_key not in calibration_inputs_cache:
+        calibration_inputs_cache[shape_key] = [
+            preprocess_image(image_data, input_details).copy() for image_data in images
+        ]
+    calibration_inputs = calibration_inputs_cache[shape_key]
+
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    report["variants"] = {}
+    for variant in args.variants:
+        output_path = os.path.join(args.output_dir, f"{stem}_{variant}.tflite")
+        try:
+            with open(output_path, 'wb') as f:
+                f.write(convert_variant(source_kind, source_path, variant, calibration_inputs))
+            result, outputs = evaluate(output_path, images, args.runs, args.threads)
+            result["agreement"] = agreement(float_outputs, outputs)
+            result["size_ratio"] = round(result["size_bytes"] / float_result["size_bytes"], 3)
+            report["variants"][variant] = result
+        except Exception as e:
+            report["variants"][variant] = {"error": str(e)}
+
+    report["recommended"] = recommend(report, args.min_agreement)
+    return report
+
+
+def print_summary(reports):
+    print(f"{'model':<16} {'variant':<8} {'size KB':>9} {'load ms':>8} {'p50 ms':>8} {'p99 ms':>8} {'agree':>6}")
+    for report in reports:
+        if "error" in report:
+            print(f"{report['model']:<16} {report['error']}")
+            continue
+        rows = [("float", report["float"])] + list(report.get("variants", {}).items())
+        for variant, result in rows:
+            if "error" in result:
+                print(f"{report['model']:<16} {variant:<8} error: {result['error']}")
+                continue
+            agree = result.get("agreement", {}).get("decision_agreement", 1.0)
+            marker = " *" if variant == report.get("recommended") else ""
+            print(f"{report['model']:<16} {variant:<8} {result['size_bytes'] / 1024:>9.1f} "
+                  f"{result['load_ms']:>8.1f} {result['latency_ms']['p50']:>8.2f} "
+                  f"{result['latency_ms']['p99']:>8.2f} {agree:>6.3f}{marker}")
+    print("* recommended variant")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Post-training quantization and latency/accuracy report")
+    parser.add_argument('--calibration-dir', required=True, help="Local folder with calibration photos")
+    parser.add_argument('--source-dir', required=True,
+                        help="Folder with SavedModel dirs or .keras/.h5 files named like the .tflite files")
+    parser.add_argument('--output-dir', default='models/optimized', help="Where variant .tflite files are written")
+    parser.add_argument('--variants', nargs='+', default=['dynamic', 'fp16', 'int8'], choices=['dynamic', 'fp16', 'int8'])
+    parser.add_argument('--models', nargs='+', help="Only process these model names (default: all configured)")
+    parser.add_argument('--max-images', type=int, default=200, help="Calibration/evaluation image limit")
+    parser.add_argument('--runs', type=int, default=100, help="Timed single-image invokes per model")
+    parser.add_argument('--threads', type=int, default=1, help="Interpreter num_threads for timing")
+    parser.add_argument('--min-agreement', type=float, default=0.98, help="Minimum agreement for a variant to be recommended")
+    parser.add_argument('--report', default='models/optimized/report.json', help="JSON report path")
+    args = parser.parse_args()
+
+    models = []
+    for name, model_path in configured_models():
+        if args.models and name not in args.models:
+            continue
+        if not os.path.exists(model_path):
+            print(f"Skipping {name}: {model_path} not found")
+            continue
+        models.append((name, model_path))
+    if not models:
+        parser.exit(2, "error: none of the selected models exist on disk\n")
+
+    # Kaynağı olmayan model için varyant üretilemez - sadece float ölçümüyle başarı raporlanmaz
+    missing = [
+        (name, model_path) for name, model_path in models
+        if find_source_model(args.source_dir, model_path)[0] is None
+    ]
+    if missing:
+        lines = [f"error: no SavedModel/Keras source found in {args.source_dir} for:"]
+        for name, model_path in missing:
+            stem = os.path.splitext(os.path.basename(model_path))[0]
+            lines.append(f"  {name}: expected {os.path.join(args.source_dir, stem)}/ or {stem}.keras / {stem}.h5")
+        lines.append("Quantized variants are built from the source model, not from the shipped .tflite (see README).")
+        parser.exit(2, "\n".join(lines) + "\n")
+
+    images = load_calibration_images(args.calibration_dir, args.max_images)
+    if not images:
+        parser.error(f"No calibration images found in {args.calibration_dir}")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    calibration_inputs_cache = {}
+    reports = []
+    for name, model_path in models:
+        print(f"Optimizing {name} ({model_path})...")
+        reports.append(optimize_model(name, model_path, args, images, calibration_inputs_cache))
+
+    report_dir = os.path.dirname(args.report)
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump({"images": len(images), "models": reports}, f, indent=2, ensure_ascii=False)
+
+    print_summary(reports)
+    print(f"Report written to {args.report}")
+
+
+if __name__ == '__main__':
+    main()